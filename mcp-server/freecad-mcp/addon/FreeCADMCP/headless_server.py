@@ -0,0 +1,26 @@
+"""Run the RPC server without a GUI, for batch work on machines without a display:
+
+    FreeCADCmd ~/.FreeCAD/Mod/FreeCADMCP/headless_server.py
+
+FreeCADCmd does not pass arguments to scripts, so the server is configured
+through environment variables:
+
+    FREECAD_MCP_HOST         (default localhost)
+    FREECAD_MCP_PORT         (default 9875)
+    FREECAD_MCP_MAX_WORKERS  (default 4)
+    FREECAD_MCP_MAX_JOBS     (default 2)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rpc_server import rpc_server  # noqa: E402
+
+rpc_server.serve_headless(
+    host=os.environ.get("FREECAD_MCP_HOST", "localhost"),
+    port=int(os.environ.get("FREECAD_MCP_PORT", "9875")),
+    max_workers=int(os.environ.get("FREECAD_MCP_MAX_WORKERS", "4")),
+    max_jobs=int(os.environ.get("FREECAD_MCP_MAX_JOBS", "2")),
+)
@@ -0,0 +1,482 @@
+import ast
+import contextlib
+import ctypes
+import hashlib
+import io
+import linecache
+import secrets
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Any
+
+import FreeCAD
+import ObjectsFem
+
+if FreeCAD.GuiUp:
+    import FreeCADGui
+else:
+    # Headless (FreeCADCmd): scripts see Gui as None.
+    FreeCADGui = None
+
+from . import dispatcher
+from .cache import LRUCache
+
+# Name of the generator function a cooperative script is wrapped in.
+COOPERATIVE_ENTRY = "__mcp_job__"
+
+# The execution whose code is running on the GUI thread, for `yield_gui`.
+_current_execution = None
+
+
+class ScriptInterrupted(BaseException):
+    """Raised inside a running script when it is cancelled or hits its time limit.
+
+    Derives from BaseException so that `except Exception` in the script does
+    not swallow it.
+    """
+
+
+def yield_gui(progress: float | None = None, message: str | None = None):
+    """Let the GUI run, and optionally report progress (0-1) and a status message.
+
+    At the top level of a cooperative script (including inside loops) this
+    ends the current time slice if it has used its budget. Inside functions
+    the script defines it only reports progress.
+    """
+    execution = _current_execution
+    if execution is not None:
+        if progress is not None:
+            execution.progress = float(progress)
+        if message is not None:
+            execution.message = str(message)
+    return progress
+
+
+class _YieldGuiRewriter(ast.NodeTransformer):
+    """Turns top-level `yield_gui(...)` statements into `yield yield_gui(...)`.
+
+    Nested functions, classes and lambdas are left alone, since a yield there
+    would turn them into generators. With `rewrite=False` it only sets
+    `cooperative` when the script yields at the top level.
+    """
+
+    def __init__(self, rewrite: bool = True):
+        self.rewrite = rewrite
+        self.cooperative = False
+
+    def _skip(self, node):
+        return node
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = visit_Lambda = _skip
+
+    def visit_Expr(self, node):
+        call = node.value
+        if isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and call.func.id == "yield_gui":
+            self.cooperative = True
+            if self.rewrite:
+                return ast.copy_location(ast.Expr(ast.Yield(call)), node)
+            return node
+        return self.generic_visit(node)
+
+    def visit_Yield(self, node):
+        self.cooperative = True
+        return self.generic_visit(node)
+
+    visit_YieldFrom = visit_Yield
+
+
+def _top_level_bindings(tree: ast.Module) -> set[str]:
+    """Names the script binds at module level, which must stay session globals once wrapped."""
+    names = set()
+    pending = list(ast.iter_child_nodes(tree))
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+            continue
+        if isinstance(node, (ast.Lambda, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)):
+            continue
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update(alias.asname or alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)) and node.name:
+            names.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            names.add(node.rest)
+        pending.extend(ast.iter_child_nodes(node))
+    names.discard("*")
+    return names
+
+
+def _wrap_as_generator(tree: ast.Module) -> ast.Module:
+    """Move the script body into a generator function that keeps its globals."""
+    wrapper = ast.parse(f"def {COOPERATIVE_ENTRY}():\n    pass")
+    body = list(tree.body)
+    names = _top_level_bindings(tree)
+    if names:
+        body.insert(0, ast.copy_location(ast.Global(names=sorted(names)), body[0]))
+    if not any(isinstance(n, (ast.Yield, ast.YieldFrom)) for stmt in body for n in ast.walk(stmt)):
+        # Still a generator, so the runner can drive it the same way.
+        body.append(ast.parse("if False:\n    yield").body[0])
+    wrapper.body[0].body = body
+    return ast.fix_missing_locations(wrapper)
+
+
+@dataclass
+class CompiledScript:
+    code: Any
+    cooperative: bool
+
+
+class OutputBuffer:
+    """Append-only text that readers consume from an offset while it grows."""
+
+    def __init__(self, changed: threading.Condition):
+        self._parts: list[str] = []
+        self._length = 0
+        self._changed = changed
+
+    def write(self, text: str) -> int:
+        with self._changed:
+            self._parts.append(text)
+            self._length += len(text)
+            self._changed.notify_all()
+        return len(text)
+
+    def read(self, offset: int = 0) -> tuple[str, int]:
+        with self._changed:
+            text = "".join(self._parts)
+            self._parts = [text] if text else []
+            return text[offset:], self._length
+
+    def __len__(self) -> int:
+        return self._length
+
+
+class _ThreadStream(io.TextIOBase):
+    """Sends writes from one thread to a buffer and everything else to the original stream.
+
+    sys.stdout is process-wide, so a plain redirect would also capture
+    output from the RPC server threads while a script runs.
+    """
+
+    def __init__(self, buffer: OutputBuffer, original, thread_id: int):
+        self._buffer = buffer
+        self._original = original
+        self._thread_id = thread_id
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if threading.get_ident() == self._thread_id:
+            return self._buffer.write(text)
+        if self._original is None:
+            return len(text)
+        return self._original.write(text)
+
+    def flush(self):
+        if threading.get_ident() != self._thread_id and self._original is not None:
+            self._original.flush()
+
+
+@dataclass
+class Execution:
+    """One script run.
+
+    `state` goes queued -> running -> done | error | interrupted | cancelled.
+    A cooperative script alternates between running and suspended, once per
+    time slice.
+    """
+
+    id: str
+    session: str
+    time_limit: float | None
+    cooperative: bool = False
+    state: str = "queued"
+    error: str | None = None
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: float | None = None
+    finished_at: float | None = None
+    future: Any = None
+    slices: int = 0
+    progress: float | None = None
+    message: str | None = None
+    changed: threading.Condition = field(default_factory=threading.Condition, repr=False)
+    stdout: OutputBuffer = field(init=False, repr=False)
+    stderr: OutputBuffer = field(init=False, repr=False)
+    _thread_id: int | None = field(default=None, repr=False)
+    _interrupt_reason: str | None = field(default=None, repr=False)
+    _generator: Any = field(default=None, repr=False)
+    _watchdog: threading.Timer | None = field(default=None, repr=False)
+
+    def __post_init__(self):
+        self.stdout = OutputBuffer(self.changed)
+        self.stderr = OutputBuffer(self.changed)
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "error", "interrupted", "cancelled")
+
+    def interrupt(self, reason: str) -> bool:
+        """Raise ScriptInterrupted in the thread running the script, if it is still running."""
+        with self.changed:
+            if self.state not in ("running", "suspended") or self._interrupt_reason is not None:
+                return False
+            self._interrupt_reason = reason
+            # A suspended script is stopped when its next slice starts. Without
+            # a thread id _step has left the script, and the thread runs other
+            # GUI tasks now.
+            if self.state == "running" and self._thread_id is not None:
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self._thread_id), ctypes.py_object(ScriptInterrupted)
+                )
+            return True
+
+    def wait(self, stdout_offset: int, stderr_offset: int, timeout: float):
+        """Block until there is output past the offsets, the run finishes, or `timeout` passes."""
+        with self.changed:
+            self.changed.wait_for(
+                lambda: self.finished
+                or len(self.stdout) > stdout_offset
+                or len(self.stderr) > stderr_offset,
+                timeout,
+            )
+
+    def wait_finished(self, timeout: float | None) -> bool:
+        with self.changed:
+            return self.changed.wait_for(lambda: self.finished, timeout)
+
+    def _finish(self, state: str, error: str | None = None):
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+        with self.changed:
+            self.state = state
+            self.error = error
+            self.finished_at = time.monotonic()
+            self.changed.notify_all()
+
+
+class CodeRunner:
+    """Runs `execute_code` scripts in per-session namespaces.
+
+    Compiled code objects are cached by the SHA-256 of their source, so a
+    script sent repeatedly is compiled once. Each session keeps its own
+    globals between calls instead of sharing the rpc_server module globals.
+    A watchdog timer interrupts scripts that exceed their wall-clock time
+    limit; the interrupt lands at the next Python bytecode, so a long call
+    into FreeCAD's C++ code finishes first.
+
+    Scripts that call `yield_gui()` (or `yield`) at the top level run
+    cooperatively: the body is wrapped in a generator and advanced for at
+    most `slice_seconds` per GUI task, and the next slice is queued behind
+    whatever else is waiting for the GUI thread.
+
+    Up to `max_executions` executions are kept for polling; beyond that the
+    oldest finished ones are forgotten, never one that is queued or running.
+    """
+
+    def __init__(self, max_compiled: int = 256, max_sessions: int = 32, max_executions: int = 64):
+        self._compiled = LRUCache(max_entries=max_compiled)
+        self._sessions = LRUCache(max_entries=max_sessions)
+        self.max_executions = max_executions
+        self._lock = threading.Lock()
+        self._executions: dict[str, Execution] = {}
+        self.time_limit: float | None = None
+        self.slice_seconds = 0.05
+
+    def compile(self, code: str, cooperative: bool | None = None) -> CompiledScript:
+        """Compile `code`; `cooperative=None` picks the cooperative mode if the script yields."""
+        digest = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        key = (digest, cooperative)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            filename = f"<mcp-{digest[:12]}>"
+            tree = ast.parse(code, filename)
+            if cooperative is None:
+                detector = _YieldGuiRewriter(rewrite=False)
+                detector.visit(tree)
+                cooperative = detector.cooperative
+            if cooperative and tree.body:
+                tree = _wrap_as_generator(_YieldGuiRewriter().visit(tree))
+            else:
+                # Run as written: `yield_gui()` only reports progress.
+                cooperative = False
+            compiled = CompiledScript(compile(tree, filename, "exec"), cooperative)
+            # Lets tracebacks show the script's source lines.
+            linecache.cache[filename] = (len(code), None, code.splitlines(True), filename)
+            self._compiled.put(key, compiled)
+        return compiled
+
+    def namespace(self, session: str) -> dict[str, Any]:
+        namespace = self._sessions.get(session)
+        if namespace is None:
+            namespace = {
+                "__name__": "__mcp__",
+                "FreeCAD": FreeCAD,
+                "App": FreeCAD,
+                "FreeCADGui": FreeCADGui,
+                "Gui": FreeCADGui,
+                "ObjectsFem": ObjectsFem,
+                "yield_gui": yield_gui,
+            }
+            self._sessions.put(session, namespace)
+        return namespace
+
+    def reset_session(self, session: str) -> bool:
+        return self._sessions.pop(session) is not None
+
+    def get(self, execution_id: str) -> Execution | None:
+        with self._lock:
+            return self._executions.get(execution_id)
+
+    def prepare(
+        self,
+        code: str,
+        session: str = "default",
+        time_limit: float | None = None,
+        cooperative: bool | None = None,
+    ):
+        """Compile `code` and return (execution, task); run the task on the GUI thread.
+
+        Raises SyntaxError before anything is queued. The task returns True on
+        success or an error string, like the `_*_gui` helpers, or None if a
+        cooperative script queued its next slice; wait on the execution then.
+        """
+        compiled = self.compile(code, cooperative)
+        time_limit = self.time_limit if time_limit is None else time_limit
+        execution = Execution(secrets.token_hex(8), session, time_limit or None, compiled.cooperative)
+        with self._lock:
+            self._executions[execution.id] = execution
+            self._prune()
+        return execution, lambda: self._run(execution, compiled)
+
+    def _prune(self):
+        # Forget the oldest finished executions; unfinished ones are still polled.
+        finished = [execution for execution in self._executions.values() if execution.finished]
+        for execution in finished[: max(0, len(self._executions) - self.max_executions)]:
+            del self._executions[execution.id]
+
+    def _run(self, execution: Execution, compiled: CompiledScript):
+        namespace = self.namespace(execution.session)
+        with execution.changed:
+            if execution.state != "queued":
+                return "Execution was cancelled before it started."
+            execution.state = "suspended"
+            execution.started_at = time.monotonic()
+        if execution.time_limit:
+            execution._watchdog = threading.Timer(
+                execution.time_limit,
+                execution.interrupt,
+                (f"time limit of {execution.time_limit} seconds exceeded",),
+            )
+            execution._watchdog.daemon = True
+            execution._watchdog.start()
+
+        if not compiled.cooperative:
+            return self._step(execution, lambda: exec(compiled.code, namespace) or True)
+        # Defines the wrapper function; the script body runs in the slices.
+        exec(compiled.code, namespace)
+        execution._generator = namespace.pop(COOPERATIVE_ENTRY)()
+        return self._slice(execution)
+
+    def _slice(self, execution: Execution):
+        def advance():
+            deadline = time.monotonic() + self.slice_seconds
+            for value in execution._generator:
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    execution.progress = float(value)
+                if time.monotonic() >= deadline:
+                    return False
+            return True
+
+        if execution._interrupt_reason is not None:
+            execution._generator.close()
+            return self._interrupted(execution)
+        execution.slices += 1
+        res = self._step(execution, advance)
+        if res is not False:
+            return res
+        try:
+            dispatcher.submit_gui_task(lambda: self._slice(execution))
+        except dispatcher.GuiQueueFull as e:
+            execution._generator.close()
+            message = f"Error executing Python code: {e}\n"
+            execution._finish("error", message)
+            return message
+        return None
+
+    def _step(self, execution: Execution, func):
+        """Run one stretch of the script with its output captured.
+
+        Returns True when the script finished, False when a cooperative
+        script has more slices to run, or an error string.
+        """
+        global _current_execution
+        thread_id = threading.get_ident()
+        stdout = _ThreadStream(execution.stdout, sys.stdout, thread_id)
+        stderr = _ThreadStream(execution.stderr, sys.stderr, thread_id)
+        with execution.changed:
+            execution.state = "running"
+            execution._thread_id = thread_id
+        _current_execution = execution
+        try:
+            try:
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    finished = func()
+            finally:
+                with execution.changed:
+                    # Stop the watchdog from raising into this thread, then drop
+                    # an interrupt that was raised but not yet delivered.
+                    execution._thread_id = None
+                    execution.state = "suspended"
+                    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id), None)
+                _current_execution = None
+        except ScriptInterrupted:
+            if execution._generator is not None:
+                execution._generator.close()
+            return self._interrupted(execution)
+        except Exception as e:
+            execution.stderr.write(traceback.format_exc())
+            message = f"Error executing Python code: {e}\n"
+            execution._finish("error", message)
+            FreeCAD.Console.PrintError(message)
+            return message
+        if not finished:
+            return False
+        execution._finish("done")
+        FreeCAD.Console.PrintMessage("Python code executed successfully.\n")
+        return True
+
+    def _interrupted(self, execution: Execution) -> str:
+        message = f"Execution interrupted: {execution._interrupt_reason}"
+        execution.stderr.write(message + "\n")
+        execution._finish("interrupted", message)
+        FreeCAD.Console.PrintError(message + "\n")
+        return message
+
+    def cancel(self, execution_id: str) -> bool:
+        execution = self.get(execution_id)
+        if execution is None:
+            return False
+        with execution.changed:
+            if execution.state == "queued":
+                if execution.future is not None:
+                    execution.future.cancel()
+                execution.state = "cancelled"
+                execution.finished_at = time.monotonic()
+                execution.error = "Execution was cancelled before it started."
+                execution.changed.notify_all()
+                return True
+        return execution.interrupt("cancelled")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "compiled": self._compiled.stats(),
+            "sessions": self._sessions.stats()["entries"],
+            "time_limit": self.time_limit,
+        }
@@ -0,0 +1,67 @@
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ObjectCursor:
+    """Position in a snapshot of a document's object names."""
+
+    doc_name: str
+    names: list[str]
+    fields: list[str] | None = None
+    shape_stats: bool = False
+    revision: int = 0
+    position: int = 0
+    touched_at: float = field(default_factory=time.monotonic)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def remaining(self) -> int:
+        return len(self.names) - self.position
+
+    def take(self, count: int) -> list[str]:
+        with self.lock:
+            names = self.names[self.position:self.position + count]
+            self.position += len(names)
+            self.touched_at = time.monotonic()
+            return names
+
+
+class CursorStore:
+    """Open cursors by id. Idle cursors expire; the oldest go first when full."""
+
+    def __init__(self, max_cursors: int = 64, ttl: float = 300.0):
+        self.max_cursors = max_cursors
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._cursors: dict[str, ObjectCursor] = {}
+
+    def open(self, cursor: ObjectCursor) -> str:
+        cursor_id = secrets.token_hex(8)
+        with self._lock:
+            self._expire()
+            while len(self._cursors) >= self.max_cursors:
+                oldest = min(self._cursors, key=lambda key: self._cursors[key].touched_at)
+                del self._cursors[oldest]
+            self._cursors[cursor_id] = cursor
+        return cursor_id
+
+    def get(self, cursor_id: str) -> ObjectCursor | None:
+        with self._lock:
+            self._expire()
+            return self._cursors.get(cursor_id)
+
+    def close(self, cursor_id: str) -> bool:
+        with self._lock:
+            return self._cursors.pop(cursor_id, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._cursors.clear()
+
+    def _expire(self):
+        deadline = time.monotonic() - self.ttl
+        for cursor_id in [k for k, c in self._cursors.items() if c.touched_at < deadline]:
+            del self._cursors[cursor_id]
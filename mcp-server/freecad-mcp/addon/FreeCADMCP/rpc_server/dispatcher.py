@@ -0,0 +1,213 @@
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from .metrics import activate, current_trace, record, registry
+
+try:
+    from PySide import QtCore
+except ImportError:
+    # FreeCADCmd without Qt: tasks run through `serve_tasks` instead.
+    QtCore = None
+
+# GUI task queue. Each entry carries its own Future, so concurrent callers
+# only ever see the result of the task they submitted.
+rpc_request_queue = queue.Queue()
+
+# Seconds an RPC caller waits for its GUI task before giving up.
+task_timeout = 120.0
+
+# Tasks allowed to wait for the GUI thread before new ones are rejected.
+# None means unbounded.
+max_queue_depth = None
+
+# Time a task spent waiting in the queue and time it spent running on the GUI thread.
+queue_wait_histogram = registry.histogram("queue_wait")
+gui_exec_histogram = registry.histogram("gui_exec")
+drain_histogram = registry.histogram(
+    "gui_drain", description="Time each drain of the GUI task queue held the Qt event loop."
+)
+drain_size_histogram = registry.histogram(
+    "gui_drain_size", (1, 2, 4, 8, 16, 32, 64, 128), unit="tasks", description="GUI tasks run per drain."
+)
+tasks_run = registry.counter("gui_tasks", "GUI tasks run.")
+tasks_skipped = registry.counter("gui_tasks_skipped", "GUI tasks skipped because their caller gave up.")
+tasks_rejected = registry.counter("gui_tasks_rejected", "GUI tasks rejected because the queue was full.")
+
+_waker = None
+_wake_lock = threading.Lock()
+_wake_pending = False
+
+
+class GuiQueueFull(Exception):
+    pass
+
+
+if QtCore is not None:
+
+    class _GuiWaker(QtCore.QObject):
+        """Lives in the GUI thread; a queued `wake` signal drains the task queue there."""
+
+        wake = QtCore.Signal()
+
+        def __init__(self):
+            super().__init__()
+            self.wake.connect(self.drain, QtCore.Qt.QueuedConnection)
+
+        @QtCore.Slot()
+        def drain(self):
+            process_gui_tasks()
+
+
+def set_task_timeout(seconds: float):
+    global task_timeout
+    task_timeout = seconds
+
+
+def get_task_timeout() -> float:
+    return task_timeout
+
+
+def set_max_queue_depth(depth: int | None):
+    global max_queue_depth
+    max_queue_depth = depth
+
+
+def install_dispatcher(headless: bool = False):
+    """Create the GUI-thread waker. Must be called from the GUI thread.
+
+    With `headless` there is no Qt event loop to wake; the thread that calls
+    `serve_tasks` runs the queued tasks instead.
+    """
+    global _waker
+    if _waker is None and not headless:
+        _waker = _GuiWaker()
+
+
+def submit_gui_task(task) -> Future:
+    """Queue `task` for the GUI thread and wake the dispatcher if it is idle."""
+    global _wake_pending
+    if max_queue_depth is not None and rpc_request_queue.qsize() >= max_queue_depth:
+        tasks_rejected.inc()
+        raise GuiQueueFull(
+            f"GUI task queue is full ({max_queue_depth} tasks waiting). Retry later."
+        )
+    future = Future()
+    # The task carries the caller's trace, so its stages are timed into it,
+    # unless the call already returned (e.g. a cooperative slice queued later).
+    trace = current_trace()
+    if trace is not None and trace.closed:
+        trace = None
+    rpc_request_queue.put((time.perf_counter(), task, future, trace))
+    if _waker is None:
+        # Headless: `serve_tasks` is blocked on the queue.
+        return future
+    with _wake_lock:
+        if not _wake_pending:
+            _wake_pending = True
+            _waker.wake.emit()
+    return future
+
+
+def run_gui_task(task, timeout: float | None = None):
+    """Run `task` on the GUI thread and wait for its result.
+
+    Timeouts, cancellation and exceptions raised by the task are returned as
+    error strings, like the failures reported by the `_*_gui` helpers.
+    """
+    timeout = task_timeout if timeout is None else timeout
+    try:
+        future = submit_gui_task(task)
+    except GuiQueueFull as e:
+        return str(e)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        # Not the builtin TimeoutError before Python 3.11.
+        if future.cancel():
+            return f"GUI task timed out after {timeout} seconds and was cancelled."
+        return f"GUI task did not finish within {timeout} seconds."
+    except CancelledError:
+        return "GUI task was cancelled."
+    except Exception as e:
+        return str(e)
+
+
+def cancel_pending_tasks() -> int:
+    """Cancel every task that has not started yet, releasing its caller."""
+    cancelled = 0
+    while True:
+        try:
+            _, _, future, _ = rpc_request_queue.get_nowait()
+        except queue.Empty:
+            return cancelled
+        if future.cancel():
+            cancelled += 1
+
+
+def process_gui_tasks():
+    global _wake_pending
+    # Clear the flag before draining so a task queued mid-drain re-arms the waker.
+    with _wake_lock:
+        _wake_pending = False
+    # Only run the tasks already queued: a task queued by one of them (such as
+    # the next slice of a cooperative script) waits for the next wake, so the
+    # Qt event loop gets to repaint and handle input in between.
+    started_at = time.perf_counter()
+    ran = 0
+    for _ in range(rpc_request_queue.qsize()):
+        try:
+            entry = rpc_request_queue.get_nowait()
+        except queue.Empty:
+            break
+        _run_task(*entry)
+        ran += 1
+    if ran:
+        drain_histogram.observe((time.perf_counter() - started_at) * 1000.0)
+        drain_size_histogram.observe(ran)
+
+
+def serve_tasks(stop: threading.Event, poll_interval: float = 0.1):
+    """Run queued tasks on the calling thread until `stop` is set.
+
+    The headless counterpart of the Qt waker: FreeCAD documents are not
+    thread-safe, so one thread still runs every task, in submission order.
+    """
+    while not stop.is_set():
+        try:
+            entry = rpc_request_queue.get(timeout=poll_interval)
+        except queue.Empty:
+            continue
+        _run_task(*entry)
+
+
+def _run_task(enqueued_at: float, task, future: Future, trace):
+    # Skip tasks whose caller already timed out or cancelled them.
+    if not future.set_running_or_notify_cancel():
+        tasks_skipped.inc()
+        return
+    started_at = time.perf_counter()
+    record("queue_wait", (started_at - enqueued_at) * 1000.0, trace)
+    with activate(trace):
+        try:
+            result, error = task(), None
+        except Exception as e:
+            result, error = None, e
+    # Record before resolving the future, so the caller sees the full trace.
+    record("gui_exec", (time.perf_counter() - started_at) * 1000.0, trace)
+    tasks_run.inc()
+    if error is None:
+        future.set_result(result)
+    else:
+        future.set_exception(error)
+
+
+def get_dispatch_stats() -> dict:
+    return {
+        "queue_depth": rpc_request_queue.qsize(),
+        "max_queue_depth": max_queue_depth,
+        "queue_wait": queue_wait_histogram.snapshot(),
+        "gui_exec": gui_exec_histogram.snapshot(),
+    }
@@ -0,0 +1,255 @@
+"""Read part metadata straight out of FCStd archives, without FreeCAD.
+
+An FCStd file is a zip holding `Document.xml`, one BREP file per shape and
+usually `thumbnails/Thumbnail.png`. The bounding box is computed from the
+vertices and circle/ellipse extents of the ASCII BREP files, so it is close
+to but not always exactly FreeCAD's own `Shape.BoundBox`. Binary BREP files
+(`*.bin`) are skipped.
+"""
+import math
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+THUMBNAIL_PATH = "thumbnails/Thumbnail.png"
+MAX_BREP_BYTES = 16 * 1024 * 1024
+
+# Index of App::Document.UnitSystem, in FreeCAD's order.
+UNIT_SYSTEMS = (
+    "Standard (mm, kg, s, degree)",
+    "MKS (m, kg, s, degree)",
+    "US customary (in, lb)",
+    "Imperial decimal (in, lb)",
+    "Building Euro (cm, m², m³)",
+    "Metric small parts & CNC (mm, mm/min)",
+    "Imperial for Civil Eng (ft, ft/s)",
+    "FEM (mm, N, s)",
+    "Meter decimal (m, m², m³)",
+    "Building US (ft-in, sqft, cft)",
+)
+
+_BREP_SECTION = re.compile(
+    r"^(Locations|Curve2ds|Curves|Polygon3D|PolygonOnTriangulations|Surfaces|Triangulations|TShapes) \d+$"
+)
+_IDENTITY = ((1.0, 0.0, 0.0, 0.0), (0.0, 1.0, 0.0, 0.0), (0.0, 0.0, 1.0, 0.0))
+
+
+def read_part_metadata(path: str) -> dict:
+    """Return the label, unit system, objects, bounding box and thumbnail of an FCStd file.
+
+    Raises `zipfile.BadZipFile` or `ET.ParseError` for files that are not
+    valid FCStd archives.
+    """
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        root = ET.fromstring(archive.read("Document.xml"))
+        gui_root = None
+        if "GuiDocument.xml" in names:
+            try:
+                gui_root = ET.fromstring(archive.read("GuiDocument.xml"))
+            except ET.ParseError:
+                pass
+
+        doc_props = _properties(root.find("Properties"))
+        unit_system = None
+        if "UnitSystem" in doc_props:
+            index = _int_value(doc_props["UnitSystem"])
+            if index is not None and 0 <= index < len(UNIT_SYSTEMS):
+                unit_system = UNIT_SYSTEMS[index]
+
+        types = {
+            obj.get("name"): obj.get("type")
+            for obj in root.iterfind("Objects/Object")
+        }
+        gui_visibility = _gui_visibility(gui_root)
+        objects, shape_files = [], []
+        for data in root.iterfind("ObjectData/Object"):
+            name = data.get("name")
+            props = _properties(data.find("Properties"))
+            label = _string_value(props.get("Label")) or name
+            visible = _bool_value(props.get("Visibility"))
+            if visible is None:
+                visible = gui_visibility.get(name, True)
+            objects.append({"name": name, "label": label, "type": types.get(name), "visible": visible})
+            shape = props.get("Shape")
+            part = shape.find("Part") if shape is not None else None
+            if part is not None and part.get("file") and visible:
+                shape_files.append(part.get("file"))
+
+        bound_box = None
+        for file_name in shape_files:
+            if not file_name.endswith(".brp") or file_name not in names:
+                continue
+            if archive.getinfo(file_name).file_size > MAX_BREP_BYTES:
+                continue
+            box = brep_bound_box(archive.read(file_name).decode("latin-1"))
+            if box is not None:
+                bound_box = box if bound_box is None else _union(bound_box, box)
+
+        thumbnail = archive.read(THUMBNAIL_PATH) if THUMBNAIL_PATH in names else None
+
+    return {
+        "label": _string_value(doc_props.get("Label")),
+        "unit_system": unit_system,
+        "objects": objects,
+        "bound_box": _describe_box(bound_box),
+        "thumbnail": thumbnail,
+    }
+
+
+def _properties(element) -> dict:
+    if element is None:
+        return {}
+    return {prop.get("name"): prop for prop in element.iterfind("Property")}
+
+
+def _string_value(prop) -> str | None:
+    node = prop.find("String") if prop is not None else None
+    return node.get("value") if node is not None else None
+
+
+def _int_value(prop) -> int | None:
+    node = prop.find("Integer")
+    try:
+        return int(node.get("value")) if node is not None else None
+    except ValueError:
+        return None
+
+
+def _bool_value(prop) -> bool | None:
+    node = prop.find("Bool") if prop is not None else None
+    return node.get("value") == "true" if node is not None else None
+
+
+def _gui_visibility(gui_root) -> dict[str, bool]:
+    if gui_root is None:
+        return {}
+    visibility = {}
+    for provider in gui_root.iterfind("ViewProviderData/ViewProvider"):
+        value = _bool_value(_properties(provider.find("Properties")).get("Visibility"))
+        if value is not None:
+            visibility[provider.get("name")] = value
+    return visibility
+
+
+def brep_bound_box(text: str) -> tuple[float, ...] | None:
+    """Approximate bounding box (xmin, ymin, zmin, xmax, ymax, zmax) of an ASCII BREP.
+
+    Uses the vertices plus the full extents of every circle and ellipse, placed
+    with the root shape's location. Returns None if the shape has no vertices.
+    """
+    lines = text.splitlines()
+    locations = _parse_locations(lines)
+    points = []
+    section = None
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        header = _BREP_SECTION.match(line)
+        if header:
+            section = header.group(1)
+        elif section == "Curves" and line[:2] in ("2 ", "3 "):
+            points.extend(_conic_extent_points(line))
+        elif section == "TShapes" and line == "Ve" and i + 2 < len(lines):
+            coords = lines[i + 2].split()
+            if len(coords) == 3:
+                points.append(tuple(float(c) for c in coords))
+            i += 2
+        i += 1
+    if not points:
+        return None
+
+    matrix = _IDENTITY
+    for line in reversed(lines):
+        parts = line.split()
+        if parts:
+            if len(parts) == 2 and parts[0][:1] in "+-" and parts[1].isdigit():
+                matrix = locations.get(int(parts[1]), _IDENTITY)
+            break
+    points = [_transform(matrix, p) for p in points]
+    return (
+        min(p[0] for p in points), min(p[1] for p in points), min(p[2] for p in points),
+        max(p[0] for p in points), max(p[1] for p in points), max(p[2] for p in points),
+    )
+
+
+def _conic_extent_points(line: str) -> list[tuple[float, float, float]]:
+    # "2 Px Py Pz Nx Ny Nz Xx Xy Xz Yx Yy Yz R" (circle) or "... R1 R2" (ellipse).
+    values = line.split()[1:]
+    if len(values) not in (13, 14):
+        return []
+    try:
+        values = [float(v) for v in values]
+    except ValueError:
+        return []
+    center, normal = values[0:3], values[3:6]
+    radius = max(values[12:])
+    extent = [radius * math.sqrt(max(0.0, 1.0 - n * n)) for n in normal]
+    return [
+        tuple(c - e for c, e in zip(center, extent)),
+        tuple(c + e for c, e in zip(center, extent)),
+    ]
+
+
+def _parse_locations(lines: list[str]) -> dict[int, tuple]:
+    locations: dict[int, tuple] = {}
+    start = next((i for i, line in enumerate(lines) if line.startswith("Locations ")), None)
+    if start is None:
+        return locations
+    count = int(lines[start].split()[1])
+    i = start + 1
+    for index in range(1, count + 1):
+        kind = lines[i].split()
+        if kind[0] == "1":
+            rows = tuple(tuple(float(v) for v in lines[i + k].split()) for k in (1, 2, 3))
+            locations[index] = rows
+            i += 4
+        else:
+            # "2  idx power  idx power ... 0": product of earlier locations.
+            refs = [int(v) for v in kind[1:]]
+            matrix = _IDENTITY
+            for ref, power in zip(refs[0::2], refs[1::2]):
+                base = locations.get(ref, _IDENTITY)
+                if power < 0:
+                    base = _invert(base)
+                for _ in range(abs(power)):
+                    matrix = _compose(matrix, base)
+            locations[index] = matrix
+            i += 1
+    return locations
+
+
+def _transform(m, p):
+    return tuple(m[r][0] * p[0] + m[r][1] * p[1] + m[r][2] * p[2] + m[r][3] for r in range(3))
+
+
+def _compose(a, b):
+    return tuple(
+        tuple(
+            sum(a[r][k] * b[k][c] for k in range(3)) + (a[r][3] if c == 3 else 0.0)
+            for c in range(4)
+        )
+        for r in range(3)
+    )
+
+
+def _invert(m):
+    # Rigid transforms only: the inverse rotation is the transpose.
+    rot = [[m[c][r] for c in range(3)] for r in range(3)]
+    t = [-sum(rot[r][k] * m[k][3] for k in range(3)) for r in range(3)]
+    return tuple(tuple(rot[r]) + (t[r],) for r in range(3))
+
+
+def _union(a, b):
+    return tuple(min(x, y) for x, y in zip(a[:3], b[:3])) + tuple(max(x, y) for x, y in zip(a[3:], b[3:]))
+
+
+def _describe_box(box):
+    if box is None:
+        return None
+    xmin, ymin, zmin, xmax, ymax, zmax = box
+    return {
+        "XMin": xmin, "YMin": ymin, "ZMin": zmin,
+        "XMax": xmax, "YMax": ymax, "ZMax": zmax,
+        "XLength": xmax - xmin, "YLength": ymax - ymin, "ZLength": zmax - zmin,
+    }
@@ -0,0 +1,111 @@
+import os
+import subprocess
+
+import FreeCAD
+
+from .dispatcher import run_gui_task
+from .jobs import Job
+from .metrics import timed_recompute
+
+
+def prepare_gmsh_mesh(doc_name: str, mesh_name: str):
+    """Write the Gmsh input files for a FemMeshGmsh object. Runs on the GUI thread.
+
+    Returns the GmshTools instance holding the paths and the Gmsh command, to
+    be passed to `run_gmsh` and `import_gmsh_mesh`.
+    """
+    from femmesh.gmshtools import GmshTools
+
+    doc = FreeCAD.getDocument(doc_name)
+    mesh_obj = doc.getObject(mesh_name)
+    if mesh_obj is None:
+        raise ValueError(f"Mesh object '{mesh_name}' not found in '{doc_name}'.")
+    if mesh_obj.Part is None:
+        raise ValueError(f"Mesh object '{mesh_name}' has no Part to mesh.")
+    tools = GmshTools(mesh_obj)
+    if hasattr(tools, "prepare"):
+        # Everything create_mesh() does before running Gmsh.
+        tools.prepare()
+        if not os.path.exists(tools.temp_file_geo):
+            _write_gmsh_input_files(tools)
+    else:
+        # Older GmshTools have no prepare(); repeat the steps of their create_mesh().
+        if hasattr(tools, "start_logs"):
+            tools.start_logs()
+        tools.get_dimension()
+        tools.get_tmp_file_paths()
+        tools.get_gmsh_command()
+        tools.get_group_data()
+        tools.get_region_data()
+        tools.get_boundary_layer_data()
+        _write_gmsh_input_files(tools)
+    return tools
+
+
+def _write_gmsh_input_files(tools):
+    if hasattr(tools, "write_gmsh_input_files"):
+        tools.write_gmsh_input_files()
+    else:
+        tools.write_part_file()
+        tools.write_geo()
+
+
+def run_gmsh(tools, job: Job | None = None) -> str:
+    """Run Gmsh on the files written by `prepare_gmsh_mesh` and return its warnings.
+
+    Needs no document access, so it runs in a job thread. Cancelling the job
+    kills the Gmsh process.
+    """
+    command = [tools.gmsh_bin, "-", tools.temp_file_geo]
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise RuntimeError(f"Could not start Gmsh '{tools.gmsh_bin}': {e}") from e
+    if job is not None:
+        job.on_cancel(process.kill)
+    _, stderr = process.communicate()
+    if job is not None:
+        job.check_cancelled()
+    error = stderr.decode("utf-8", "replace").strip()
+    if process.returncode != 0:
+        raise RuntimeError(error or f"Gmsh exited with code {process.returncode}.")
+    return error
+
+
+def import_gmsh_mesh(doc_name: str, mesh_name: str, tools) -> dict:
+    """Load the mesh Gmsh wrote into the mesh object. Runs on the GUI thread."""
+    tools.read_and_set_new_mesh()
+    doc = FreeCAD.getDocument(doc_name)
+    timed_recompute(doc)
+    fem_mesh = doc.getObject(mesh_name).FemMesh
+    FreeCAD.Console.PrintMessage(f"FEM Mesh '{mesh_name}' generated successfully in '{doc_name}'.\n")
+    return {
+        "mesh": mesh_name,
+        "nodes": fem_mesh.NodeCount,
+        "edges": fem_mesh.EdgeCount,
+        "faces": fem_mesh.FaceCount,
+        "volumes": fem_mesh.VolumeCount,
+    }
+
+
+def gmsh_mesh_job(doc_name: str, mesh_name: str):
+    """Job function meshing `mesh_name`: only the file writing and the import use the GUI thread."""
+
+    def job_func(job: Job) -> dict:
+        job.update(progress=0.0, message="Writing Gmsh input files")
+        tools = run_gui_task(lambda: prepare_gmsh_mesh(doc_name, mesh_name))
+        if isinstance(tools, str):
+            raise RuntimeError(tools)
+        job.check_cancelled()
+        job.update(progress=0.1, message="Running Gmsh")
+        warnings = run_gmsh(tools, job)
+        job.update(progress=0.9, message="Importing mesh")
+        res = run_gui_task(lambda: import_gmsh_mesh(doc_name, mesh_name, tools))
+        if isinstance(res, str):
+            raise RuntimeError(res)
+        job.update(progress=1.0, message="Mesh imported")
+        if warnings:
+            res["warnings"] = warnings
+        return res
+
+    return job_func
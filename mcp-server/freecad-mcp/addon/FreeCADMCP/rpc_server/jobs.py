@@ -0,0 +1,219 @@
+import json
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable
+
+FINISHED_STATES = ("done", "error", "cancelled")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    """A long-running operation tracked by id. `state` goes queued -> running -> done | error | cancelled."""
+
+    id: str
+    kind: str
+    params: dict[str, Any]
+    state: str = "queued"
+    progress: float | None = None
+    message: str | None = None
+    result: Any = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    _on_cancel: list = field(default_factory=list, repr=False)
+    _future: Any = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def update(self, progress: float | None = None, message: str | None = None):
+        if progress is not None:
+            self.progress = progress
+        if message is not None:
+            self.message = message
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job was cancelled; call between steps."""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def on_cancel(self, callback: Callable[[], None]):
+        """Run `callback` (e.g. killing a subprocess) when the job is cancelled."""
+        self._on_cancel.append(callback)
+        if self.cancel_event.is_set():
+            callback()
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {
+            f.name: getattr(self, f.name)
+            for f in fields(self)
+            if not f.name.startswith("_") and f.name != "cancel_event"
+        }
+        data["finished"] = self.finished
+        return data
+
+
+class JobManager:
+    """Runs jobs on a bounded thread pool and keeps their results.
+
+    Job functions run off the GUI thread and take the Job as their only
+    argument; they use `run_gui_task` for the steps that touch the document.
+    Finished jobs are written as JSON to `results_dir` (the newest
+    `max_persisted` are kept), so results survive a server restart.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        results_dir: str | None = None,
+        max_jobs: int = 256,
+        max_persisted: int = 500,
+    ):
+        self.max_concurrent = max_concurrent
+        self.results_dir = results_dir
+        self.max_jobs = max_jobs
+        self.max_persisted = max_persisted
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Job] = {}
+        self._executor: ThreadPoolExecutor | None = None
+
+    def configure(self, max_concurrent: int | None = None, results_dir: str | None = None):
+        with self._lock:
+            if max_concurrent is not None and max_concurrent != self.max_concurrent:
+                self.max_concurrent = max_concurrent
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                    self._executor = None
+            if results_dir is not None:
+                self.results_dir = results_dir
+
+    def submit(self, kind: str, func: Callable[[Job], Any], params: dict[str, Any] | None = None) -> Job:
+        job = Job(secrets.token_hex(8), kind, params or {})
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent, thread_name_prefix="FreeCADMCPJob"
+                )
+            self._jobs[job.id] = job
+            self._prune()
+            job._future = self._executor.submit(self._run, job, func)
+        return job
+
+    def get(self, job_id: str) -> Job | dict[str, Any] | None:
+        """The live Job, or the persisted dict of a job from an earlier run, or None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        path = self._result_path(job_id)
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def list(self) -> list[dict[str, Any]]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [
+            {"id": job.id, "kind": job.kind, "state": job.state, "created_at": job.created_at}
+            for job in jobs
+        ]
+
+    def cancel(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_event.set()
+        if job._future is not None and job._future.cancel():
+            self._finish(job, "cancelled", error="Job was cancelled before it started.")
+            return True
+        for callback in job._on_cancel:
+            try:
+                callback()
+            except Exception:
+                pass
+        return True
+
+    def shutdown(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+            executor, self._executor = self._executor, None
+        for job in jobs:
+            if not job.finished:
+                self.cancel(job.id)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            states: dict[str, int] = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+        return {"max_concurrent": self.max_concurrent, "jobs": states}
+
+    def _run(self, job: Job, func: Callable[[Job], Any]):
+        if job.cancel_event.is_set():
+            self._finish(job, "cancelled", error="Job was cancelled before it started.")
+            return
+        job.state = "running"
+        job.started_at = time.time()
+        try:
+            result = func(job)
+        except JobCancelled:
+            self._finish(job, "cancelled", error="Job was cancelled.")
+        except Exception as e:
+            state = "cancelled" if job.cancel_event.is_set() else "error"
+            self._finish(job, state, error=str(e))
+        else:
+            self._finish(job, "done", result=result)
+
+    def _finish(self, job: Job, state: str, result: Any = None, error: str | None = None):
+        if job.finished:
+            return
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.state = state
+        self._persist(job)
+
+    def _result_path(self, job_id: str) -> str | None:
+        if not self.results_dir or not all(c in "0123456789abcdef" for c in job_id):
+            return None
+        return os.path.join(self.results_dir, f"{job_id}.json")
+
+    def _persist(self, job: Job):
+        path = self._result_path(job.id)
+        if path is None:
+            return
+        try:
+            os.makedirs(self.results_dir, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(job.to_dict(), f, default=str)
+            os.replace(tmp_path, path)
+            results = sorted(
+                (entry for entry in os.scandir(self.results_dir) if entry.name.endswith(".json")),
+                key=lambda entry: entry.stat().st_mtime,
+            )
+            for entry in results[: max(0, len(results) - self.max_persisted)]:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+    def _prune(self):
+        # Forget the oldest finished jobs; their results stay on disk.
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[: max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job.id]
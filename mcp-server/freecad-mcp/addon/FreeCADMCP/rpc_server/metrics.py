@@ -0,0 +1,388 @@
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds (milliseconds) of the latency buckets. The last bucket is +Inf.
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Upper bounds (bytes) of the response size buckets.
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Stages of an RPC call. Each has a histogram, and a call's trace adds up the
+# time it spent in each: waiting for and running on the GUI thread,
+# recomputing, serializing objects, (un)marshalling XML-RPC and screenshots.
+STAGES = ("queue_wait", "gui_exec", "recompute", "serialize", "marshal", "screenshot")
+
+# Longest error message kept in a trace.
+TRACE_ERROR_CHARS = 200
+
+
+class Histogram:
+    """Thread-safe, fixed-bucket histogram, in milliseconds unless `unit` says otherwise."""
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS, unit: str = "ms"):
+        self._bounds = tuple(buckets_ms)
+        self.unit = unit
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * (len(self._bounds) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._min = None
+            self._max = None
+
+    def observe(self, value_ms: float):
+        index = bisect.bisect_left(self._bounds, value_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value_ms
+            if self._min is None or value_ms < self._min:
+                self._min = value_ms
+            if self._max is None or value_ms > self._max:
+                self._max = value_ms
+
+    def _percentile(self, counts, count, q: float):
+        # Linear interpolation inside the bucket holding the q-th observation.
+        if count == 0:
+            return None
+        rank = q * count
+        seen = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(counts):
+            upper = self._bounds[index] if index < len(self._bounds) else self._max
+            if bucket_count and seen + bucket_count >= rank:
+                fraction = (rank - seen) / bucket_count
+                return min(lower + (upper - lower) * fraction, self._max)
+            seen += bucket_count
+            lower = upper if index < len(self._bounds) else lower
+        return self._max
+
+    def snapshot(self) -> dict:
+        unit = self.unit
+        with self._lock:
+            counts = list(self._counts)
+            count = self._count
+            total = self._sum
+            low = self._min
+            high = self._max
+            buckets = []
+            cumulative = 0
+            for index, bucket_count in enumerate(counts):
+                cumulative += bucket_count
+                le = str(self._bounds[index]) if index < len(self._bounds) else "+Inf"
+                buckets.append({f"le_{unit}": le, "count": cumulative})
+            return {
+                "count": count,
+                f"sum_{unit}": total,
+                f"min_{unit}": low,
+                f"max_{unit}": high,
+                f"mean_{unit}": total / count if count else None,
+                f"p50_{unit}": self._percentile(counts, count, 0.50),
+                f"p95_{unit}": self._percentile(counts, count, 0.95),
+                f"p99_{unit}": self._percentile(counts, count, 0.99),
+                "buckets": buckets,
+            }
+
+
+class Counter:
+    """Thread-safe count that only goes up until `reset`."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def reset(self):
+        with self._lock:
+            self.value = 0
+
+
+class Trace:
+    """Timings of one RPC call.
+
+    While the call runs, its trace is the current trace of the handling
+    thread and, for each GUI task it submits, of the GUI thread running that
+    task; `record` adds stage times to it. Once `MetricsRegistry.finish` has
+    closed it, work the call left behind (cooperative slices, code started
+    with `start_code`) is no longer timed into it.
+    """
+
+    __slots__ = ("method", "started_at", "duration_ms", "stages", "ok", "error", "response_bytes", "closed")
+
+    def __init__(self, method: str | None = None):
+        self.method = method
+        self.started_at = time.time()
+        self.duration_ms = None
+        self.stages = {}
+        self.ok = True
+        self.error = None
+        self.response_bytes = None
+        self.closed = False
+
+    def add(self, stage: str, ms: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + ms
+
+    def fail(self, error):
+        self.ok = False
+        self.error = str(error)[:TRACE_ERROR_CHARS]
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "stages_ms": dict(self.stages),
+            "ok": self.ok,
+            "error": self.error,
+            "response_bytes": self.response_bytes,
+        }
+
+
+class TraceBuffer:
+    """Ring buffer of the most recent traces; the oldest are dropped."""
+
+    def __init__(self, size: int = 256):
+        self._lock = threading.Lock()
+        self._traces = deque(maxlen=size)
+
+    def resize(self, size: int):
+        with self._lock:
+            self._traces = deque(self._traces, maxlen=size)
+
+    def append(self, trace: Trace):
+        with self._lock:
+            self._traces.append(trace)
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+    def recent(self, limit: int | None = None, method: str | None = None, min_ms: float = 0.0) -> list[dict]:
+        """Newest first, optionally only calls of `method` or slower than `min_ms`."""
+        with self._lock:
+            traces = list(self._traces)
+        result = []
+        for trace in reversed(traces):
+            if limit is not None and len(result) >= limit:
+                break
+            if method is not None and trace.method != method:
+                continue
+            if (trace.duration_ms or 0.0) < min_ms:
+                continue
+            result.append(trace.to_dict())
+        return result
+
+
+class MethodMetrics:
+    def __init__(self):
+        self.calls = Counter()
+        self.errors = Counter()
+        self.latency = Histogram()
+        self.response_bytes = Histogram(SIZE_BUCKETS_BYTES, unit="bytes")
+
+
+class MetricsRegistry:
+    """Per-method call counts, errors, latencies and response sizes, named
+    histograms and counters, and a ring buffer of recent traces."""
+
+    def __init__(self, trace_size: int = 256):
+        self.enabled = True
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._methods: dict[str, MethodMetrics] = {}
+        self._histograms: dict[str, Histogram] = {}
+        self._counters: dict[str, Counter] = {}
+        self._descriptions: dict[str, str] = {}
+        self.traces = TraceBuffer(trace_size)
+
+    def histogram(self, name: str, buckets=DEFAULT_BUCKETS_MS, unit: str = "ms", description: str = "") -> Histogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram(buckets, unit))
+                self._descriptions.setdefault(name, description)
+        return histogram
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        counter = self._counters.get(name)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(name, Counter())
+                self._descriptions.setdefault(name, description)
+        return counter
+
+    def method(self, name: str) -> MethodMetrics:
+        metrics = self._methods.get(name)
+        if metrics is None:
+            with self._lock:
+                metrics = self._methods.setdefault(name, MethodMetrics())
+        return metrics
+
+    def finish(self, trace: Trace):
+        """Count a completed call and keep its trace."""
+        trace.closed = True
+        metrics = self.method(trace.method or "unknown")
+        metrics.calls.inc()
+        if not trace.ok:
+            metrics.errors.inc()
+        metrics.latency.observe(trace.duration_ms)
+        if trace.response_bytes is not None:
+            metrics.response_bytes.observe(trace.response_bytes)
+        self.traces.append(trace)
+
+    def reset(self):
+        """Forget the per-method metrics and the traces.
+
+        Named histograms and counters, such as the dispatcher's queue_wait and
+        gui_exec that `get_dispatch_stats` also reports, stay cumulative.
+        """
+        with self._lock:
+            methods = list(self._methods.values())
+        for metrics in methods:
+            metrics.calls.reset()
+            metrics.errors.reset()
+            metrics.latency.reset()
+            metrics.response_bytes.reset()
+        self.traces.clear()
+        self.started_at = time.time()
+
+    def snapshot(self, traces: int = 0, gauges: dict | None = None) -> dict:
+        with self._lock:
+            methods = dict(self._methods)
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+        return {
+            "since": self.started_at,
+            "methods": {
+                name: {
+                    "calls": metrics.calls.value,
+                    "errors": metrics.errors.value,
+                    "latency": metrics.latency.snapshot(),
+                    "response_bytes": metrics.response_bytes.snapshot(),
+                }
+                for name, metrics in sorted(methods.items())
+            },
+            "histograms": {name: histogram.snapshot() for name, histogram in sorted(histograms.items())},
+            "counters": {name: counter.value for name, counter in sorted(counters.items())},
+            "gauges": dict(gauges or {}),
+            "traces": self.traces.recent(traces) if traces else [],
+        }
+
+    def prometheus(self, gauges: dict | None = None, labels: dict | None = None) -> str:
+        """Everything but the traces in the Prometheus text exposition format.
+
+        `labels` are added to every sample, e.g. {"worker": "9876"}.
+        """
+        labels = labels or {}
+        lines = []
+        with self._lock:
+            methods = sorted(self._methods.items())
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        _family(lines, "freecad_mcp_rpc_calls_total", "counter", "RPC calls by method.")
+        for name, metrics in methods:
+            lines.append(_sample("freecad_mcp_rpc_calls_total", labels, method=name, value=metrics.calls.value))
+        _family(lines, "freecad_mcp_rpc_errors_total", "counter", "RPC calls that raised or returned success=False.")
+        for name, metrics in methods:
+            lines.append(_sample("freecad_mcp_rpc_errors_total", labels, method=name, value=metrics.errors.value))
+        _family(lines, "freecad_mcp_rpc_duration_ms", "histogram", "RPC call latency in milliseconds.")
+        for name, metrics in methods:
+            _histogram_samples(lines, "freecad_mcp_rpc_duration_ms", metrics.latency, dict(labels, method=name))
+        _family(lines, "freecad_mcp_rpc_response_bytes", "histogram", "Size of marshalled RPC responses.")
+        for name, metrics in methods:
+            _histogram_samples(lines, "freecad_mcp_rpc_response_bytes", metrics.response_bytes, dict(labels, method=name))
+
+        _family(lines, "freecad_mcp_stage_duration_ms", "histogram", "Time spent in each stage of RPC calls.")
+        for name, histogram in histograms:
+            if name in STAGES:
+                _histogram_samples(lines, "freecad_mcp_stage_duration_ms", histogram, dict(labels, stage=name))
+        for name, histogram in histograms:
+            if name not in STAGES:
+                family = f"freecad_mcp_{name}_{histogram.unit}"
+                _family(lines, family, "histogram", self._descriptions.get(name) or f"{name} in {histogram.unit}.")
+                _histogram_samples(lines, family, histogram, labels)
+        for name, counter in counters:
+            family = f"freecad_mcp_{name}_total"
+            _family(lines, family, "counter", self._descriptions.get(name) or f"{name}.")
+            lines.append(_sample(family, labels, value=counter.value))
+        for name, value in sorted((gauges or {}).items()):
+            family = f"freecad_mcp_{name}"
+            _family(lines, family, "gauge", f"Current {name.replace('_', ' ')}.")
+            lines.append(_sample(family, labels, value=value))
+        return "\n".join(lines) + "\n"
+
+
+def _family(lines: list[str], name: str, kind: str, help_text: str):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(name: str, labels: dict, value, **extra) -> str:
+    pairs = dict(labels, **extra)
+    label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in pairs.items())
+    return f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}"
+
+
+def _histogram_samples(lines: list[str], name: str, histogram: Histogram, labels: dict):
+    snapshot = histogram.snapshot()
+    for bucket in snapshot["buckets"]:
+        lines.append(_sample(f"{name}_bucket", labels, le=bucket[f"le_{histogram.unit}"], value=bucket["count"]))
+    lines.append(_sample(f"{name}_sum", labels, value=snapshot[f"sum_{histogram.unit}"]))
+    lines.append(_sample(f"{name}_count", labels, value=snapshot["count"]))
+
+
+registry = MetricsRegistry()
+
+_local = threading.local()
+
+
+def current_trace() -> Trace | None:
+    return getattr(_local, "trace", None)
+
+
+@contextmanager
+def activate(trace: Trace | None):
+    """Make `trace` the calling thread's current trace for the block."""
+    previous = getattr(_local, "trace", None)
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+
+def record(stage: str, ms: float, trace: Trace | None = None):
+    """Observe `ms` in the stage's histogram and add it to `trace`, by default the current one."""
+    registry.histogram(stage).observe(ms)
+    if trace is None:
+        trace = current_trace()
+    if trace is not None and not trace.closed:
+        trace.add(stage, ms)
+
+
+@contextmanager
+def timed(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, (time.perf_counter() - start) * 1000.0)
+
+
+def timed_recompute(doc):
+    with timed("recompute"):
+        return doc.recompute()
@@ -0,0 +1,122 @@
+import contextlib
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+
+import FreeCAD
+
+from .cache import LRUCache
+
+
+@dataclass
+class PartTemplate:
+    """A library part kept open in a hidden document."""
+
+    doc: FreeCAD.Document
+    doc_name: str
+    mtime: float
+    size: int
+    # Temporary copy the document was opened from, when the user had the part open.
+    copy_path: str | None = None
+
+
+def _same_file(file_name: str, path: str) -> bool:
+    try:
+        return bool(file_name) and os.path.samefile(file_name, path)
+    except OSError:
+        return False
+
+
+class PartTemplateCache:
+    """Hidden template documents for library parts, so repeated inserts skip the file.
+
+    A template is reloaded when the file's mtime or size changes. The least
+    recently used template document is closed once `max_templates` are open.
+    Must be used from the GUI thread, since it opens and closes documents.
+
+    FreeCAD hands back the already open document when a file is opened
+    twice, so a part the user has open is loaded from a temporary copy;
+    a document the cache did not open itself is never registered or closed.
+    """
+
+    def __init__(self, max_templates: int = 16):
+        self._templates = LRUCache(max_entries=max_templates, on_evict=self._close)
+        self._doc_names: set[str] = set()
+
+    def is_template(self, doc_name: str) -> bool:
+        return doc_name in self._doc_names
+
+    def _close(self, path: str, template: PartTemplate):
+        self._doc_names.discard(template.doc_name)
+        try:
+            FreeCAD.closeDocument(template.doc_name)
+        except Exception:
+            # Already closed by the user.
+            pass
+        if template.copy_path is not None:
+            with contextlib.suppress(OSError):
+                os.remove(template.copy_path)
+
+    def get(self, path: str) -> FreeCAD.Document:
+        stat = os.stat(path)
+        template = self._templates.get(path)
+        if template is not None:
+            if (
+                template.mtime == stat.st_mtime
+                and template.size == stat.st_size
+                and template.doc_name in FreeCAD.listDocuments()
+            ):
+                return template.doc
+            self._templates.pop(path)
+            self._close(path, template)
+        open_docs = FreeCAD.listDocuments()
+        copy_path = None
+        if any(_same_file(doc.FileName, path) for doc in open_docs.values()):
+            fd, copy_path = tempfile.mkstemp(suffix=os.path.splitext(path)[1])
+            os.close(fd)
+            shutil.copyfile(path, copy_path)
+        try:
+            doc = FreeCAD.openDocument(copy_path or path, hidden=True)
+        except Exception:
+            if copy_path is not None:
+                os.remove(copy_path)
+            raise
+        if doc.Name in open_docs:
+            # Not ours to keep or close.
+            if copy_path is not None:
+                os.remove(copy_path)
+            return doc
+        self._doc_names.add(doc.Name)
+        self._templates.put(path, PartTemplate(doc, doc.Name, stat.st_mtime, stat.st_size, copy_path))
+        return doc
+
+    def insert(
+        self,
+        path: str,
+        target: FreeCAD.Document,
+        placement: FreeCAD.Placement | None = None,
+    ) -> list[FreeCAD.DocumentObject]:
+        """Copy the part's objects into `target` and return the copies.
+
+        `placement` is applied on top of the placement of the part's top-level objects.
+        """
+        template = self.get(path)
+        sources = list(template.Objects)
+        copies = target.copyObject(sources, False)
+        if not isinstance(copies, (list, tuple)):
+            copies = [copies]
+        for source, copy in zip(sources, copies):
+            source_view = getattr(source, "ViewObject", None)
+            copy_view = getattr(copy, "ViewObject", None)
+            if source_view is not None and copy_view is not None:
+                copy_view.Visibility = source_view.Visibility
+            if placement is not None and not source.InList and hasattr(copy, "Placement"):
+                copy.Placement = placement.multiply(copy.Placement)
+        return list(copies)
+
+    def clear(self):
+        self._templates.clear()
+
+    def stats(self) -> dict:
+        return self._templates.stats()
@@ -0,0 +1,428 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from .fcstd_metadata import read_part_metadata
+
+# Bump when SCHEMA changes; an index with another version is rebuilt.
+SCHEMA_VERSION = 2
+INDEX_BATCH_SIZE = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+CREATE TABLE IF NOT EXISTS parts (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    search_text TEXT NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parts_dir ON parts (dir);
+CREATE TABLE IF NOT EXISTS part_dimensions (
+    path TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS part_dimensions_path ON part_dimensions (path);
+CREATE INDEX IF NOT EXISTS part_dimensions_value ON part_dimensions (value);
+CREATE TABLE IF NOT EXISTS part_metadata (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    label TEXT,
+    unit_system TEXT,
+    objects TEXT,
+    bound_box TEXT,
+    keywords TEXT NOT NULL DEFAULT '',
+    has_thumbnail INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS part_thumbnails (
+    path TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+"""
+
+_NAME_SEPARATORS = re.compile(r"[\s_\-()\[\],;+]+")
+_DIMENSION_TOKEN = re.compile(r"^(?:m|d|r|ø)?(\d+(?:\.\d+)?(?:x\d+(?:\.\d+)?)*)(?:mm)?$")
+
+
+def parse_dimensions(name: str) -> list[float]:
+    """Pull nominal sizes out of a part name: "ISO4017 M6x20" -> [6.0, 20.0].
+
+    Only tokens that are entirely a size are used, so standard numbers such
+    as "ISO4017" or "DIN912" are not mistaken for dimensions.
+    """
+    values = []
+    for token in _NAME_SEPARATORS.split(name.lower()):
+        match = _DIMENSION_TOKEN.match(token.replace(",", "."))
+        if match:
+            values.extend(float(v) for v in match.group(1).split("x"))
+    return values
+
+
+def _parent(rel_dir: str) -> str | None:
+    if rel_dir == "":
+        return None
+    return os.path.dirname(rel_dir)
+
+
+class PartsCatalog:
+    """SQLite index of the FCStd files in a parts library.
+
+    `refresh` walks the library and only lists directories whose mtime
+    changed since the last walk, so keeping the index current costs one
+    `stat` per directory. Overwriting a file in place does not change its
+    directory's mtime, so every `restat_interval` seconds, on the first
+    refresh and on `refresh(force=True)` the files of unchanged directories
+    are stat'ed as well; an overwritten part shows up after the next of
+    those. Paths are stored relative to the library root with "/" separators.
+
+    Part metadata (labels, objects, bounding box, thumbnail) is read from the
+    FCStd archives by a background thread after each refresh, so searches
+    never wait for it; `part_info` reads a single part on demand.
+    """
+
+    def __init__(
+        self, library_path: str, db_path: str, refresh_interval: float = 30.0, restat_interval: float = 600.0
+    ):
+        self.library_path = library_path
+        self.db_path = db_path
+        self.refresh_interval = refresh_interval
+        self.restat_interval = restat_interval
+        self._lock = threading.Lock()
+        self._refreshed_at: float | None = None
+        self._restated_at: float | None = None
+        self._conn: sqlite3.Connection | None = None
+        self._indexer: threading.Thread | None = None
+        self._stop_indexing = threading.Event()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+                for table in tables:
+                    conn.execute(f'DROP TABLE "{table}"')
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        self._stop_indexing.set()
+        if self._indexer is not None:
+            self._indexer.join()
+            self._indexer = None
+        self._stop_indexing.clear()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._refreshed_at = None
+            self._restated_at = None
+
+    def refresh(self, force: bool = False) -> dict[str, int]:
+        """Bring the index up to date.
+
+        Returns how many directories were rescanned and how many parts in
+        unchanged directories were found overwritten.
+        """
+        if not os.path.isdir(self.library_path):
+            raise FileNotFoundError(f"Not found: {self.library_path}")
+        with self._lock:
+            conn = self._connect()
+            now = time.monotonic()
+            if (
+                not force
+                and self._refreshed_at is not None
+                and now - self._refreshed_at < self.refresh_interval
+            ):
+                return {"scanned": 0, "changed": 0}
+            first_refresh = self._refreshed_at is None
+            restat = self._restated_at is None or now - self._restated_at >= self.restat_interval
+            scanned = changed = 0
+            with conn:
+                pending = [""]
+                while pending:
+                    rel_dir = pending.pop()
+                    children = self._refresh_dir(conn, rel_dir, force)
+                    if children is None:
+                        if restat:
+                            changed += self._restat_files(conn, rel_dir)
+                        children = [row[0] for row in conn.execute(
+                            "SELECT path FROM dirs WHERE parent = ?", (rel_dir,)
+                        )]
+                    else:
+                        scanned += 1
+                    pending.extend(children)
+                if scanned:
+                    for table in ("part_metadata", "part_thumbnails"):
+                        conn.execute(f"DELETE FROM {table} WHERE path NOT IN (SELECT path FROM parts)")
+            self._refreshed_at = time.monotonic()
+            if restat:
+                self._restated_at = self._refreshed_at
+        if scanned or changed or first_refresh:
+            self.start_indexing()
+        return {"scanned": scanned, "changed": changed}
+
+    def _refresh_dir(self, conn: sqlite3.Connection, rel_dir: str, force: bool) -> list[str] | None:
+        """Rescan `rel_dir` if it changed. Returns its subdirectories, or None if unchanged."""
+        abs_dir = os.path.join(self.library_path, *rel_dir.split("/")) if rel_dir else self.library_path
+        try:
+            mtime = os.stat(abs_dir).st_mtime
+        except OSError:
+            self._remove_tree(conn, rel_dir)
+            return []
+        row = conn.execute("SELECT mtime FROM dirs WHERE path = ?", (rel_dir,)).fetchone()
+        if row is not None and row[0] == mtime and not force:
+            return None
+
+        subdirs, files = [], []
+        with os.scandir(abs_dir) as entries:
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir():
+                    subdirs.append(rel_path)
+                elif entry.name.endswith(".FCStd"):
+                    files.append((rel_path, entry.name, entry.stat().st_mtime))
+
+        known = {row[0] for row in conn.execute("SELECT path FROM dirs WHERE parent = ?", (rel_dir,))}
+        for gone in known.difference(subdirs):
+            self._remove_tree(conn, gone)
+
+        conn.execute(
+            "DELETE FROM part_dimensions WHERE path IN (SELECT path FROM parts WHERE dir = ?)",
+            (rel_dir,),
+        )
+        conn.execute("DELETE FROM parts WHERE dir = ?", (rel_dir,))
+        for rel_path, file_name, file_mtime in files:
+            name = file_name[: -len(".FCStd")]
+            conn.execute(
+                "INSERT INTO parts (path, dir, name, category, search_text, mtime) VALUES (?, ?, ?, ?, ?, ?)",
+                (rel_path, rel_dir, name, rel_dir, rel_path.lower(), file_mtime),
+            )
+            conn.executemany(
+                "INSERT INTO part_dimensions (path, value) VALUES (?, ?)",
+                [(rel_path, value) for value in parse_dimensions(name)],
+            )
+        conn.execute(
+            "INSERT OR REPLACE INTO dirs (path, parent, mtime) VALUES (?, ?, ?)",
+            (rel_dir, _parent(rel_dir), mtime),
+        )
+        return subdirs
+
+    def _restat_files(self, conn: sqlite3.Connection, rel_dir: str) -> int:
+        """Update the mtime of parts in `rel_dir` overwritten in place, so they are indexed again."""
+        changed = 0
+        for rel_path, mtime in conn.execute("SELECT path, mtime FROM parts WHERE dir = ?", (rel_dir,)).fetchall():
+            try:
+                file_mtime = os.stat(os.path.join(self.library_path, *rel_path.split("/"))).st_mtime
+            except OSError:
+                # Removing a file changes the directory's mtime; the next refresh drops it.
+                continue
+            if file_mtime != mtime:
+                conn.execute("UPDATE parts SET mtime = ? WHERE path = ?", (file_mtime, rel_path))
+                changed += 1
+        return changed
+
+    def _remove_tree(self, conn: sqlite3.Connection, rel_dir: str):
+        pattern = rel_dir.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "/%"
+        conn.execute(
+            "DELETE FROM part_dimensions WHERE path IN "
+            "(SELECT path FROM parts WHERE dir = ? OR dir LIKE ? ESCAPE '\\')",
+            (rel_dir, pattern),
+        )
+        conn.execute("DELETE FROM parts WHERE dir = ? OR dir LIKE ? ESCAPE '\\'", (rel_dir, pattern))
+        conn.execute("DELETE FROM dirs WHERE path = ? OR path LIKE ? ESCAPE '\\'", (rel_dir, pattern))
+
+    def search(
+        self,
+        query: str = "",
+        category: str | None = None,
+        dimension: float | None = None,
+        tolerance: float = 0.01,
+        offset: int = 0,
+        limit: int | None = 20,
+    ) -> dict:
+        """Find parts whose path or labels contain every word of `query`.
+
+        `category` matches the start of the part's folder (case-insensitive),
+        and `dimension` keeps parts with a nominal size within `tolerance`.
+        Matches in the file name rank above matches in the folder path.
+        """
+        self.refresh()
+        words = [w for w in query.lower().split() if w]
+        where, params = [], []
+        for word in words:
+            where.append("instr(parts.search_text || ' ' || coalesce(m.keywords, ''), ?) > 0")
+            params.append(word)
+        if category:
+            where.append("(lower(category) = ? OR substr(lower(category), 1, ?) = ?)")
+            prefix = category.lower().strip("/")
+            params.extend([prefix, len(prefix) + 1, prefix + "/"])
+        if dimension is not None:
+            where.append(
+                "EXISTS (SELECT 1 FROM part_dimensions d WHERE d.path = parts.path "
+                "AND d.value BETWEEN ? AND ?)"
+            )
+            params.extend([dimension - tolerance, dimension + tolerance])
+        where_sql = " WHERE " + " AND ".join(where) if where else ""
+        order_sql = "length(parts.path), parts.path"
+        if words:
+            score_sql = " + ".join(["(instr(lower(parts.name), ?) > 0)"] * len(words))
+            order_sql = f"{score_sql} DESC, {order_sql}"
+
+        with self._lock:
+            conn = self._connect()
+            from_sql = f"FROM parts LEFT JOIN part_metadata m ON m.path = parts.path{where_sql}"
+            total = conn.execute(f"SELECT COUNT(*) {from_sql}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT parts.path, parts.name, parts.category, m.label, m.bound_box, m.has_thumbnail "
+                f"{from_sql} ORDER BY {order_sql} LIMIT ? OFFSET ?",
+                [*params, *words, -1 if limit is None else limit, offset],
+            ).fetchall()
+            parts = []
+            for path, name, part_category, label, bound_box, has_thumbnail in rows:
+                dimensions = [row[0] for row in conn.execute(
+                    "SELECT value FROM part_dimensions WHERE path = ?", (path,)
+                )]
+                part = {
+                    "path": path,
+                    "name": name,
+                    "category": part_category,
+                    "dimensions": dimensions,
+                    "label": label,
+                    "size": None,
+                    "has_thumbnail": bool(has_thumbnail),
+                }
+                if bound_box:
+                    box = json.loads(bound_box)
+                    part["size"] = [box["XLength"], box["YLength"], box["ZLength"]]
+                parts.append(part)
+        next_offset = offset + len(parts)
+        return {
+            "parts": parts,
+            "total": total,
+            "next_offset": next_offset if next_offset < total else None,
+        }
+
+    def all_paths(self) -> list[str]:
+        self.refresh()
+        with self._lock:
+            return [row[0] for row in self._connect().execute("SELECT path FROM parts ORDER BY path")]
+
+    def part_info(self, path: str, thumbnail: bool = False) -> dict:
+        """Metadata of one part, reading the FCStd file now if it is not indexed yet."""
+        self.refresh()
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT parts.mtime, m.mtime FROM parts LEFT JOIN part_metadata m ON m.path = parts.path "
+                "WHERE parts.path = ?",
+                (path,),
+            ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"Not in the parts library: {path}")
+        if row[0] != row[1]:
+            self._index_part(path, row[0])
+
+        with self._lock:
+            conn = self._connect()
+            label, unit_system, objects, bound_box, error = conn.execute(
+                "SELECT label, unit_system, objects, bound_box, error FROM part_metadata WHERE path = ?",
+                (path,),
+            ).fetchone()
+            info = {
+                "path": path,
+                "label": label,
+                "unit_system": unit_system,
+                "objects": json.loads(objects) if objects else [],
+                "bound_box": json.loads(bound_box) if bound_box else None,
+                "error": error,
+                "thumbnail": None,
+            }
+            if thumbnail:
+                data = conn.execute("SELECT data FROM part_thumbnails WHERE path = ?", (path,)).fetchone()
+                info["thumbnail"] = data[0] if data else None
+        return info
+
+    def index_stats(self) -> dict[str, int]:
+        with self._lock:
+            conn = self._connect()
+            parts = conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0]
+            indexed = conn.execute(
+                "SELECT COUNT(*) FROM parts JOIN part_metadata m ON m.path = parts.path AND m.mtime = parts.mtime"
+            ).fetchone()[0]
+            failed = conn.execute("SELECT COUNT(*) FROM part_metadata WHERE error IS NOT NULL").fetchone()[0]
+        return {"parts": parts, "indexed": indexed, "failed": failed}
+
+    def start_indexing(self):
+        """Read metadata for new or changed parts in a background thread."""
+        with self._lock:
+            if self._indexer is not None and self._indexer.is_alive():
+                return
+            self._indexer = threading.Thread(target=self._index_pending, name="PartsCatalogIndexer", daemon=True)
+            self._indexer.start()
+
+    def _index_pending(self):
+        while not self._stop_indexing.is_set():
+            with self._lock:
+                if self._conn is None:
+                    return
+                pending = self._conn.execute(
+                    "SELECT parts.path, parts.mtime FROM parts LEFT JOIN part_metadata m ON m.path = parts.path "
+                    "WHERE m.mtime IS NULL OR m.mtime != parts.mtime LIMIT ?",
+                    (INDEX_BATCH_SIZE,),
+                ).fetchall()
+            if not pending:
+                return
+            for path, mtime in pending:
+                if self._stop_indexing.is_set():
+                    return
+                self._index_part(path, mtime)
+
+    def _index_part(self, path: str, mtime: float):
+        abs_path = os.path.join(self.library_path, *path.split("/"))
+        error = None
+        try:
+            metadata = read_part_metadata(abs_path)
+        except Exception as e:
+            # Still record the mtime so a broken file is not retried until it changes.
+            metadata = {"label": None, "unit_system": None, "objects": [], "bound_box": None, "thumbnail": None}
+            error = str(e)
+        labels = [metadata["label"] or ""] + [obj["label"] or "" for obj in metadata["objects"]]
+        with self._lock:
+            if self._conn is None:
+                return
+            with self._conn as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO part_metadata "
+                    "(path, mtime, label, unit_system, objects, bound_box, keywords, has_thumbnail, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        path,
+                        mtime,
+                        metadata["label"],
+                        metadata["unit_system"],
+                        json.dumps(metadata["objects"]),
+                        json.dumps(metadata["bound_box"]) if metadata["bound_box"] else None,
+                        " ".join(labels).lower(),
+                        metadata["thumbnail"] is not None,
+                        error,
+                    ),
+                )
+                if metadata["thumbnail"] is not None:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO part_thumbnails (path, data) VALUES (?, ?)",
+                        (path, metadata["thumbnail"]),
+                    )
+                else:
+                    conn.execute("DELETE FROM part_thumbnails WHERE path = ?", (path,))
@@ -1,33 +1,93 @@
 import os
-from functools import cache
 
 import FreeCAD
-import FreeCADGui
 
+if FreeCAD.GuiUp:
+    import FreeCADGui
 
-def insert_part_from_library(relative_path):
-    parts_lib_path = os.path.join(FreeCAD.getUserAppDataDir(), "Mod", "parts_library")
-    part_path = os.path.join(parts_lib_path, relative_path)
+from .metrics import timed_recompute
+from .part_templates import PartTemplateCache
+from .parts_catalog import PartsCatalog
+
+
+def parts_library_path() -> str:
+    return os.path.join(FreeCAD.getUserAppDataDir(), "Mod", "parts_library")
+
+
+part_templates = PartTemplateCache()
+
+
+def insert_part_from_library(
+    relative_path: str,
+    placement: FreeCAD.Placement | None = None,
+    use_cache: bool = True,
+    doc_name: str | None = None,
+) -> list[str]:
+    """Insert a library part into `doc_name`, or the active document, and return the new object names.
+
+    With `use_cache`, the part is copied from a template document kept in
+    memory; otherwise the file is merged from disk as before.
+    """
+    part_path = os.path.join(parts_library_path(), relative_path)
 
     if not os.path.exists(part_path):
         raise FileNotFoundError(f"Not found: {part_path}")
 
-    FreeCADGui.ActiveDocument.mergeProject(part_path)
+    active = FreeCAD.ActiveDocument
+    doc = FreeCAD.getDocument(doc_name) if doc_name is not None else active
+    if doc is None:
+        raise RuntimeError("No active document.")
+
+    if not use_cache:
+        before = set(doc.Objects)
+        if FreeCAD.GuiUp:
+            FreeCADGui.getDocument(doc.Name).mergeProject(part_path)
+        else:
+            doc.mergeProject(part_path)
+        inserted = [obj for obj in doc.Objects if obj not in before]
+        if placement is not None:
+            for obj in inserted:
+                if not obj.InList and hasattr(obj, "Placement"):
+                    obj.Placement = placement.multiply(obj.Placement)
+    else:
+        try:
+            inserted = part_templates.insert(part_path, doc, placement)
+        finally:
+            # Opening a template document may make it the active one.
+            restore = (active or doc).Name
+            FreeCAD.setActiveDocument(restore)
+            if FreeCAD.GuiUp:
+                FreeCADGui.setActiveDocument(restore)
+    timed_recompute(doc)
+    return [obj.Name for obj in inserted]
+
+
+_catalog: PartsCatalog | None = None
+
+
+def get_parts_catalog() -> PartsCatalog:
+    global _catalog
+    if _catalog is None:
+        _catalog = PartsCatalog(
+            parts_library_path(),
+            os.path.join(FreeCAD.getUserAppDataDir(), "FreeCADMCP", "parts_catalog.sqlite3"),
+        )
+    return _catalog
 
 
-@cache
 def get_parts_list() -> list[str]:
-    parts_lib_path = os.path.join(FreeCAD.getUserAppDataDir(), "Mod", "parts_library")
+    return get_parts_catalog().all_paths()
 
-    if not os.path.exists(parts_lib_path):
-        raise FileNotFoundError(f"Not found: {parts_lib_path}")
 
-    parts = []
+def search_parts(
+    query: str = "",
+    category: str | None = None,
+    dimension: float | None = None,
+    offset: int = 0,
+    limit: int | None = 20,
+) -> dict:
+    return get_parts_catalog().search(query, category, dimension, offset=offset, limit=limit)
 
-    for root, _, files in os.walk(parts_lib_path):
-        for file in files:
-            if file.endswith(".FCStd"):
-                relative_path = os.path.relpath(os.path.join(root, file), parts_lib_path)
-                parts.append(relative_path)
 
-    return parts
+def get_part_info(relative_path: str, thumbnail: bool = False) -> dict:
+    return get_parts_catalog().part_info(relative_path.replace(os.sep, "/"), thumbnail)
@@ -0,0 +1,159 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from xmlrpc.client import Fault
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+from .metrics import Trace, activate, record, registry
+
+SERVER_BUSY_FAULT = -32001
+
+
+class KeepAliveRequestHandler(SimpleXMLRPCRequestHandler):
+    """Request handler that keeps HTTP/1.1 connections open between calls.
+
+    An open connection occupies its worker thread, so `timeout` closes
+    connections that stay idle. Responses larger than `encode_threshold`
+    bytes are gzip-compressed when the client accepts it.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = 30
+    encode_threshold = 1400
+
+    def end_headers(self):
+        # Never keep a rejected request's connection open.
+        if getattr(self.server, "rejecting", False):
+            self.send_header("Connection", "close")
+        super().end_headers()
+
+    def log_error(self, format, *args):
+        if self.server.logRequests:
+            super().log_error(format, *args)
+
+
+class InstrumentedXMLRPCServer(SimpleXMLRPCServer):
+    """SimpleXMLRPCServer that records every call in `metrics.registry`.
+
+    Each call gets a Trace that collects the time spent in each stage, both
+    on the handling thread and in the GUI tasks it submits. The call's
+    latency, response size and success are counted per method; calls that
+    return {"success": False, ...} count as errors like raised ones. Decoding
+    the request and encoding the response is timed as the "marshal" stage.
+    """
+
+    def _marshaled_dispatch(self, data, dispatch_method=None, path=None):
+        if not registry.enabled:
+            return super()._marshaled_dispatch(data, dispatch_method, path)
+        dispatch = dispatch_method or self._dispatch
+        trace = Trace()
+        dispatch_ms = 0.0
+
+        def traced_dispatch(method, params):
+            nonlocal dispatch_ms
+            # Unknown names would add a metric label per typo.
+            known = method in self.funcs or (not method.startswith("_") and hasattr(self.instance, method))
+            trace.method = method if known else "unknown"
+            start = time.perf_counter()
+            try:
+                result = dispatch(method, params)
+            except BaseException as e:
+                trace.fail(e)
+                raise
+            finally:
+                dispatch_ms = (time.perf_counter() - start) * 1000.0
+            if isinstance(result, dict) and result.get("success") is False:
+                trace.fail(result.get("error"))
+            return result
+
+        start = time.perf_counter()
+        with activate(trace):
+            response = super()._marshaled_dispatch(data, traced_dispatch, path)
+        trace.duration_ms = (time.perf_counter() - start) * 1000.0
+        trace.response_bytes = len(response)
+        record("marshal", trace.duration_ms - dispatch_ms, trace)
+        registry.finish(trace)
+        return response
+
+
+class PooledXMLRPCServer(InstrumentedXMLRPCServer):
+    """SimpleXMLRPCServer that handles requests on a bounded worker pool.
+
+    At most `max_workers` requests run at once and up to `max_pending` more
+    wait for a free worker. Requests beyond that are answered with a "server
+    busy" fault by a separate thread instead of piling up; when that thread
+    is behind as well, the connection is closed unanswered. The accept thread
+    never reads or writes a request itself.
+
+    Requests run concurrently with each other and with the GUI thread, so
+    every method that reads or changes a document goes through the GUI task
+    queue (see `FreeCADRPC._read_gui`). Calls that do not touch FreeCAD, such
+    as `ping` or `get_parts_list`, are no longer stuck behind them.
+    """
+
+    def __init__(self, addr, max_workers=4, max_pending=16, **kwargs):
+        super().__init__(addr, **kwargs)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="FreeCADMCP-RPC"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._rejector = ThreadPoolExecutor(max_workers=1, thread_name_prefix="FreeCADMCP-RPC-busy")
+        self._reject_slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._rejecting = threading.local()
+
+    @property
+    def rejecting(self) -> bool:
+        return getattr(self._rejecting, "active", False)
+
+    def process_request(self, request, client_address):
+        if self._slots.acquire(blocking=False):
+            self._submit(self._executor, self._process_pooled, self._slots, request, client_address)
+        elif self._reject_slots.acquire(blocking=False):
+            self._submit(self._rejector, self._process_rejected, self._reject_slots, request, client_address)
+        else:
+            self.shutdown_request(request)
+
+    def _submit(self, executor, process, slots, request, client_address):
+        try:
+            executor.submit(process, request, client_address)
+        except RuntimeError:
+            # The executor is already shut down.
+            slots.release()
+            self.shutdown_request(request)
+
+    def _process_pooled(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def _process_rejected(self, request, client_address):
+        # _dispatch turns the call into a fault.
+        self._rejecting.active = True
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self._rejecting.active = False
+            self.shutdown_request(request)
+            self._reject_slots.release()
+
+    def _dispatch(self, method, params):
+        if self.rejecting:
+            raise Fault(
+                SERVER_BUSY_FAULT,
+                f"Server busy: {self.max_workers} requests running and "
+                f"{self.max_pending} waiting. Retry later.",
+            )
+        return super()._dispatch(method, params)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._rejector.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,168 @@
+import threading
+
+import FreeCAD
+
+# Every document change takes the next value of one global sequence, so
+# revisions are unique and increase across all documents.
+_lock = threading.Lock()
+_sequence = 0
+_document_revisions: dict[str, int] = {}
+# Per document: object name -> revision of its last change, and names of
+# objects removed since the tracker started -> revision of the removal.
+_object_revisions: dict[str, dict[str, int]] = {}
+_removed_objects: dict[str, dict[str, int]] = {}
+# Per document: object name -> revision of the last change to its geometry.
+_shape_revisions: dict[str, dict[str, int]] = {}
+# Revisions older than these were taken while changes went unobserved (tracker
+# stopped, document recreated) and cannot be used to compute deltas.
+_tracking_since = 0
+_document_since: dict[str, int] = {}
+
+_app_observer = None
+_gui_observer = None
+
+
+def document_revision(doc_name: str) -> int:
+    with _lock:
+        return _document_revisions.get(doc_name, 0)
+
+
+def is_tracking() -> bool:
+    return _app_observer is not None
+
+
+def shape_revision(doc_name: str, obj_name: str) -> int:
+    """Revision of the object's last geometry change.
+
+    Never older than the document's (re)creation, so geometry cached for an
+    object of a closed document is not reused for a new one of the same name.
+    """
+    with _lock:
+        return max(
+            _shape_revisions.get(doc_name, {}).get(obj_name, 0),
+            _document_since.get(doc_name, 0),
+            _tracking_since,
+        )
+
+
+def current_revision() -> int:
+    with _lock:
+        return _sequence
+
+
+def bump_revision(
+    doc_name: str, obj_name: str | None = None, removed: bool = False, shape: bool = False
+) -> int:
+    global _sequence
+    with _lock:
+        _sequence += 1
+        _document_revisions[doc_name] = _sequence
+        if obj_name is not None:
+            if removed:
+                _object_revisions.get(doc_name, {}).pop(obj_name, None)
+                _removed_objects.setdefault(doc_name, {})[obj_name] = _sequence
+            else:
+                _object_revisions.setdefault(doc_name, {})[obj_name] = _sequence
+                _removed_objects.get(doc_name, {}).pop(obj_name, None)
+            if shape or removed:
+                # A recreated object must not reuse geometry cached for the old one.
+                _shape_revisions.setdefault(doc_name, {})[obj_name] = _sequence
+        return _sequence
+
+
+def changes_since(doc_name: str, revision: int) -> tuple[set[str], list[str]] | None:
+    """Return (changed object names, removed object names) after `revision`.
+
+    Returns None when `revision` predates what the tracker has observed for
+    the document, in which case the caller needs a full snapshot.
+    """
+    with _lock:
+        if revision < max(_tracking_since, _document_since.get(doc_name, 0)) or revision > _sequence:
+            return None
+        changed = {
+            name for name, rev in _object_revisions.get(doc_name, {}).items() if rev > revision
+        }
+        removed = [
+            name for name, rev in _removed_objects.get(doc_name, {}).items() if rev > revision
+        ]
+        return changed, removed
+
+
+def _reset_document(doc_name: str):
+    global _sequence
+    with _lock:
+        _sequence += 1
+        _document_revisions[doc_name] = _sequence
+        _document_since[doc_name] = _sequence
+        _object_revisions.pop(doc_name, None)
+        _removed_objects.pop(doc_name, None)
+        _shape_revisions.pop(doc_name, None)
+
+
+class _AppObserver:
+    """Bumps a document's revision on recompute, undo/redo and object changes."""
+
+    def slotRecomputedDocument(self, doc):
+        bump_revision(doc.Name)
+
+    def slotUndoDocument(self, doc):
+        bump_revision(doc.Name)
+
+    def slotRedoDocument(self, doc):
+        bump_revision(doc.Name)
+
+    def slotCreatedDocument(self, doc):
+        _reset_document(doc.Name)
+
+    def slotDeletedDocument(self, doc):
+        _reset_document(doc.Name)
+
+    def slotCreatedObject(self, obj):
+        bump_revision(obj.Document.Name, obj.Name)
+
+    def slotDeletedObject(self, obj):
+        bump_revision(obj.Document.Name, obj.Name, removed=True)
+
+    def slotChangedObject(self, obj, prop):
+        bump_revision(obj.Document.Name, obj.Name, shape=prop in ("Shape", "Placement"))
+
+
+class _GuiObserver:
+    """Bumps the revision when a view provider changes (color, visibility, ...)."""
+
+    def slotChangedObject(self, vp, prop):
+        bump_revision(vp.Object.Document.Name, vp.Object.Name)
+
+
+def install_revision_tracker():
+    global _app_observer, _gui_observer, _sequence, _tracking_since
+    if _app_observer is not None:
+        return
+    with _lock:
+        # Anything may have changed while nobody was observing.
+        _sequence += 1
+        _tracking_since = _sequence
+    _app_observer = _AppObserver()
+    FreeCAD.addDocumentObserver(_app_observer)
+    if not FreeCAD.GuiUp:
+        return
+    try:
+        import FreeCADGui
+
+        if hasattr(FreeCADGui, "addDocumentObserver"):
+            _gui_observer = _GuiObserver()
+            FreeCADGui.addDocumentObserver(_gui_observer)
+    except ImportError:
+        pass
+
+
+def remove_revision_tracker():
+    global _app_observer, _gui_observer
+    if _app_observer is not None:
+        FreeCAD.removeDocumentObserver(_app_observer)
+        _app_observer = None
+    if _gui_observer is not None:
+        import FreeCADGui
+
+        FreeCADGui.removeDocumentObserver(_gui_observer)
+        _gui_observer = None
@@ -1,38 +1,79 @@
 import FreeCAD
-import FreeCADGui
 import ObjectsFem
 
-import contextlib
-import queue
 import base64
-import io
 import os
-import tempfile
 import threading
+import time
 from dataclasses import dataclass, field
 from typing import Any
-from xmlrpc.server import SimpleXMLRPCServer
-
-from PySide import QtCore
-
-from .parts_library import get_parts_list, insert_part_from_library
-from .serialize import serialize_object
+from xmlrpc.server import SimpleXMLRPCRequestHandler
+
+from .code_runner import CodeRunner
+from .cursors import CursorStore, ObjectCursor
+from .dispatcher import (
+    GuiQueueFull,
+    cancel_pending_tasks,
+    get_dispatch_stats,
+    get_task_timeout,
+    install_dispatcher,
+    run_gui_task,
+    set_max_queue_depth,
+    serve_tasks,
+    set_task_timeout,
+    submit_gui_task,
+)
+from .fem_mesh import gmsh_mesh_job
+from .cache import LRUCache
+from .jobs import JobManager
+from .metrics import registry, timed, timed_recompute
+from .parts_library import (
+    get_part_info,
+    get_parts_list,
+    insert_part_from_library,
+    part_templates,
+    search_parts,
+)
+from .pooled_server import InstrumentedXMLRPCServer, KeepAliveRequestHandler, PooledXMLRPCServer
+from .revision import (
+    changes_since,
+    current_revision,
+    document_revision,
+    install_revision_tracker,
+    remove_revision_tracker,
+)
+from .serialize import serialize_object, serialize_object_fields, shape_cache
+
+if FreeCAD.GuiUp:
+    import FreeCADGui
+
+    from .screenshot import encode_image, grab_view_image, render_view_image, set_view_direction, view_identity
 
 rpc_server_thread = None
 rpc_server_instance = None
 
-# GUI task queue
-rpc_request_queue = queue.Queue()
-rpc_response_queue = queue.Queue()
+# Set to end `serve_headless`.
+headless_stop = threading.Event()
+
+# Screenshots keyed by (document, revision, active view and its pixel size,
+# view direction and image options). Entries for older revisions are never
+# hit again and age out of the LRU.
+screenshot_cache = LRUCache(
+    max_entries=128, max_bytes=64 * 1024 * 1024, sizeof=lambda res: len(res["data"])
+)
+
+object_cursors = CursorStore()
 
+code_runner = CodeRunner()
 
-def process_gui_tasks():
-    while not rpc_request_queue.empty():
-        task = rpc_request_queue.get()
-        res = task()
-        if res is not None:
-            rpc_response_queue.put(res)
-    QtCore.QTimer.singleShot(500, process_gui_tasks)
+job_manager = JobManager()
+
+# Views that have no 3D scene to render.
+UNSUPPORTED_VIEW_TYPES = (
+    "SpreadsheetGui::SheetView",
+    "DrawingGui::DrawingView",
+    "TechDrawGui::MDIViewPage",
+)
 
 
 @dataclass
@@ -43,36 +84,48 @@ class Object:
     properties: dict[str, Any] = field(default_factory=dict)
 
 
+def to_placement(val: dict[str, Any]) -> FreeCAD.Placement:
+    """Build a Placement from {"Base"|"Position": {x, y, z}, "Rotation": {"Axis": {x, y, z}, "Angle"}}."""
+    if "Base" in val:
+        pos = val["Base"]
+    elif "Position" in val:
+        pos = val["Position"]
+    else:
+        pos = {}
+    rot = val.get("Rotation", {})
+    return FreeCAD.Placement(
+        FreeCAD.Vector(
+            pos.get("x", 0),
+            pos.get("y", 0),
+            pos.get("z", 0),
+        ),
+        FreeCAD.Rotation(
+            FreeCAD.Vector(
+                rot.get("Axis", {}).get("x", 0),
+                rot.get("Axis", {}).get("y", 0),
+                rot.get("Axis", {}).get("z", 1),
+            ),
+            rot.get("Angle", 0),
+        ),
+    )
+
+
 def set_object_property(
-    doc: FreeCAD.Document, obj: FreeCAD.DocumentObject, properties: dict[str, Any]
+    doc: FreeCAD.Document,
+    obj: FreeCAD.DocumentObject,
+    properties: dict[str, Any],
+    strict: bool = False,
 ):
+    """Assign `properties` to `obj`.
+
+    A failed assignment is reported on the console and the remaining properties are still set.
+    With `strict=True` the first failure is raised instead, so that a batch can roll back.
+    """
     for prop, val in properties.items():
         try:
             if prop in obj.PropertiesList:
                 if prop == "Placement" and isinstance(val, dict):
-                    if "Base" in val:
-                        pos = val["Base"]
-                    elif "Position" in val:
-                        pos = val["Position"]
-                    else:
-                        pos = {}
-                    rot = val.get("Rotation", {})
-                    placement = FreeCAD.Placement(
-                        FreeCAD.Vector(
-                            pos.get("x", 0),
-                            pos.get("y", 0),
-                            pos.get("z", 0),
-                        ),
-                        FreeCAD.Rotation(
-                            FreeCAD.Vector(
-                                rot.get("Axis", {}).get("x", 0),
-                                rot.get("Axis", {}).get("y", 0),
-                                rot.get("Axis", {}).get("z", 1),
-                            ),
-                            rot.get("Angle", 0),
-                        ),
-                    )
-                    setattr(obj, prop, placement)
+                    setattr(obj, prop, to_placement(val))
 
                 elif isinstance(getattr(obj, prop), FreeCAD.Vector) and isinstance(
                     val, dict
@@ -103,6 +156,10 @@ def set_object_property(
 
                 else:
                     setattr(obj, prop, val)
+            # View properties only exist when FreeCAD runs with a GUI.
+            elif prop in ("ShapeColor", "ViewObject") and getattr(obj, "ViewObject", None) is None:
+                continue
+
             # ShapeColor is a property of the ViewObject
             elif prop == "ShapeColor" and isinstance(val, (list, tuple)):
                 setattr(obj.ViewObject, prop, (float(val[0]), float(val[1]), float(val[2]), float(val[3])))
@@ -118,6 +175,8 @@ def set_object_property(
                 setattr(obj, prop, val)
 
         except Exception as e:
+            if strict:
+                raise ValueError(f"Property '{prop}' assignment error: {e}") from e
             FreeCAD.Console.PrintError(f"Property '{prop}' assignment error: {e}\n")
 
 
@@ -128,8 +187,7 @@ class FreeCADRPC:
         return True
 
     def create_document(self, name="New_Document"):
-        rpc_request_queue.put(lambda: self._create_document_gui(name))
-        res = rpc_response_queue.get()
+        res = run_gui_task(lambda: self._create_document_gui(name))
         if res is True:
             return {"success": True, "document_name": name}
         else:
@@ -142,8 +200,16 @@ class FreeCADRPC:
             analysis=obj_data.get("Analysis", None),
             properties=obj_data.get("Properties", {}),
         )
-        rpc_request_queue.put(lambda: self._create_object_gui(doc_name, obj))
-        res = rpc_response_queue.get()
+        if obj.type == "Fem::FemMeshGmsh" and obj.analysis:
+            # Create the mesh object now and mesh it in a background job.
+            res = run_gui_task(lambda: self._create_object_gui(doc_name, obj, mesh=False))
+            if res is not True:
+                return {"success": False, "error": res}
+            job = job_manager.submit(
+                "fem_mesh", gmsh_mesh_job(doc_name, obj.name), {"doc_name": doc_name, "mesh": obj.name}
+            )
+            return {"success": True, "object_name": obj.name, "job_id": job.id}
+        res = run_gui_task(lambda: self._create_object_gui(doc_name, obj))
         if res is True:
             return {"success": True, "object_name": obj.name}
         else:
@@ -154,136 +220,523 @@ class FreeCADRPC:
             name=obj_name,
             properties=properties.get("Properties", {}),
         )
-        rpc_request_queue.put(lambda: self._edit_object_gui(doc_name, obj))
-        res = rpc_response_queue.get()
+        res = run_gui_task(lambda: self._edit_object_gui(doc_name, obj))
         if res is True:
             return {"success": True, "object_name": obj.name}
         else:
             return {"success": False, "error": res}
 
     def delete_object(self, doc_name: str, obj_name: str):
-        rpc_request_queue.put(lambda: self._delete_object_gui(doc_name, obj_name))
-        res = rpc_response_queue.get()
+        res = run_gui_task(lambda: self._delete_object_gui(doc_name, obj_name))
         if res is True:
             return {"success": True, "object_name": obj_name}
         else:
             return {"success": False, "error": res}
 
-    def execute_code(self, code: str) -> dict[str, Any]:
-        output_buffer = io.StringIO()
-        def task():
-            try:
-                with contextlib.redirect_stdout(output_buffer):
-                    exec(code, globals())
-                FreeCAD.Console.PrintMessage("Python code executed successfully.\n")
-                return True
-            except Exception as e:
-                FreeCAD.Console.PrintError(
-                    f"Error executing Python code: {e}\n"
-                )
-                return f"Error executing Python code: {e}\n"
+    def batch(self, doc_name: str, operations: list[dict[str, Any]]) -> dict[str, Any]:
+        """Apply create/edit/delete operations in one GUI task and one transaction.
 
-        rpc_request_queue.put(task)
-        res = rpc_response_queue.get()
+        Each operation is a dict with an "Action" of "create", "edit" or
+        "delete" plus the fields of the matching single-object RPC ("Name",
+        "Type", "Analysis", "Properties"). The document is recomputed once at
+        the end; if any operation fails the whole batch is rolled back.
+        Gmsh meshes created inside an analysis are meshed by a background job
+        after the commit, like create_object, and their result carries its
+        "job_id".
+        """
+        res = run_gui_task(lambda: self._batch_gui(doc_name, operations))
+        if isinstance(res, dict):
+            if res["success"]:
+                for result in res["results"]:
+                    op = operations[result["index"]]
+                    if result["action"] == "create" and op.get("Type") == "Fem::FemMeshGmsh" and op.get("Analysis"):
+                        mesh_name = result["object_name"]
+                        job = job_manager.submit(
+                            "fem_mesh", gmsh_mesh_job(doc_name, mesh_name), {"doc_name": doc_name, "mesh": mesh_name}
+                        )
+                        result["job_id"] = job.id
+            return res
+        return {"success": False, "error": res, "results": []}
+
+    def create_instances(
+        self,
+        doc_name: str,
+        source_name: str,
+        placements: list[dict[str, Any]],
+        mode: str = "link",
+        name: str | None = None,
+        hide_source: bool = True,
+    ) -> dict[str, Any]:
+        """Place copies of `source_name` that share its geometry instead of duplicating it.
+
+        mode "link" creates one App::Link per placement; mode "array" creates a
+        single App::Link array with one element per placement. Either way the
+        source shape is computed once, in one GUI task and one transaction.
+        """
+        res = run_gui_task(
+            lambda: self._create_instances_gui(doc_name, source_name, placements, mode, name, hide_source)
+        )
+        if isinstance(res, list):
+            return {"success": True, "instances": res}
+        return {"success": False, "error": res}
+
+    def execute_code(
+        self,
+        code: str,
+        session: str = "default",
+        time_limit: float | None = None,
+        cooperative: bool | None = None,
+    ) -> dict[str, Any]:
+        """Run `code` in the session's namespace and wait for it to finish.
+
+        `time_limit` (seconds, 0 for none) defaults to the server's code time limit.
+        `cooperative` runs the script in GUI time slices, split where it calls
+        `yield_gui()`; None enables it for scripts that call it at the top level.
+        """
+        try:
+            execution, task = code_runner.prepare(code, session, time_limit, cooperative)
+        except SyntaxError as e:
+            return {"success": False, "error": f"Error executing Python code: {e}\n"}
+        timeout = execution.time_limit + 5 if execution.time_limit else None
+        res = run_gui_task(task, timeout=timeout)
+        if execution.state == "queued":
+            # The task was rejected, cancelled or timed out before it started.
+            code_runner.cancel(execution.id)
+        if res is None:
+            # A cooperative script returned after its first slice.
+            if execution.wait_finished(timeout or get_task_timeout()):
+                res = True if execution.state == "done" else execution.error
+            else:
+                res = "Python code did not finish in time; poll get_job_status for its progress."
+        stdout, _ = execution.stdout.read()
+        stderr, _ = execution.stderr.read()
         if res is True:
             return {
                 "success": True,
-                "message": "Python code execution scheduled. \nOutput: " + output_buffer.getvalue()
+                "message": "Python code executed. \nOutput: " + stdout,
+                "stderr": stderr,
             }
         else:
-            return {"success": False, "error": res}
+            return {"success": False, "error": res, "output": stdout, "stderr": stderr}
+
+    def start_code(
+        self,
+        code: str,
+        session: str = "default",
+        time_limit: float | None = None,
+        cooperative: bool | None = None,
+    ) -> dict[str, Any]:
+        """Queue `code` like `execute_code` but return at once; poll `read_code_output` for progress."""
+        try:
+            execution, task = code_runner.prepare(code, session, time_limit, cooperative)
+        except SyntaxError as e:
+            return {"success": False, "error": f"Error executing Python code: {e}\n"}
+        try:
+            execution.future = submit_gui_task(task)
+        except GuiQueueFull as e:
+            code_runner.cancel(execution.id)
+            return {"success": False, "error": str(e)}
+        # A task cancelled while queued, e.g. when the server stops, never runs.
+        execution.future.add_done_callback(lambda future: future.cancelled() and code_runner.cancel(execution.id))
+        return {"success": True, "execution_id": execution.id}
+
+    def read_code_output(
+        self,
+        execution_id: str,
+        stdout_offset: int = 0,
+        stderr_offset: int = 0,
+        wait: float = 0.0,
+    ) -> dict[str, Any]:
+        """Return the output an execution produced past the given offsets.
+
+        With `wait`, block up to that many seconds for new output or for the
+        execution to finish. Pass the returned offsets to the next call.
+        """
+        execution = code_runner.get(execution_id)
+        if execution is None:
+            return {"success": False, "error": f"Unknown execution '{execution_id}'."}
+        if wait > 0:
+            execution.wait(stdout_offset, stderr_offset, wait)
+        return self._execution_status(execution, stdout_offset, stderr_offset)
+
+    def get_job_status(
+        self, job_id: str, stdout_offset: int = 0, stderr_offset: int = 0
+    ) -> dict[str, Any]:
+        """State and progress of a background job, or of a script started with `start_code`.
+
+        Finished jobs include their "result"; results are kept on disk, so
+        they can still be read after FreeCAD restarts.
+        """
+        execution = code_runner.get(job_id)
+        if execution is not None:
+            return self._execution_status(execution, stdout_offset, stderr_offset)
+        job = job_manager.get(job_id)
+        if job is None:
+            return {"success": False, "error": f"Unknown job '{job_id}'."}
+        if isinstance(job, dict):
+            return {"success": True, **job}
+        return {"success": True, **job.to_dict()}
+
+    def submit_fem_mesh(self, doc_name: str, mesh_name: str) -> dict[str, Any]:
+        """Regenerate the mesh of an existing Fem::FemMeshGmsh object in a background job."""
+        job = job_manager.submit(
+            "fem_mesh", gmsh_mesh_job(doc_name, mesh_name), {"doc_name": doc_name, "mesh": mesh_name}
+        )
+        return {"success": True, "job_id": job.id}
+
+    def list_jobs(self) -> dict[str, Any]:
+        return {"success": True, "jobs": job_manager.list(), **job_manager.stats()}
+
+    def cancel_job(self, job_id: str) -> bool:
+        """Cancel a background job or a running script; False if it is unknown or already finished."""
+        return code_runner.cancel(job_id) or job_manager.cancel(job_id)
+
+    def _execution_status(self, execution, stdout_offset: int, stderr_offset: int) -> dict[str, Any]:
+        stdout, stdout_offset = execution.stdout.read(stdout_offset)
+        stderr, stderr_offset = execution.stderr.read(stderr_offset)
+        end = execution.finished_at or time.monotonic()
+        return {
+            "success": True,
+            "state": execution.state,
+            "finished": execution.finished,
+            "error": execution.error,
+            "stdout": stdout,
+            "stderr": stderr,
+            "stdout_offset": stdout_offset,
+            "stderr_offset": stderr_offset,
+            "elapsed": end - (execution.started_at or end),
+            "cooperative": execution.cooperative,
+            "slices": execution.slices,
+            "progress": execution.progress,
+            "message": execution.message,
+        }
+
+    def cancel_code(self, execution_id: str) -> bool:
+        return code_runner.cancel(execution_id)
+
+    def reset_code_session(self, session: str = "default") -> bool:
+        return code_runner.reset_session(session)
+
+    def get_objects(
+        self,
+        doc_name,
+        fields: list[str] | None = None,
+        type_filter: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        since_revision: int | None = None,
+        shape_stats: bool = False,
+    ):
+        """Get the objects of a document.
+
+        Called with only `doc_name` this returns the full list of serialized
+        objects. With any query option it returns a dict instead:
+
+            {"revision": <token>, "full": bool, "objects": [...],
+             "removed": [names], "total": int, "next_offset": int | None}
+
+        `fields` projects each object (see `serialize_object_fields`),
+        `type_filter` keeps objects whose TypeId starts with it, and
+        `offset`/`limit` page through the result. With `since_revision` set to
+        the "revision" of an earlier response only objects added or changed
+        since then are listed and deleted ones are named in "removed"; "full"
+        is True when the token is too old and a complete listing was returned.
+
+        Each object's "Shape" holds its bounding box and center of mass; the
+        costlier volume, area and topology counts are added with `shape_stats`.
+        """
+        return self._read_gui(
+            lambda: self._get_objects(doc_name, fields, type_filter, offset, limit, since_revision, shape_stats)
+        )
 
-    def get_objects(self, doc_name):
+    def _get_objects(self, doc_name, fields, type_filter, offset, limit, since_revision, shape_stats):
         doc = FreeCAD.getDocument(doc_name)
-        if doc:
-            return [serialize_object(obj) for obj in doc.Objects]
-        else:
-            return []
+        if fields is None and type_filter is None and limit is None and since_revision is None and not offset:
+            if doc:
+                with timed("serialize"):
+                    return [serialize_object(obj, shape_stats) for obj in doc.Objects]
+            else:
+                return []
+
+        # Take the token first so changes made while serializing show up again.
+        revision = current_revision()
+        changes = changes_since(doc_name, since_revision) if since_revision is not None else None
+        objects = doc.Objects if doc else []
+        removed = []
+        if changes is not None:
+            changed, removed = changes
+            objects = [obj for obj in objects if obj.Name in changed]
+        if type_filter:
+            objects = [obj for obj in objects if obj.TypeId.startswith(type_filter)]
+
+        total = len(objects)
+        end = total if limit is None else min(offset + limit, total)
+        page = objects[offset:end]
+        with timed("serialize"):
+            serialized = [
+                serialize_object(obj, shape_stats) if fields is None else serialize_object_fields(obj, fields)
+                for obj in page
+            ]
+        return {
+            "revision": revision,
+            "full": changes is None,
+            "objects": serialized,
+            "removed": removed,
+            "total": total,
+            "next_offset": end if end < total else None,
+        }
+
+    def open_object_cursor(
+        self,
+        doc_name: str,
+        fields: list[str] | None = None,
+        type_filter: str | None = None,
+        shape_stats: bool = False,
+    ) -> dict[str, Any]:
+        """Start reading a document's objects in chunks.
+
+        Snapshots the object names and returns a cursor id for
+        `read_object_cursor`. Each chunk is serialized in its own GUI task and
+        marshalled on its own, so memory scales with the chunk size and other
+        GUI work runs between chunks.
+        """
+        def task():
+            doc = FreeCAD.getDocument(doc_name)
+            return [
+                obj.Name
+                for obj in doc.Objects
+                if not type_filter or obj.TypeId.startswith(type_filter)
+            ]
+
+        revision = current_revision()
+        names = run_gui_task(task)
+        if not isinstance(names, list):
+            return {"success": False, "error": names}
+        cursor_id = object_cursors.open(
+            ObjectCursor(doc_name, names, fields, shape_stats, revision)
+        )
+        return {"success": True, "cursor": cursor_id, "total": len(names), "revision": revision}
 
-    def get_object(self, doc_name, obj_name):
-        doc = FreeCAD.getDocument(doc_name)
-        if doc:
-            return serialize_object(doc.getObject(obj_name))
-        else:
-            return None
+    def read_object_cursor(self, cursor_id: str, count: int = 100) -> dict[str, Any]:
+        """Serialize the next `count` objects of a cursor.
 
-    def insert_part_from_library(self, relative_path):
-        rpc_request_queue.put(lambda: self._insert_part_from_library(relative_path))
-        res = rpc_response_queue.get()
-        if res is True:
-            return {"success": True, "message": "Part inserted from library."}
+        The cursor is closed once "done" is True. Objects deleted since the
+        cursor was opened are skipped.
+        """
+        cursor = object_cursors.get(cursor_id)
+        if cursor is None:
+            return {"success": False, "error": f"Unknown or expired cursor '{cursor_id}'."}
+        names = cursor.take(count)
+        objects = run_gui_task(lambda: self._serialize_objects_gui(cursor, names))
+        if not isinstance(objects, list):
+            return {"success": False, "error": objects}
+        done = cursor.remaining == 0
+        if done:
+            object_cursors.close(cursor_id)
+        return {"success": True, "objects": objects, "done": done, "remaining": cursor.remaining}
+
+    def close_object_cursor(self, cursor_id: str) -> bool:
+        return object_cursors.close(cursor_id)
+
+    def get_object(self, doc_name, obj_name, shape_stats: bool = False):
+        def task():
+            doc = FreeCAD.getDocument(doc_name)
+            if doc:
+                with timed("serialize"):
+                    return serialize_object(doc.getObject(obj_name), shape_stats)
+            else:
+                return None
+
+        return self._read_gui(task)
+
+    def insert_part_from_library(
+        self,
+        relative_path,
+        placement: dict[str, Any] | None = None,
+        use_cache: bool = True,
+        doc_name: str | None = None,
+    ):
+        res = run_gui_task(
+            lambda: self._insert_part_from_library(relative_path, placement, use_cache, doc_name)
+        )
+        if isinstance(res, list):
+            return {"success": True, "message": "Part inserted from library.", "objects": res}
         else:
             return {"success": False, "error": res}
 
     def list_documents(self):
-        return list(FreeCAD.listDocuments().keys())
+        return self._read_gui(
+            lambda: [name for name in FreeCAD.listDocuments() if not part_templates.is_template(name)]
+        )
 
     def get_parts_list(self):
         return get_parts_list()
 
-    def get_active_screenshot(self, view_name: str = "Isometric") -> str:
+    def search_parts(
+        self,
+        query: str = "",
+        category: str | None = None,
+        dimension: float | None = None,
+        offset: int = 0,
+        limit: int | None = 20,
+    ) -> dict[str, Any]:
+        try:
+            res = search_parts(query, category, dimension, offset, limit)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        return {"success": True, **res}
+
+    def get_part_info(self, relative_path: str, thumbnail: bool = False) -> dict[str, Any]:
+        """Metadata of a library part read from its FCStd archive, without opening it."""
+        try:
+            info = get_part_info(relative_path, thumbnail)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        if info["thumbnail"] is not None:
+            info["thumbnail"] = base64.b64encode(info["thumbnail"]).decode("ascii")
+        return {"success": True, **info}
+
+    def get_dispatch_stats(self):
+        return get_dispatch_stats()
+
+    def get_metrics(
+        self,
+        format: str = "json",
+        traces: int = 20,
+        method: str | None = None,
+        min_ms: float = 0.0,
+        reset: bool = False,
+        labels: dict[str, str] | None = None,
+    ) -> dict[str, Any]:
+        """Counters, histograms and recent call traces of this server.
+
+        Every call is counted per method with its latency and response size,
+        and timed per stage: GUI queue wait, GUI execution, recompute, object
+        serialization, XML-RPC marshalling and screenshots. `format` "json"
+        returns them under "metrics" along with the `traces` most recent
+        traces, optionally only those of `method` or slower than `min_ms`.
+        "prometheus" returns the counters and histograms as Prometheus text
+        under "text", with `labels` added to every sample. `reset` clears
+        the per-method metrics and traces after reading; the stage histograms
+        and counters are cumulative, like Prometheus counters, and shared
+        with `get_dispatch_stats`.
+        """
+        stats = get_dispatch_stats()
+        jobs = job_manager.stats()["jobs"]
+        gauges = {
+            "gui_queue_depth": stats["queue_depth"],
+            "jobs_running": jobs.get("running", 0),
+            "jobs_queued": jobs.get("queued", 0),
+            "screenshot_cache_entries": screenshot_cache.stats()["entries"],
+            "shape_cache_entries": shape_cache.stats()["entries"],
+        }
+        if format == "prometheus":
+            res = {"success": True, "format": format, "text": registry.prometheus(gauges, labels)}
+        elif format == "json":
+            metrics = registry.snapshot(0, gauges)
+            metrics["traces"] = registry.traces.recent(traces, method, min_ms)
+            res = {"success": True, "format": format, "metrics": metrics}
+        else:
+            return {"success": False, "error": f"Unknown format '{format}'. Use 'json' or 'prometheus'."}
+        if reset:
+            registry.reset()
+        return res
+
+    def get_cache_stats(self):
+        return {
+            "screenshots": screenshot_cache.stats(),
+            "shapes": shape_cache.stats(),
+            "part_templates": part_templates.stats(),
+            "code": code_runner.stats(),
+        }
+
+    def capture_view(
+        self,
+        view_name: str = "Isometric",
+        width: int | None = None,
+        height: int | None = None,
+        image_format: str = "png",
+        quality: int = -1,
+    ) -> dict[str, Any]:
+        """Check, render and encode the active view in a single GUI task.
+
+        The image is rendered in memory, scaled down to fit `width` x `height`
+        when given, and encoded as PNG, JPEG or WebP (`quality` 0-100).
+        Returns {"success": True, "data": <base64>, "mime_type": ...} on success.
+        When the active view cannot be captured (e.g. TechDraw or Spreadsheet)
+        it returns {"success": False, "unsupported": True, ...} instead of raising,
+        as it does for every view, with "headless": True, when FreeCAD runs
+        without a GUI.
+        """
+        if not FreeCAD.GuiUp:
+            return {
+                "success": False,
+                "unsupported": True,
+                "headless": True,
+                "view_type": None,
+                "error": "Screenshots are not supported: FreeCAD is running without a GUI.",
+            }
+
+        res = run_gui_task(
+            lambda: self._capture_view_gui(view_name, width, height, image_format, quality)
+        )
+        if isinstance(res, tuple):
+            res, cache_key = res
+            # Encode off the GUI thread.
+            if res["success"] and not res.get("cached"):
+                res["data"] = base64.b64encode(res["data"]).decode("utf-8")
+                if cache_key is not None:
+                    screenshot_cache.put(cache_key, res)
+            return res
+        return {"success": False, "unsupported": False, "error": res}
+
+    def get_active_screenshot(
+        self,
+        view_name: str = "Isometric",
+        width: int | None = None,
+        height: int | None = None,
+        image_format: str = "png",
+        quality: int = -1,
+    ) -> str:
         """Get a screenshot of the active view.
         
         Returns a base64-encoded string of the screenshot or None if a screenshot
         cannot be captured (e.g., when in TechDraw or Spreadsheet view).
         """
-        # First check if the active view supports screenshots
-        def check_view_supports_screenshots():
-            try:
-                active_view = FreeCADGui.ActiveDocument.ActiveView
-                if active_view is None:
-                    FreeCAD.Console.PrintWarning("No active view available\n")
-                    return False
-                
-                view_type = type(active_view).__name__
-                has_save_image = hasattr(active_view, 'saveImage')
-                FreeCAD.Console.PrintMessage(f"View type: {view_type}, Has saveImage: {has_save_image}\n")
-                return has_save_image
-            except Exception as e:
-                FreeCAD.Console.PrintError(f"Error checking view capabilities: {e}\n")
-                return False
-                
-        rpc_request_queue.put(check_view_supports_screenshots)
-        supports_screenshots = rpc_response_queue.get()
-        
-        if not supports_screenshots:
-            FreeCAD.Console.PrintWarning("Current view does not support screenshots\n")
-            return None
-            
-        # If view supports screenshots, proceed with capture
-        fd, tmp_path = tempfile.mkstemp(suffix=".png")
-        os.close(fd)
-        rpc_request_queue.put(
-            lambda: self._save_active_screenshot(tmp_path, view_name)
-        )
-        res = rpc_response_queue.get()
-        if res is True:
-            try:
-                with open(tmp_path, "rb") as image_file:
-                    image_bytes = image_file.read()
-                    encoded = base64.b64encode(image_bytes).decode("utf-8")
-            finally:
-                if os.path.exists(tmp_path):
-                    os.remove(tmp_path)
-            return encoded
-        else:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-            FreeCAD.Console.PrintWarning(f"Failed to capture screenshot: {res}\n")
-            return None
+        res = self.capture_view(view_name, width, height, image_format, quality)
+        if res["success"]:
+            return res["data"]
+        FreeCAD.Console.PrintWarning(f"Failed to capture screenshot: {res['error']}\n")
+        return None
+
+    def _read_gui(self, task):
+        """Run a read-only `task` on the GUI thread when requests are handled concurrently.
+
+        The single-threaded server keeps reading FreeCAD directly, as it
+        always has; the worker pool would otherwise have several threads
+        walking documents while the GUI thread changes them. Errors raise, so
+        callers see the same fault either way.
+        """
+        if not isinstance(rpc_server_instance, PooledXMLRPCServer):
+            return task()
+        res = run_gui_task(lambda: (task(),))
+        if isinstance(res, tuple):
+            return res[0]
+        raise RuntimeError(res)
 
     def _create_document_gui(self, name):
         doc = FreeCAD.newDocument(name)
-        doc.recompute()
+        timed_recompute(doc)
         FreeCAD.Console.PrintMessage(f"Document '{name}' created via RPC.\n")
         return True
 
-    def _create_object_gui(self, doc_name, obj: Object):
+    def _create_object_gui(
+        self, doc_name, obj: Object, recompute: bool = True, mesh: bool = True, strict: bool = False
+    ):
         doc = FreeCAD.getDocument(doc_name)
         if doc:
             try:
                 if obj.type == "Fem::FemMeshGmsh" and obj.analysis:
-                    from femmesh.gmshtools import GmshTools
                     res = getattr(doc, obj.analysis).addObject(ObjectsFem.makeMeshGmsh(doc, obj.name))[0]
                     if "Part" in obj.properties:
                         target_obj = doc.getObject(obj.properties["Part"])
@@ -298,13 +751,16 @@ class FreeCADRPC:
                     for param, value in obj.properties.items():
                         if hasattr(res, param):
                             setattr(res, param, value)
-                    doc.recompute()
 
-                    gmsh_tools = GmshTools(res)
-                    gmsh_tools.create_mesh()
-                    FreeCAD.Console.PrintMessage(
-                        f"FEM Mesh '{res.Name}' generated successfully in '{doc_name}'.\n"
-                    )
+                    if mesh:
+                        timed_recompute(doc)
+                        from femmesh.gmshtools import GmshTools
+
+                        gmsh_tools = GmshTools(res)
+                        gmsh_tools.create_mesh()
+                        FreeCAD.Console.PrintMessage(
+                            f"FEM Mesh '{res.Name}' generated successfully in '{doc_name}'.\n"
+                        )
                 elif obj.type.startswith("Fem::"):
                     fem_make_methods = {
                         "MaterialCommon": ObjectsFem.makeMaterialSolid,
@@ -316,7 +772,7 @@ class FreeCADRPC:
 
                     if callable(make_method):
                         res = make_method(doc, obj.name)
-                        set_object_property(doc, res, obj.properties)
+                        set_object_property(doc, res, obj.properties, strict)
                         FreeCAD.Console.PrintMessage(
                             f"FEM object '{res.Name}' created with '{method_name}'.\n"
                         )
@@ -326,12 +782,15 @@ class FreeCADRPC:
                         getattr(doc, obj.analysis).addObject(res)
                 else:
                     res = doc.addObject(obj.type, obj.name)
-                    set_object_property(doc, res, obj.properties)
+                    set_object_property(doc, res, obj.properties, strict)
                     FreeCAD.Console.PrintMessage(
                         f"{res.TypeId} '{res.Name}' added to '{doc_name}' via RPC.\n"
                     )
- 
-                doc.recompute()
+                # FreeCAD renames the object when the name is taken or missing.
+                obj.name = res.Name
+
+                if recompute:
+                    timed_recompute(doc)
                 return True
             except Exception as e:
                 return str(e)
@@ -339,7 +798,7 @@ class FreeCADRPC:
             FreeCAD.Console.PrintError(f"Document '{doc_name}' not found.\n")
             return f"Document '{doc_name}' not found.\n"
 
-    def _edit_object_gui(self, doc_name: str, obj: Object):
+    def _edit_object_gui(self, doc_name: str, obj: Object, recompute: bool = True, strict: bool = False):
         doc = FreeCAD.getDocument(doc_name)
         if not doc:
             FreeCAD.Console.PrintError(f"Document '{doc_name}' not found.\n")
@@ -366,14 +825,15 @@ class FreeCADRPC:
                 )
                 # delete References from properties
                 del obj.properties["References"]
-            set_object_property(doc, obj_ins, obj.properties)
-            doc.recompute()
+            set_object_property(doc, obj_ins, obj.properties, strict)
+            if recompute:
+                timed_recompute(doc)
             FreeCAD.Console.PrintMessage(f"Object '{obj.name}' updated via RPC.\n")
             return True
         except Exception as e:
             return str(e)
 
-    def _delete_object_gui(self, doc_name: str, obj_name: str):
+    def _delete_object_gui(self, doc_name: str, obj_name: str, recompute: bool = True):
         doc = FreeCAD.getDocument(doc_name)
         if not doc:
             FreeCAD.Console.PrintError(f"Document '{doc_name}' not found.\n")
@@ -381,62 +841,290 @@ class FreeCADRPC:
 
         try:
             doc.removeObject(obj_name)
-            doc.recompute()
+            if recompute:
+                timed_recompute(doc)
             FreeCAD.Console.PrintMessage(f"Object '{obj_name}' deleted via RPC.\n")
             return True
         except Exception as e:
             return str(e)
 
-    def _insert_part_from_library(self, relative_path):
+    def _create_instances_gui(
+        self,
+        doc_name: str,
+        source_name: str,
+        placements: list[dict[str, Any]],
+        mode: str = "link",
+        name: str | None = None,
+        hide_source: bool = True,
+    ):
+        doc = FreeCAD.getDocument(doc_name)
+        if not doc:
+            FreeCAD.Console.PrintError(f"Document '{doc_name}' not found.\n")
+            return f"Document '{doc_name}' not found.\n"
+        source = doc.getObject(source_name)
+        if source is None:
+            return f"Object '{source_name}' not found in document '{doc_name}'."
+        if mode not in ("link", "array"):
+            return f"Unknown instance mode '{mode}'. Use 'link' or 'array'."
+        if not placements:
+            return "At least one placement is required."
+
+        doc.openTransaction("MCP create instances")
         try:
-            insert_part_from_library(relative_path)
-            return True
+            placement_list = [to_placement(p) for p in placements]
+            base_name = name or f"{source_name}_Instance"
+            if mode == "array":
+                link = doc.addObject("App::Link", base_name)
+                link.setLink(source)
+                link.ElementCount = len(placement_list)
+                link.PlacementList = placement_list
+                link.ShowElement = False
+                instances = [link.Name]
+            else:
+                instances = []
+                for placement in placement_list:
+                    link = doc.addObject("App::Link", base_name)
+                    link.setLink(source)
+                    link.Placement = placement
+                    instances.append(link.Name)
+            if hide_source and getattr(source, "ViewObject", None) is not None:
+                source.ViewObject.Visibility = False
+            timed_recompute(doc)
         except Exception as e:
+            doc.abortTransaction()
             return str(e)
+        doc.commitTransaction()
+        FreeCAD.Console.PrintMessage(
+            f"{len(placement_list)} instances of '{source_name}' created via RPC.\n"
+        )
+        return instances
+
+    def _serialize_objects_gui(self, cursor: ObjectCursor, names: list[str]):
+        doc = FreeCAD.getDocument(cursor.doc_name)
+        objects = []
+        with timed("serialize"):
+            for name in names:
+                obj = doc.getObject(name)
+                if obj is None:
+                    continue
+                if cursor.fields is None:
+                    objects.append(serialize_object(obj, cursor.shape_stats))
+                else:
+                    objects.append(serialize_object_fields(obj, cursor.fields))
+        return objects
 
-    def _save_active_screenshot(self, save_path: str, view_name: str = "Isometric"):
+    def _batch_gui(self, doc_name: str, operations: list[dict[str, Any]]):
+        doc = FreeCAD.getDocument(doc_name)
+        if not doc:
+            FreeCAD.Console.PrintError(f"Document '{doc_name}' not found.\n")
+            return f"Document '{doc_name}' not found.\n"
+
+        results = []
+        error = None
+        doc.openTransaction("MCP batch")
         try:
-            view = FreeCADGui.ActiveDocument.ActiveView
-            # Check if the view supports screenshots
-            if not hasattr(view, 'saveImage'):
-                return "Current view does not support screenshots"
-                
-            if view_name == "Isometric":
-                view.viewIsometric()
-            elif view_name == "Front":
-                view.viewFront()
-            elif view_name == "Top":
-                view.viewTop()
-            elif view_name == "Right":
-                view.viewRight()
-            elif view_name == "Back":
-                view.viewBack()
-            elif view_name == "Left":
-                view.viewLeft()
-            elif view_name == "Bottom":
-                view.viewBottom()
-            elif view_name == "Dimetric":
-                view.viewDimetric()
-            elif view_name == "Trimetric":
-                view.viewTrimetric()
-            else:
-                raise ValueError(f"Invalid view name: {view_name}")
-            view.fitAll()
-            view.saveImage(save_path, 1)
-            return True
+            for index, op in enumerate(operations):
+                action = op.get("Action")
+                name = op.get("Name")
+                if action == "create":
+                    created = Object(
+                        name=name or "New_Object",
+                        type=op.get("Type"),
+                        analysis=op.get("Analysis", None),
+                        properties=op.get("Properties", {}),
+                    )
+                    # Meshing runs as a job once the batch is committed, see batch().
+                    res = self._create_object_gui(doc_name, created, recompute=False, mesh=False, strict=True)
+                    if res is True:
+                        name = created.name
+                elif action == "edit":
+                    res = self._edit_object_gui(
+                        doc_name,
+                        Object(name=name, properties=op.get("Properties", {})),
+                        recompute=False,
+                        strict=True,
+                    )
+                elif action == "delete":
+                    res = self._delete_object_gui(doc_name, name, recompute=False)
+                else:
+                    res = f"Unknown action: {action}"
+
+                if res is True:
+                    results.append({"index": index, "action": action, "object_name": name, "success": True})
+                else:
+                    results.append({"index": index, "action": action, "object_name": name, "success": False, "error": res})
+                    error = f"Operation {index} ({action} '{name}') failed: {res}"
+                    break
+
+            if error is None:
+                timed_recompute(doc)
+        except Exception as e:
+            error = str(e)
+
+        if error is not None:
+            doc.abortTransaction()
+            timed_recompute(doc)
+            FreeCAD.Console.PrintError(f"Batch on '{doc_name}' rolled back: {error}\n")
+            return {"success": False, "error": error, "rolled_back": True, "results": results}
+
+        doc.commitTransaction()
+        FreeCAD.Console.PrintMessage(
+            f"Batch of {len(results)} operations applied to '{doc_name}' via RPC.\n"
+        )
+        return {"success": True, "results": results}
+
+    def _insert_part_from_library(self, relative_path, placement=None, use_cache=True, doc_name=None):
+        try:
+            return insert_part_from_library(
+                relative_path,
+                to_placement(placement) if placement else None,
+                use_cache,
+                doc_name,
+            )
         except Exception as e:
             return str(e)
 
+    def _capture_view_gui(
+        self,
+        view_name: str = "Isometric",
+        width: int | None = None,
+        height: int | None = None,
+        image_format: str = "png",
+        quality: int = -1,
+    ):
+        """Capture the active view; returns (result, cache key or None).
+
+        A cached image is only returned once the view is known to support
+        screenshots. It is keyed by the document revision and by the view and
+        its pixel size, so changing either renders a new image.
+        """
+        gui_doc = FreeCADGui.ActiveDocument
+        view = gui_doc.ActiveView if gui_doc else None
+        if view is None:
+            return {"success": False, "unsupported": True, "view_type": None, "error": "No active view"}, None
+
+        view_type = type(view).__name__
+        if view_type in UNSUPPORTED_VIEW_TYPES or not hasattr(view, "saveImage"):
+            return {
+                "success": False,
+                "unsupported": True,
+                "view_type": view_type,
+                "error": f"View '{view_type}' does not support screenshots",
+            }, None
+
+        doc = FreeCAD.ActiveDocument
+        identity = view_identity(view)
+        cache_key = None
+        if doc is not None and identity is not None:
+            # Read the revision before capturing: a change made meanwhile
+            # bumps it, so the entry stored afterwards can never be stale.
+            cache_key = (
+                doc.Name, document_revision(doc.Name), identity, view_name, width, height, image_format, quality
+            )
+            cached = screenshot_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached, cached=True), None
+
+        try:
+            with timed("screenshot"):
+                set_view_direction(view, view_name)
+                image = grab_view_image(view)
+                if image is None:
+                    image = render_view_image(view, width, height)
+                data, mime_type = encode_image(image, image_format, quality, width, height)
+        except Exception as e:
+            return {"success": False, "unsupported": False, "view_type": view_type, "error": str(e)}, None
+        return {"success": True, "data": data, "mime_type": mime_type, "view_type": view_type}, cache_key
+
+
+def start_rpc_server(
+    host="localhost",
+    port=9875,
+    task_timeout=None,
+    max_workers=0,
+    max_pending=16,
+    max_queue_depth=None,
+    keep_alive=True,
+    keep_alive_timeout=None,
+    code_time_limit=None,
+    max_jobs=2,
+    headless=None,
+    metrics=True,
+    trace_buffer_size=256,
+):
+    """Start the XML-RPC server in a background thread.
+
+    With `max_workers` > 0 requests are served by a bounded worker pool, so
+    read-only calls are not blocked by a slow screenshot or recompute.
+    `max_pending` limits how many requests may wait for a worker and
+    `max_queue_depth` how many tasks may wait for the GUI thread; work beyond
+    either limit is rejected with an error instead of queued.
+
+    `keep_alive` serves HTTP/1.1 persistent connections, closed after
+    `keep_alive_timeout` idle seconds. An open connection holds a server
+    thread, so the timeout defaults to 30 seconds in pool mode but to
+    2 seconds for the single-threaded server, which serves no one else
+    while a connection idles.
 
-def start_rpc_server(host="localhost", port=9875):
+    `code_time_limit` is the default wall-clock limit, in seconds, for
+    `execute_code` scripts that do not pass their own.
+
+    `max_jobs` is how many background jobs, such as FEM meshing, run at once;
+    further jobs wait in the job queue.
+
+    `headless` (default: when FreeCAD has no GUI) skips the Qt dispatcher;
+    the caller must then run the queued tasks, see `serve_headless`.
+
+    `metrics` traces every call for `get_metrics`, keeping the last
+    `trace_buffer_size` traces.
+    """
     global rpc_server_thread, rpc_server_instance
 
     if rpc_server_instance:
         return "RPC Server already running."
 
-    rpc_server_instance = SimpleXMLRPCServer(
-        (host, port), allow_none=True, logRequests=False
+    if task_timeout is not None:
+        set_task_timeout(task_timeout)
+    set_max_queue_depth(max_queue_depth)
+    code_runner.time_limit = code_time_limit
+    registry.enabled = metrics
+    registry.traces.resize(trace_buffer_size)
+    job_manager.configure(
+        max_concurrent=max_jobs,
+        results_dir=os.path.join(FreeCAD.getUserAppDataDir(), "FreeCADMCP", "jobs"),
     )
+
+    if headless is None:
+        headless = not FreeCAD.GuiUp
+    headless_stop.clear()
+    install_dispatcher(headless)
+    install_revision_tracker()
+
+    if keep_alive_timeout is None:
+        keep_alive_timeout = 30 if max_workers else 2
+    if keep_alive:
+        request_handler = type(
+            "RequestHandler", (KeepAliveRequestHandler,), {"timeout": keep_alive_timeout}
+        )
+    else:
+        request_handler = SimpleXMLRPCRequestHandler
+
+    if max_workers:
+        rpc_server_instance = PooledXMLRPCServer(
+            (host, port),
+            max_workers=max_workers,
+            max_pending=max_pending,
+            requestHandler=request_handler,
+            allow_none=True,
+            logRequests=False,
+        )
+    else:
+        rpc_server_instance = InstrumentedXMLRPCServer(
+            (host, port),
+            requestHandler=request_handler,
+            allow_none=True,
+            logRequests=False,
+        )
     rpc_server_instance.register_instance(FreeCADRPC())
 
     def server_loop():
@@ -446,8 +1134,6 @@ def start_rpc_server(host="localhost", port=9875):
     rpc_server_thread = threading.Thread(target=server_loop, daemon=True)
     rpc_server_thread.start()
 
-    QtCore.QTimer.singleShot(500, process_gui_tasks)
-
     return f"RPC Server started at {host}:{port}."
 
 
@@ -457,6 +1143,15 @@ def stop_rpc_server():
     if rpc_server_instance:
         rpc_server_instance.shutdown()
         rpc_server_thread.join()
+        rpc_server_instance.server_close()
+        cancel_pending_tasks()
+        remove_revision_tracker()
+        screenshot_cache.clear()
+        shape_cache.clear()
+        object_cursors.clear()
+        part_templates.clear()
+        job_manager.shutdown()
+        headless_stop.set()
         rpc_server_instance = None
         rpc_server_thread = None
         FreeCAD.Console.PrintMessage("RPC Server stopped.\n")
@@ -465,6 +1160,22 @@ def stop_rpc_server():
     return "RPC Server was not running."
 
 
+def serve_headless(**kwargs):
+    """Start the server without a GUI and run its tasks on the calling thread.
+
+    Meant for FreeCADCmd, whose main thread has no event loop; blocks until
+    the server is stopped or interrupted. Takes the arguments of `start_rpc_server`.
+    """
+    msg = start_rpc_server(headless=True, **kwargs)
+    FreeCAD.Console.PrintMessage(msg + "\n")
+    try:
+        serve_tasks(headless_stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_rpc_server()
+
+
 class StartRPCServerCommand:
     def GetResources(self):
         return {"MenuText": "Start RPC Server", "ToolTip": "Start RPC Server"}
@@ -489,5 +1200,6 @@ class StopRPCServerCommand:
         return True
 
 
-FreeCADGui.addCommand("Start_RPC_Server", StartRPCServerCommand())
-FreeCADGui.addCommand("Stop_RPC_Server", StopRPCServerCommand())
\ No newline at end of file
+if FreeCAD.GuiUp:
+    FreeCADGui.addCommand("Start_RPC_Server", StartRPCServerCommand())
+    FreeCADGui.addCommand("Stop_RPC_Server", StopRPCServerCommand())
\ No newline at end of file
@@ -0,0 +1,122 @@
+import itertools
+import os
+import tempfile
+
+from PySide import QtCore, QtGui
+
+# format name -> (Qt writer format, MIME type)
+IMAGE_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "jpg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+VIEW_DIRECTIONS = {
+    "Isometric": "viewIsometric",
+    "Front": "viewFront",
+    "Top": "viewTop",
+    "Right": "viewRight",
+    "Back": "viewBack",
+    "Left": "viewLeft",
+    "Bottom": "viewBottom",
+    "Dimetric": "viewDimetric",
+    "Trimetric": "viewTrimetric",
+}
+
+
+_view_ids = itertools.count(1)
+
+
+def view_identity(view) -> tuple | None:
+    """Identify the view a screenshot is taken from: which widget, at what pixel size.
+
+    The id is stored on the viewport as a Qt property, so it lives exactly as
+    long as the view and is never handed to another one. None when the view
+    has no viewport to tell it apart.
+    """
+    try:
+        viewport = view.graphicsView().viewport()
+    except Exception:
+        return None
+    view_id = viewport.property("mcpViewId")
+    if view_id is None:
+        view_id = next(_view_ids)
+        viewport.setProperty("mcpViewId", view_id)
+    ratio = viewport.devicePixelRatioF() if hasattr(viewport, "devicePixelRatioF") else 1.0
+    return (view_id, viewport.width(), viewport.height(), ratio)
+
+
+def set_view_direction(view, view_name: str):
+    method = VIEW_DIRECTIONS.get(view_name)
+    if method is None:
+        raise ValueError(f"Invalid view name: {view_name}")
+    getattr(view, method)()
+    view.fitAll()
+
+
+def grab_view_image(view) -> QtGui.QImage | None:
+    """Read the rendered 3D view straight from the framebuffer, without touching disk."""
+    try:
+        viewport = view.graphicsView().viewport()
+    except Exception:
+        return None
+    if hasattr(viewport, "grabFramebuffer"):
+        image = viewport.grabFramebuffer()
+    else:
+        image = viewport.grab().toImage()
+    return None if image.isNull() else image
+
+
+def render_view_image(view, width: int | None = None, height: int | None = None) -> QtGui.QImage:
+    """Render the view through `saveImage` for FreeCAD builds without a grabbable viewport."""
+    fd, tmp_path = tempfile.mkstemp(suffix=".png")
+    os.close(fd)
+    try:
+        if width and height:
+            view.saveImage(tmp_path, width, height, "Current")
+        else:
+            view.saveImage(tmp_path, 1)
+        image = QtGui.QImage(tmp_path)
+    finally:
+        os.remove(tmp_path)
+    if image.isNull():
+        raise RuntimeError("Failed to render the active view")
+    return image
+
+
+def encode_image(
+    image: QtGui.QImage,
+    image_format: str = "png",
+    quality: int = -1,
+    width: int | None = None,
+    height: int | None = None,
+) -> tuple[bytes, str]:
+    """Scale `image` down to fit `width` x `height` and encode it in memory.
+
+    `quality` is 0-100 for JPEG/WebP (-1 uses the Qt default).
+    Returns the encoded bytes and their MIME type.
+    """
+    if image_format.lower() not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    writer_format, mime_type = IMAGE_FORMATS[image_format.lower()]
+
+    if width or height:
+        target_width = width or image.width()
+        target_height = height or image.height()
+        if image.width() > target_width or image.height() > target_height:
+            image = image.scaled(
+                target_width,
+                target_height,
+                QtCore.Qt.KeepAspectRatio,
+                QtCore.Qt.SmoothTransformation,
+            )
+
+    buffer = QtCore.QBuffer()
+    buffer.open(QtCore.QIODevice.WriteOnly)
+    try:
+        if not image.save(buffer, writer_format, quality):
+            raise RuntimeError(f"Qt cannot encode images as {writer_format}")
+        return bytes(buffer.data()), mime_type
+    finally:
+        buffer.close()
@@ -1,28 +1,131 @@
 import FreeCAD as App
-import json
+
+from .cache import LRUCache
+from .revision import is_tracking, shape_revision
+
+
+# Properties left out of "Properties" unless asked for by name: they are
+# serialized separately (Shape), costly to stringify (meshes) or only
+# produce unstable reprs of Python objects (Proxy).
+SKIPPED_PROPERTIES = frozenset({"Shape", "Proxy", "ExpressionEngine", "FemMesh", "Mesh"})
+
+
+def _serialize_vector(value):
+    return {"x": value.x, "y": value.y, "z": value.z}
+
+
+def _serialize_rotation(value):
+    return {
+        "Axis": {"x": value.Axis.x, "y": value.Axis.y, "z": value.Axis.z},
+        "Angle": value.Angle,
+    }
+
+
+def _serialize_placement(value):
+    return {
+        "Base": _serialize_vector(value.Base),
+        "Rotation": _serialize_rotation(value.Rotation),
+    }
+
+
+def _serialize_sequence(value):
+    return [serialize_value(v) for v in value]
+
+
+def _serialize_document_object(value):
+    return value.Name
+
+
+def _serialize_other(value):
+    text = str(value)
+    # Default reprs embed memory addresses, which would make output unstable.
+    if " at 0x" in text:
+        return f"<{type(value).__name__}>"
+    return text
+
+
+def _identity(value):
+    return value
+
+
+# Exact type -> converter. Subclasses are resolved once through their MRO
+# and then cached here, so each value costs a single dict lookup.
+_CONVERTERS = {
+    int: _identity,
+    float: _identity,
+    str: _identity,
+    bool: _identity,
+    list: _serialize_sequence,
+    tuple: _serialize_sequence,
+    App.Vector: _serialize_vector,
+    App.Rotation: _serialize_rotation,
+    App.Placement: _serialize_placement,
+    App.DocumentObject: _serialize_document_object,
+}
+if hasattr(App, "Color"):
+    _CONVERTERS[App.Color] = tuple
+
+
+def _converter_for(value_type):
+    converter = _CONVERTERS.get(value_type)
+    if converter is None:
+        converter = next(
+            (_CONVERTERS[base] for base in value_type.__mro__[1:] if base in _CONVERTERS),
+            _serialize_other,
+        )
+        _CONVERTERS[value_type] = converter
+    return converter
 
 
 def serialize_value(value):
-    if isinstance(value, (int, float, str, bool)):
-        return value
-    elif isinstance(value, App.Vector):
-        return {"x": value.x, "y": value.y, "z": value.z}
-    elif isinstance(value, App.Rotation):
-        return {
-            "Axis": {"x": value.Axis.x, "y": value.Axis.y, "z": value.Axis.z},
-            "Angle": value.Angle,
-        }
-    elif isinstance(value, App.Placement):
-        return {
-            "Base": serialize_value(value.Base),
-            "Rotation": serialize_value(value.Rotation),
-        }
-    elif isinstance(value, (list, tuple)):
-        return [serialize_value(v) for v in value]
-    elif isinstance(value, (App.Color)):
-        return tuple(value)
-    else:
-        return str(value)
+    return _converter_for(type(value))(value)
+
+
+# (TypeId, PropertiesList) -> ((property, value type, converter), ...).
+# Python features (Draft, FEM) share a TypeId but not their properties, so
+# the property list is part of the key. A plan is built from the first
+# object serialized with its key and never changed once stored, so RPC
+# threads can share it without a lock; a value of another type is converted
+# without touching the plan.
+_property_plans = {}
+
+
+def _plan_properties(obj, key, properties):
+    """Serialize `obj`'s properties and store the plan they produce for `key`."""
+    result = {}
+    plan = []
+    for prop in properties:
+        if prop in SKIPPED_PROPERTIES:
+            continue
+        value_type = converter = None
+        try:
+            value = getattr(obj, prop)
+            value_type = type(value)
+            converter = _converter_for(value_type)
+            result[prop] = converter(value)
+        except Exception as e:
+            result[prop] = f"<error: {str(e)}>"
+        plan.append((prop, value_type, converter))
+    _property_plans[key] = tuple(plan)
+    return result
+
+
+def serialize_properties(obj):
+    properties = tuple(obj.PropertiesList)
+    key = (obj.TypeId, properties)
+    plan = _property_plans.get(key)
+    if plan is None:
+        return _plan_properties(obj, key, properties)
+    result = {}
+    for prop, value_type, converter in plan:
+        try:
+            value = getattr(obj, prop)
+            if type(value) is not value_type:
+                converter = _converter_for(type(value))
+            result[prop] = converter(value)
+        except Exception as e:
+            result[prop] = f"<error: {str(e)}>"
+    return result
 
 
 def serialize_shape(shape):
@@ -37,6 +140,70 @@ def serialize_shape(shape):
     }
 
 
+def _center_of_mass(shape):
+    try:
+        return serialize_value(shape.CenterOfMass)
+    except Exception:
+        # Only solids and compounds of solids have mass properties.
+        return None
+
+
+# (document, object, shape revision) -> shape summary. Summaries are only
+# cached while the revision tracker runs, since it is what invalidates them.
+shape_cache = LRUCache(max_entries=4096)
+
+
+def summarize_shape(obj, stats: bool = False):
+    """Summarize `obj.Shape`: bounding box and center of mass, plus the
+    B-rep statistics of `serialize_shape` when `stats` is True.
+
+    Results are cached per object until its Shape or Placement changes, so
+    repeated calls do no geometry work.
+    """
+    key = None
+    summary = None
+    if is_tracking():
+        doc_name = obj.Document.Name
+        key = (doc_name, obj.Name, shape_revision(doc_name, obj.Name))
+        summary = shape_cache.get(key)
+
+    if summary is None or (stats and "Volume" not in summary):
+        shape = getattr(obj, "Shape", None)
+        if shape is None:
+            return None
+        if summary is None:
+            if shape.isNull():
+                summary = {"BoundBox": None, "CenterOfMass": None}
+            else:
+                summary = {
+                    "BoundBox": serialize_bound_box(shape.BoundBox),
+                    "CenterOfMass": _center_of_mass(shape),
+                }
+        else:
+            summary = dict(summary)
+        if stats and not shape.isNull():
+            summary.update(serialize_shape(shape))
+        if key is not None:
+            shape_cache.put(key, summary)
+
+    if stats:
+        return dict(summary)
+    return {"BoundBox": summary["BoundBox"], "CenterOfMass": summary["CenterOfMass"]}
+
+
+def serialize_bound_box(box):
+    if box is None:
+        return None
+    return {
+        "XMin": box.XMin,
+        "YMin": box.YMin,
+        "ZMin": box.ZMin,
+        "XMax": box.XMax,
+        "YMax": box.YMax,
+        "ZMax": box.ZMax,
+    }
+
+
 def serialize_view_object(view):
     if view is None:
         return None
@@ -47,35 +214,62 @@ def serialize_view_object(view):
     }
 
 
-def serialize_object(obj):
+def serialize_object(obj, shape_stats: bool = False):
     if isinstance(obj, list):
-        return [serialize_object(item) for item in obj]
+        return [serialize_object(item, shape_stats) for item in obj]
     elif isinstance(obj, App.Document):
         return {
             "Name": obj.Name,
             "Label": obj.Label,
             "FileName": obj.FileName,
-            "Objects": [serialize_object(child) for child in obj.Objects],
+            "Objects": [serialize_object(child, shape_stats) for child in obj.Objects],
         }
     else:
         result = {
             "Name": obj.Name,
             "Label": obj.Label,
             "TypeId": obj.TypeId,
-            "Properties": {},
+            "Properties": serialize_properties(obj),
             "Placement": serialize_value(getattr(obj, "Placement", None)),
-            "Shape": serialize_shape(getattr(obj, "Shape", None)),
+            "Shape": summarize_shape(obj, shape_stats),
             "ViewObject": {},
         }
 
-        for prop in obj.PropertiesList:
-            try:
-                result["Properties"][prop] = serialize_value(getattr(obj, prop))
-            except Exception as e:
-                result["Properties"][prop] = f"<error: {str(e)}>"
-
         if hasattr(obj, "ViewObject") and obj.ViewObject is not None:
             view = obj.ViewObject
             result["ViewObject"] = serialize_view_object(view)
 
         return result
+
+
+def serialize_object_fields(obj, fields):
+    """Serialize only the requested parts of `obj`.
+
+    "Name", "Label" and "TypeId" are always included. `fields` may contain
+    "Placement", "BoundBox", "Shape", "ViewObject", "Properties" (every
+    property) or the names of individual properties.
+    """
+    result = {"Name": obj.Name, "Label": obj.Label, "TypeId": obj.TypeId}
+    for field in fields:
+        if field in result:
+            continue
+        if field == "Placement":
+            result["Placement"] = serialize_value(getattr(obj, "Placement", None))
+        elif field == "BoundBox":
+            summary = summarize_shape(obj)
+            result["BoundBox"] = summary["BoundBox"] if summary is not None else None
+        elif field == "Shape":
+            result["Shape"] = summarize_shape(obj, stats=True)
+        elif field == "ViewObject":
+            view = getattr(obj, "ViewObject", None)
+            result["ViewObject"] = serialize_view_object(view) if view is not None else {}
+        elif field == "Properties":
+            result.setdefault("Properties", {}).update(serialize_properties(obj))
+        elif field in obj.PropertiesList:
+            # Named explicitly, so SKIPPED_PROPERTIES do not apply.
+            try:
+                value = serialize_value(getattr(obj, field))
+            except Exception as e:
+                value = f"<error: {str(e)}>"
+            result.setdefault("Properties", {})[field] = value
+    return result
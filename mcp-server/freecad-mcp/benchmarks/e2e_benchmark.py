@@ -0,0 +1,509 @@
+"""End-to-end latency benchmark for the MCP tool path.
+
+Replays the tool sequence of a satellite build, the model the example
+clients ask for, against a running FreeCAD and reports p50/p95/p99 per tool
+and per stage:
+
+    python benchmarks/e2e_benchmark.py --port 9875
+    python benchmarks/e2e_benchmark.py --fake --fake-latency recompute=0.002,shape=0.0001
+    python benchmarks/e2e_benchmark.py --fake --mcp --output results/e2e_mcp.json
+
+By default each tool makes the XML-RPC calls the MCP server's tool makes,
+including the follow-up screenshot of the "always" screenshot policy. With
+--mcp every call goes through the freecad-mcp server over stdio instead,
+which needs the `mcp` package. --fake serves the addon on the pure-Python
+FreeCAD stand-in (fake_freecad) in a subprocess.
+
+Every call is split into stages:
+
+    queue_wait   time its GUI tasks waited for FreeCAD's main thread
+    gui_exec     time they ran there, recomputes and screenshots included
+    deserialize  reading and unmarshalling the XML-RPC responses (not with --mcp)
+    transport    everything else: HTTP, XML-RPC marshalling and, with --mcp, stdio
+    screenshot   the capture_view round trip of get_view and of the screenshot policy
+
+The first four add up to the call's total; screenshot overlaps them. Queue
+wait and GUI time are deltas of the addon's get_dispatch_stats, so nothing
+else may use the server while the benchmark runs. After each round the
+document is recomputed from scratch inside FreeCAD and timed as "recompute".
+
+Results are written as JSON. With --baseline, a previous result file is
+compared per tool and the script exits with status 1 when a p95 grew by more
+than --max-regression. Growth below --min-delta-ms, and tools with fewer than
+--min-samples calls in either run, are ignored as noise.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import shlex
+import subprocess
+import sys
+import time
+import xmlrpc.client
+from datetime import datetime, timezone
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+
+from freecad_mcp.transport import KeepAliveTransport  # noqa: E402
+
+STAGES = ("total", "queue_wait", "gui_exec", "deserialize", "transport", "screenshot")
+PERCENTILES = (0.50, 0.95, 0.99)
+
+RECOMPUTE_CODE = """\
+import time as _time
+_doc = App.getDocument({doc!r})
+for _obj in _doc.Objects:
+    _obj.touch()
+_start = _time.perf_counter()
+_doc.recompute()
+print("RECOMPUTE_MS=%f" % ((_time.perf_counter() - _start) * 1000.0))
+"""
+
+CLOSE_CODE = "App.closeDocument({doc!r})"
+
+
+def placement(x=0.0, y=0.0, z=0.0, axis=(0, 0, 1), angle=0.0):
+    return {
+        "Base": {"x": x, "y": y, "z": z},
+        "Rotation": {"Axis": {"x": axis[0], "y": axis[1], "z": axis[2]}, "Angle": angle},
+    }
+
+
+def satellite_steps(doc: str) -> list[tuple[str, dict]]:
+    """The tool calls of one satellite build, in mm, as a client makes them."""
+    steps = [
+        ("create_document", {"name": doc}),
+        ("create_object", {
+            "doc_name": doc, "obj_type": "Part::Box", "obj_name": "Bus",
+            "obj_properties": {"Length": 1000, "Width": 1000, "Height": 1200, "Placement": placement(-500, -500, 0)},
+        }),
+    ]
+    for side, sign in (("Left", -1), ("Right", 1)):
+        steps += [
+            ("create_object", {
+                "doc_name": doc, "obj_type": "Part::Cylinder", "obj_name": f"PanelHinge{side}",
+                "obj_properties": {
+                    "Radius": 40, "Height": 300,
+                    "Placement": placement(sign * 500, 0, 600, axis=(0, 1, 0), angle=sign * 90),
+                },
+            }),
+            ("create_object", {
+                "doc_name": doc, "obj_type": "Part::Box", "obj_name": f"SolarPanel{side}",
+                "obj_properties": {
+                    "Length": 2500, "Width": 1000, "Height": 30,
+                    "Placement": placement(800 if sign > 0 else -3300, -500, 585),
+                },
+            }),
+        ]
+    steps += [
+        ("create_object", {
+            "doc_name": doc, "obj_type": "Part::Cylinder", "obj_name": "AntennaMast",
+            "obj_properties": {"Radius": 30, "Height": 400, "Placement": placement(0, 0, 1200)},
+        }),
+        ("create_object", {
+            "doc_name": doc, "obj_type": "Part::Cone", "obj_name": "AntennaDish",
+            "obj_properties": {"Radius1": 50, "Radius2": 600, "Height": 250, "Placement": placement(0, 0, 1600)},
+        }),
+    ]
+    for i, (x, y) in enumerate(((-400, -400), (400, -400), (400, 400), (-400, 400)), start=1):
+        steps.append(("create_object", {
+            "doc_name": doc, "obj_type": "Part::Cone", "obj_name": f"Thruster{i}",
+            "obj_properties": {
+                "Radius1": 80, "Radius2": 30, "Height": 150,
+                "Placement": placement(x, y, 0, axis=(1, 0, 0), angle=180),
+            },
+        }))
+    steps += [
+        ("get_objects", {"doc_name": doc}),
+        ("edit_object", {
+            "doc_name": doc, "obj_name": "SolarPanelLeft",
+            "obj_properties": {"Length": 2800, "Placement": placement(-3600, -500, 585)},
+        }),
+        ("edit_object", {"doc_name": doc, "obj_name": "AntennaDish", "obj_properties": {"Radius2": 700}}),
+        ("execute_code", {"code": (
+            f"doc = App.getDocument({doc!r})\n"
+            "for i in range(4):\n"
+            "    tank = doc.addObject('Part::Sphere', f'PropellantTank{i + 1}')\n"
+            "    tank.Radius = 150\n"
+            "    tank.Placement.Base = App.Vector(-250 + 500 * (i % 2), -250 + 500 * (i // 2), 400)\n"
+            "tracker = doc.addObject('Part::Box', 'StarTracker')\n"
+            "tracker.Length = tracker.Width = tracker.Height = 120\n"
+            "tracker.Placement.Base = App.Vector(380, 380, 1200)\n"
+            "doc.recompute()\n"
+            "print(sum(o.Shape.Volume for o in doc.Objects if hasattr(o, 'Shape')))\n"
+        ), "doc_name": doc}),
+        ("get_objects", {"doc_name": doc}),
+        ("get_view", {"view_name": "Isometric", "doc_name": doc}),
+    ]
+    return steps
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Linearly interpolated percentile, as numpy computes it by default."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = q * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: list[float], unit: str = "ms") -> dict:
+    summary = {"count": len(values)}
+    for q in PERCENTILES:
+        summary[f"p{int(q * 100)}_{unit}"] = percentile(values, q)
+    summary[f"mean_{unit}"] = sum(values) / len(values) if values else None
+    summary[f"max_{unit}"] = max(values) if values else None
+    return summary
+
+
+class TimingTransport(KeepAliveTransport):
+    """Adds up the size and the read + unmarshal time of every response."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.response_bytes = 0
+        self.parse_seconds = 0.0
+
+    def parse_response(self, response):
+        self.response_bytes += int(response.getheader("Content-Length") or 0)
+        start = time.perf_counter()
+        try:
+            return super().parse_response(response)
+        finally:
+            self.parse_seconds += time.perf_counter() - start
+
+
+def connect(host: str, port: int, transport: KeepAliveTransport | None = None):
+    return xmlrpc.client.ServerProxy(
+        f"http://{host}:{port}", transport=transport or KeepAliveTransport(timeout=180.0), allow_none=True
+    )
+
+
+class DirectClient:
+    """Makes the XML-RPC calls of each MCP tool, without the MCP server."""
+
+    def __init__(self, host: str, port: int, screenshots: bool):
+        self.transport = TimingTransport(timeout=180.0)
+        self.server = connect(host, port, self.transport)
+        self.screenshots = screenshots
+        self.screenshot_seconds = 0.0
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        self.transport.close()
+
+    def _capture(self, view_name: str = "Isometric") -> dict:
+        start = time.perf_counter()
+        try:
+            return self.server.capture_view(view_name)
+        finally:
+            self.screenshot_seconds += time.perf_counter() - start
+
+    def _after_change(self, res: dict) -> dict:
+        if self.screenshots and res.get("success"):
+            self._capture()
+        return res
+
+    async def call(self, tool: str, args: dict) -> bool:
+        if tool == "create_document":
+            res = self.server.create_document(args["name"])
+        elif tool == "create_object":
+            obj_data = {
+                "Name": args["obj_name"],
+                "Type": args["obj_type"],
+                "Properties": args.get("obj_properties", {}),
+                "Analysis": args.get("analysis_name"),
+            }
+            res = self._after_change(self.server.create_object(args["doc_name"], obj_data))
+        elif tool == "edit_object":
+            res = self._after_change(
+                self.server.edit_object(args["doc_name"], args["obj_name"], {"Properties": args["obj_properties"]})
+            )
+        elif tool == "execute_code":
+            res = self._after_change(self.server.execute_code(args["code"]))
+        elif tool == "get_objects":
+            return isinstance(self.server.get_objects(args["doc_name"]), list)
+        elif tool == "get_view":
+            res = self._capture(args["view_name"])
+            return res["success"] or bool(res.get("unsupported"))
+        else:
+            raise ValueError(f"Unknown tool '{tool}'")
+        return res["success"]
+
+
+class McpClient:
+    """Calls the tools through the freecad-mcp server over stdio."""
+
+    def __init__(self, command: list[str]):
+        self.command = command
+        self.screenshot_seconds = 0.0
+        self.transport = None
+
+    async def start(self):
+        from contextlib import AsyncExitStack
+
+        from mcp import ClientSession, StdioServerParameters
+        from mcp.client.stdio import stdio_client
+
+        self._stack = AsyncExitStack()
+        params = StdioServerParameters(command=self.command[0], args=self.command[1:])
+        read, write = await self._stack.enter_async_context(stdio_client(params))
+        self.session = await self._stack.enter_async_context(ClientSession(read, write))
+        await self.session.initialize()
+
+    async def close(self):
+        await self._stack.aclose()
+
+    async def call(self, tool: str, args: dict) -> bool:
+        result = await self.session.call_tool(tool, args)
+        if result.isError:
+            return False
+        return not any(
+            getattr(content, "text", "").startswith("Failed") for content in result.content
+        )
+
+
+def dispatch_totals(stats_server) -> tuple[float, float]:
+    stats = stats_server.get_dispatch_stats()
+    return stats["queue_wait"]["sum_ms"], stats["gui_exec"]["sum_ms"]
+
+
+async def measure_call(client, stats_server, tool: str, args: dict) -> dict:
+    queue_before, gui_before = dispatch_totals(stats_server)
+    transport = client.transport
+    bytes_before = transport.response_bytes if transport else 0
+    parse_before = transport.parse_seconds if transport else 0.0
+    screenshot_before = client.screenshot_seconds
+
+    start = time.perf_counter()
+    try:
+        ok, error = await client.call(tool, args), None
+    except Exception as e:
+        ok, error = False, str(e)
+    total = (time.perf_counter() - start) * 1000.0
+
+    queue_after, gui_after = dispatch_totals(stats_server)
+    sample = {
+        "tool": tool,
+        "ok": ok,
+        "total": total,
+        "queue_wait": queue_after - queue_before,
+        "gui_exec": gui_after - gui_before,
+        "screenshot": (client.screenshot_seconds - screenshot_before) * 1000.0,
+    }
+    if transport:
+        sample["deserialize"] = (transport.parse_seconds - parse_before) * 1000.0
+        sample["response_bytes"] = transport.response_bytes - bytes_before
+    sample["transport"] = max(
+        0.0, total - sample["queue_wait"] - sample["gui_exec"] - sample.get("deserialize", 0.0)
+    )
+    if error:
+        sample["error"] = error
+    return sample
+
+
+def measure_recompute(stats_server, doc: str) -> float | None:
+    res = stats_server.execute_code(RECOMPUTE_CODE.format(doc=doc), "benchmark")
+    match = re.search(r"RECOMPUTE_MS=([0-9.]+)", res.get("message", ""))
+    return float(match.group(1)) if match else None
+
+
+async def run(args, client, stats_server) -> dict:
+    samples = []
+    recompute_ms = []
+    round_ms = []
+    run_id = datetime.now().strftime("%H%M%S")
+    await client.start()
+    try:
+        for round_index in range(args.warmup + args.rounds):
+            measured = round_index >= args.warmup
+            doc = f"Satellite_{run_id}_{round_index}"
+            round_start = time.perf_counter()
+            for step, (tool, tool_args) in enumerate(satellite_steps(doc)):
+                sample = await measure_call(client, stats_server, tool, tool_args)
+                if measured:
+                    samples.append({"round": round_index - args.warmup, "step": step, **sample})
+            elapsed = (time.perf_counter() - round_start) * 1000.0
+            recompute = measure_recompute(stats_server, doc)
+            if not args.keep_documents:
+                stats_server.execute_code(CLOSE_CODE.format(doc=doc), "benchmark")
+            if measured:
+                round_ms.append(elapsed)
+                if recompute is not None:
+                    recompute_ms.append(recompute)
+            print(f"round {round_index + 1}/{args.warmup + args.rounds}: {elapsed:.1f} ms"
+                  + ("" if measured else " (warm-up)"), file=sys.stderr)
+    finally:
+        await client.close()
+    return build_report(args, samples, recompute_ms, round_ms)
+
+
+def build_report(args, samples: list[dict], recompute_ms: list[float], round_ms: list[float]) -> dict:
+    tools = {}
+    for tool in dict.fromkeys(sample["tool"] for sample in samples):
+        calls = [sample for sample in samples if sample["tool"] == tool]
+        entry = {
+            "count": len(calls),
+            "errors": sum(not sample["ok"] for sample in calls),
+            "stages": {stage: summarize([c[stage] for c in calls if stage in c]) for stage in STAGES},
+        }
+        if any("response_bytes" in c for c in calls):
+            entry["response_bytes"] = summarize([c["response_bytes"] for c in calls], unit="bytes")
+        tools[tool] = entry
+    stages = {stage: summarize([s[stage] for s in samples if stage in s]) for stage in STAGES}
+    stages["recompute"] = summarize(recompute_ms)
+    report = {
+        "benchmark": "e2e_satellite",
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "path": "mcp" if args.mcp else "xmlrpc",
+        "target": "fake" if args.fake else f"{args.host}:{args.port}",
+        "fake_latency": args.fake_latency if args.fake else None,
+        "screenshots": not args.no_screenshots,
+        "rounds": args.rounds,
+        "warmup": args.warmup,
+        "round_ms": summarize(round_ms),
+        "tools": tools,
+        "stages": stages,
+    }
+    if args.samples:
+        report["samples"] = samples
+    return report
+
+
+def print_report(report: dict):
+    print(f"{report['rounds']} rounds over {report['path']} against {report['target']}, "
+          f"round p50 {report['round_ms']['p50_ms'] or 0:.1f} ms")
+    header = f"{'tool':<16}{'calls':>6}{'err':>5}" + "".join(f"{name:>10}" for name in ("p50", "p95", "p99"))
+    header += "".join(f"{stage[:10]:>12}" for stage in STAGES[1:])
+    print(header)
+    for tool, entry in report["tools"].items():
+        total = entry["stages"]["total"]
+        line = f"{tool:<16}{entry['count']:>6}{entry['errors']:>5}"
+        line += "".join(f"{total[key] or 0:>10.2f}" for key in ("p50_ms", "p95_ms", "p99_ms"))
+        # Stage columns show the p50 of each stage.
+        line += "".join(
+            f"{entry['stages'][stage]['p50_ms'] or 0:>12.2f}" if entry["stages"][stage]["count"] else f"{'-':>12}"
+            for stage in STAGES[1:]
+        )
+        print(line)
+    print("stages (ms)      " + "".join(f"{name:>10}" for name in ("p50", "p95", "p99")))
+    for stage, summary in report["stages"].items():
+        if summary["count"]:
+            print(f"{stage:<17}" + "".join(f"{summary[key]:>10.2f}" for key in ("p50_ms", "p95_ms", "p99_ms")))
+
+
+def compare(
+    report: dict,
+    baseline: dict,
+    max_regression: float,
+    min_delta_ms: float = 1.0,
+    min_samples: int = 5,
+) -> list[str]:
+    """Tools whose total p95 grew by more than `max_regression` (0.2 = 20%).
+
+    The growth must also exceed `min_delta_ms`, and both runs must have at
+    least `min_samples` calls of the tool; sub-millisecond tools and short
+    runs would otherwise flag scheduler jitter.
+    """
+    regressions = []
+    for tool, entry in report["tools"].items():
+        old = baseline.get("tools", {}).get(tool, {}).get("stages", {}).get("total", {})
+        new = entry["stages"]["total"]
+        before, after = old.get("p95_ms"), new["p95_ms"]
+        if not before or not after:
+            continue
+        if min(old.get("count", 0), new["count"]) < min_samples:
+            continue
+        if after > before * (1 + max_regression) and after - before >= min_delta_ms:
+            regressions.append(f"{tool}: p95 {before:.2f} ms -> {after:.2f} ms")
+    return regressions
+
+
+def start_fake(args) -> subprocess.Popen:
+    command = [sys.executable, "-m", "fake_freecad", "--host", args.host, "--port", str(args.port)]
+    if args.fake_latency:
+        command += ["--latency", args.fake_latency]
+    process = subprocess.Popen(command, cwd=PROJECT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            # A plain proxy: KeepAliveTransport would log every refused connection.
+            if xmlrpc.client.ServerProxy(f"http://{args.host}:{args.port}").ping():
+                return process
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("The fake FreeCAD server did not start")
+            time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end latency benchmark of the FreeCAD MCP tools")
+    parser.add_argument("--host", default="localhost", help="Host of the FreeCAD RPC server")
+    parser.add_argument("--port", type=int, default=9875, help="Port of the FreeCAD RPC server")
+    parser.add_argument("--rounds", type=int, default=10, help="Measured satellite builds")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured builds run first")
+    parser.add_argument("--fake", action="store_true", help="Start a fake FreeCAD on --port and benchmark it")
+    parser.add_argument("--fake-latency", default="", help="Artificial delays of the fake, e.g. recompute=0.002,shape=0.0001")
+    parser.add_argument("--mcp", action="store_true", help="Call the tools through the MCP server over stdio")
+    parser.add_argument(
+        "--mcp-command",
+        default=f"uv --directory {shlex.quote(PROJECT_DIR)} run freecad-mcp",
+        help="Command starting the MCP server; --host, --port and the screenshot policy are appended",
+    )
+    parser.add_argument("--no-screenshots", action="store_true", help="Skip the screenshots taken after each change")
+    parser.add_argument("--keep-documents", action="store_true", help="Leave the benchmark documents open")
+    parser.add_argument("--samples", action="store_true", help="Include every call in the results")
+    parser.add_argument("--output", default="results/e2e_benchmark.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", default=None, help="Earlier results to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95 growth over the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore p95 growth below this many ms")
+    parser.add_argument("--min-samples", type=int, default=5, help="Ignore tools called fewer times in either run")
+    args = parser.parse_args()
+
+    fake = start_fake(args) if args.fake else None
+    try:
+        stats_server = connect(args.host, args.port)
+        if args.mcp:
+            command = shlex.split(args.mcp_command) + [
+                "--host", args.host, "--port", str(args.port),
+                "--screenshot-policy", "never" if args.no_screenshots else "always",
+            ]
+            client = McpClient(command)
+        else:
+            client = DirectClient(args.host, args.port, screenshots=not args.no_screenshots)
+        report = asyncio.run(run(args, client, stats_server))
+    finally:
+        if fake is not None:
+            fake.terminate()
+            fake.wait()
+
+    print_report(report)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(
+                report, json.load(f), args.max_regression, args.min_delta_ms, args.min_samples
+            )
+        for regression in regressions:
+            print(f"regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
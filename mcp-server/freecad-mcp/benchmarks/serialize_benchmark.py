@@ -0,0 +1,133 @@
+"""Micro-benchmark for the addon's object serializer.
+
+Run it with FreeCAD's console interpreter:
+
+    FreeCADCmd benchmarks/serialize_benchmark.py
+
+It builds a document with 1,000 mixed Part, Draft and FEM objects and times
+the original isinstance-chain serializer against the type-dispatched one in
+rpc_server/serialize.py, both over the same properties. The time the original
+spent on the properties the new one skips, Shape above all, is reported on its
+own line. It also checks that repeated runs produce identical JSON.
+"""
+import importlib
+import json
+import os
+import sys
+import time
+import types
+
+import FreeCAD as App
+
+RPC_SERVER_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "addon", "FreeCADMCP", "rpc_server"
+)
+OBJECT_COUNT = 1000
+ROUNDS = 5
+
+
+def load_serialize():
+    # Register the package without running its __init__, which imports FreeCADGui.
+    package = types.ModuleType("rpc_server")
+    package.__path__ = [RPC_SERVER_DIR]
+    sys.modules.setdefault("rpc_server", package)
+    return importlib.import_module("rpc_server.serialize")
+
+
+def legacy_serialize_value(value):
+    if isinstance(value, (int, float, str, bool)):
+        return value
+    elif isinstance(value, App.Vector):
+        return {"x": value.x, "y": value.y, "z": value.z}
+    elif isinstance(value, App.Rotation):
+        return {
+            "Axis": {"x": value.Axis.x, "y": value.Axis.y, "z": value.Axis.z},
+            "Angle": value.Angle,
+        }
+    elif isinstance(value, App.Placement):
+        return {
+            "Base": legacy_serialize_value(value.Base),
+            "Rotation": legacy_serialize_value(value.Rotation),
+        }
+    elif isinstance(value, (list, tuple)):
+        return [legacy_serialize_value(v) for v in value]
+    elif hasattr(App, "Color") and isinstance(value, App.Color):
+        return tuple(value)
+    else:
+        return str(value)
+
+
+def legacy_serialize_properties(obj, skipped=frozenset()):
+    result = {}
+    for prop in obj.PropertiesList:
+        if prop in skipped:
+            continue
+        try:
+            result[prop] = legacy_serialize_value(getattr(obj, prop))
+        except Exception as e:
+            result[prop] = f"<error: {str(e)}>"
+    return result
+
+
+def build_document():
+    import Draft
+    import ObjectsFem
+
+    doc = App.newDocument("SerializeBenchmark")
+    for i in range(OBJECT_COUNT):
+        kind = i % 6
+        base = App.Vector(i, 0, 0)
+        if kind == 0:
+            obj = doc.addObject("Part::Box", f"Box{i}")
+            obj.Length = 1 + i % 7
+        elif kind == 1:
+            obj = doc.addObject("Part::Cylinder", f"Cylinder{i}")
+            obj.Radius = 1 + i % 3
+        elif kind == 2:
+            obj = Draft.make_wire([base, base + App.Vector(5, 5, 0), base + App.Vector(10, 0, 0)])
+        elif kind == 3:
+            obj = Draft.make_circle(2 + i % 4, placement=App.Placement(base, App.Rotation()))
+        elif kind == 4:
+            obj = ObjectsFem.makeConstraintFixed(doc, f"Fixed{i}")
+        else:
+            obj = ObjectsFem.makeMaterialSolid(doc, f"Material{i}")
+        if hasattr(obj, "Placement"):
+            obj.Placement = App.Placement(base, App.Rotation(App.Vector(0, 0, 1), i % 90))
+    doc.recompute()
+    return doc
+
+
+def time_rounds(func, objects):
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for obj in objects:
+            func(obj)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    serialize = load_serialize()
+    doc = build_document()
+    objects = doc.Objects
+    try:
+        # Same properties for both; the skipped ones are timed apart.
+        legacy = time_rounds(lambda obj: legacy_serialize_properties(obj, serialize.SKIPPED_PROPERTIES), objects)
+        legacy_all = time_rounds(legacy_serialize_properties, objects)
+        current = time_rounds(serialize.serialize_properties, objects)
+        first = json.dumps([serialize.serialize_properties(obj) for obj in objects])
+        second = json.dumps([serialize.serialize_properties(obj) for obj in objects])
+        print(f"objects: {len(objects)}, best of {ROUNDS} rounds")
+        print(f"legacy serializer:  {legacy * 1000:8.1f} ms")
+        print(f"current serializer: {current * 1000:8.1f} ms ({legacy / current:.2f}x)")
+        skipped = ", ".join(sorted(serialize.SKIPPED_PROPERTIES))
+        print(f"legacy cost of {skipped}: {(legacy_all - legacy) * 1000:8.1f} ms (skipped by both)")
+        print(f"stable output: {first == second} ({len(first)} bytes)")
+    finally:
+        App.closeDocument(doc.Name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""A pure-Python stand-in for FreeCAD, for testing and load-testing without it.
+
+`install()` registers the stand-ins as the `FreeCAD` and `ObjectsFem`
+modules and puts the addon on sys.path, so the real `rpc_server` package
+imports and runs on top of them. The fake has no GUI (`FreeCAD.GuiUp` is 0),
+so the addon runs in its headless mode and screenshots report "unsupported".
+
+    python -m fake_freecad --port 9875 --latency recompute=0.002,shape=0.0001
+
+serves the addon's FreeCADRPC over XML-RPC like a headless FreeCAD would;
+`start_server()` does the same from a background thread of the calling process.
+"""
+
+import os
+import sys
+import threading
+import time
+import xmlrpc.client
+
+from . import app, fem
+from .latency import LATENCIES, parse_latencies, set_latencies
+
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "addon", "FreeCADMCP")
+
+__all__ = ["LATENCIES", "install", "parse_latencies", "set_latencies", "start_server"]
+
+
+def install(**latencies: float):
+    """Make `import FreeCAD` and `import ObjectsFem` load the stand-ins."""
+    existing = sys.modules.get("FreeCAD")
+    if existing is not None and existing is not app:
+        raise RuntimeError("The real FreeCAD module is already imported.")
+    sys.modules["FreeCAD"] = app
+    sys.modules["ObjectsFem"] = fem
+    if ADDON_DIR not in sys.path:
+        sys.path.insert(0, ADDON_DIR)
+    set_latencies(**latencies)
+
+
+def start_server(host: str = "localhost", port: int = 9875, startup_timeout: float = 10.0, **kwargs):
+    """Serve the addon's FreeCADRPC on the stand-in from a background thread.
+
+    That thread plays FreeCAD's main thread and runs every document task.
+    Keyword arguments go to `start_rpc_server`. Returns the addon's
+    `rpc_server` module; call its `stop_rpc_server()` to shut down.
+    """
+    install()
+    from rpc_server import rpc_server
+
+    thread = threading.Thread(
+        target=rpc_server.serve_headless, kwargs=dict(host=host, port=port, **kwargs), daemon=True
+    )
+    thread.start()
+    deadline = time.monotonic() + startup_timeout
+    while True:
+        try:
+            if xmlrpc.client.ServerProxy(f"http://{host}:{port}").ping():
+                return rpc_server
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
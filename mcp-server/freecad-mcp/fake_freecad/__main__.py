@@ -0,0 +1,36 @@
+import argparse
+import logging
+
+from . import install, parse_latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m fake_freecad", description="Serve the FreeCAD MCP addon on a fake FreeCAD"
+    )
+    parser.add_argument("--host", default="localhost", help="Host to listen on")
+    parser.add_argument("--port", type=int, default=9875, help="Port to listen on")
+    parser.add_argument("--max-workers", type=int, default=4, help="RPC worker threads (0 for a single thread)")
+    parser.add_argument("--max-jobs", type=int, default=2, help="Background jobs run at once")
+    parser.add_argument(
+        "--latency",
+        default="",
+        help="Artificial delays in seconds, e.g. recompute=0.002,add_object=0.0005,shape=0.0001",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Log every FreeCAD console message")
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    install(**parse_latencies(args.latency))
+    from rpc_server import rpc_server
+
+    rpc_server.serve_headless(
+        host=args.host, port=args.port, max_workers=args.max_workers, max_jobs=args.max_jobs
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,512 @@
+"""Stand-in for the `FreeCAD` module, installed as sys.modules["FreeCAD"].
+
+Implements the part of the App API the addon uses: documents, objects with
+typed properties and touched/recompute state, document observers,
+transactions, App::Link, groups and Part primitives with summarized shapes.
+"""
+
+import logging
+import os
+import re
+import tempfile
+
+from . import shapes
+from .base import Placement, Rotation, Vector
+from .latency import delay
+from .shapes import BoundBox, Shape
+
+__all__ = ["Vector", "Rotation", "Placement", "BoundBox", "Shape"]
+
+GuiUp = 0
+
+logger = logging.getLogger("fake_freecad")
+
+
+class _Console:
+    def PrintMessage(self, text):
+        logger.debug(text.rstrip())
+
+    def PrintLog(self, text):
+        logger.debug(text.rstrip())
+
+    def PrintWarning(self, text):
+        logger.warning(text.rstrip())
+
+    def PrintError(self, text):
+        logger.error(text.rstrip())
+
+
+Console = _Console()
+
+_user_dir = os.environ.get("FAKE_FREECAD_USER_DIR") or os.path.join(tempfile.gettempdir(), "fake_freecad")
+
+
+def getUserAppDataDir() -> str:
+    return _user_dir + os.sep
+
+
+def Version():
+    return ["1", "0", "0", "fake"]
+
+
+# Document observers ------------------------------------------------------
+
+_observers = []
+
+
+def addDocumentObserver(observer):
+    _observers.append(observer)
+
+
+def removeDocumentObserver(observer):
+    _observers.remove(observer)
+
+
+def _notify(slot, *args):
+    for observer in list(_observers):
+        method = getattr(observer, slot, None)
+        if method is not None:
+            method(*args)
+
+
+# Object types ------------------------------------------------------------
+
+_SHAPE_BUILDERS = {
+    "Part::Box": lambda o: shapes.box_shape(o.Length, o.Width, o.Height),
+    "Part::Cylinder": lambda o: shapes.cylinder_shape(o.Radius, o.Height),
+    "Part::Cone": lambda o: shapes.cone_shape(o.Radius1, o.Radius2, o.Height),
+    "Part::Sphere": lambda o: shapes.sphere_shape(o.Radius),
+    "Part::Torus": lambda o: shapes.torus_shape(o.Radius1, o.Radius2),
+}
+
+# TypeId -> default values of its own properties.
+TYPES = {
+    "App::FeaturePython": {},
+    "App::DocumentObjectGroup": {"Group": []},
+    "App::Part": {"Placement": None, "Group": []},
+    "App::Link": {
+        "Placement": None,
+        "LinkedObject": None,
+        "ElementCount": 0,
+        "PlacementList": [],
+        "ShowElement": True,
+        "Shape": None,
+    },
+    "Part::Feature": {"Placement": None, "Shape": None},
+    "Part::Box": {"Placement": None, "Shape": None, "Length": 10.0, "Width": 10.0, "Height": 10.0},
+    "Part::Cylinder": {"Placement": None, "Shape": None, "Radius": 2.0, "Height": 10.0, "Angle": 360.0},
+    "Part::Cone": {"Placement": None, "Shape": None, "Radius1": 2.0, "Radius2": 4.0, "Height": 10.0, "Angle": 360.0},
+    "Part::Sphere": {"Placement": None, "Shape": None, "Radius": 5.0},
+    "Part::Torus": {"Placement": None, "Shape": None, "Radius1": 10.0, "Radius2": 2.0},
+    "PartDesign::Body": {"Placement": None, "Group": [], "Tip": None, "Shape": None},
+    "Fem::FemAnalysisPython": {"Group": []},
+    "Fem::FemMeshGmsh": {
+        "Part": None,
+        "ElementSizeMax": 0.0,
+        "ElementSizeMin": 0.0,
+        "ElementOrder": "2nd",
+        "MeshAlgorithm": "Automatic",
+        "FemMesh": None,
+    },
+}
+
+_GROUP_TYPES = {"App::DocumentObjectGroup", "App::Part", "PartDesign::Body", "Fem::FemAnalysisPython"}
+
+
+def register_type(type_id: str, properties: dict, shape=None):
+    """Add an object type; `shape(obj)` builds its Shape on recompute."""
+    TYPES[type_id] = dict(properties)
+    if shape is not None:
+        _SHAPE_BUILDERS[type_id] = shape
+
+
+def _default(value):
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+class DocumentObject:
+    """An object whose properties live in an ordered dict.
+
+    Setting a property touches the object and notifies the observers like
+    FreeCAD does; the shape is rebuilt on the next `Document.recompute`.
+    """
+
+    def __init__(self, doc: "Document", type_id: str, name: str):
+        object.__setattr__(self, "_doc", doc)
+        object.__setattr__(self, "_type_id", type_id)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_touched", True)
+        props = {"Label": name, "Label2": "", "Visibility": True, "ExpressionEngine": []}
+        for prop, value in TYPES.get(type_id, {}).items():
+            props[prop] = _default(value)
+        if "Placement" in props:
+            props["Placement"] = Placement()
+        if "Shape" in props:
+            props["Shape"] = Shape()
+        object.__setattr__(self, "_props", props)
+
+    @property
+    def Name(self):
+        return self._name
+
+    @property
+    def TypeId(self):
+        return self._type_id
+
+    @property
+    def Document(self):
+        return self._doc
+
+    @property
+    def PropertiesList(self):
+        return list(self._props)
+
+    @property
+    def ViewObject(self):
+        # No GUI.
+        return None
+
+    @property
+    def InList(self):
+        return [obj for obj in self._doc.Objects if self in obj.OutList]
+
+    @property
+    def OutList(self):
+        out = []
+        for value in self._props.values():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for item in values:
+                if isinstance(item, DocumentObject) and item not in out:
+                    out.append(item)
+        return out
+
+    @property
+    def Group(self):
+        if "Group" not in self._props:
+            raise AttributeError(f"'{self._type_id}' object has no attribute 'Group'")
+        return list(self._props["Group"])
+
+    @Group.setter
+    def Group(self, value):
+        self._set("Group", list(value))
+
+    def __getattr__(self, name):
+        props = object.__getattribute__(self, "_props")
+        if name in props:
+            return props[name]
+        raise AttributeError(f"'{self._type_id}' object has no attribute '{name}'")
+
+    def __setattr__(self, name, value):
+        if name in type(self).__dict__ and isinstance(type(self).__dict__[name], property):
+            descriptor = type(self).__dict__[name]
+            if descriptor.fset is None:
+                raise AttributeError(f"Attribute '{name}' of object '{self._name}' is read-only")
+            descriptor.fset(self, value)
+            return
+        if name not in self._props:
+            raise AttributeError(f"'{self._type_id}' object has no attribute '{name}'")
+        self._set(name, value)
+
+    def _set(self, name, value):
+        delay("set_property")
+        current = self._props[name]
+        if name == "Placement" or isinstance(current, Placement):
+            if not isinstance(value, Placement):
+                raise TypeError(f"Property '{name}' expects a Placement, not {type(value).__name__}")
+            value = value.copy()
+        elif isinstance(current, Vector):
+            value = Vector(value)
+        elif isinstance(current, float) and isinstance(value, (int, float, str)):
+            value = _to_float(value)
+        elif name == "Shape" and not isinstance(value, Shape):
+            raise TypeError("Property 'Shape' expects a Shape")
+        self._props[name] = value
+        if name not in ("Label", "Label2", "Visibility"):
+            object.__setattr__(self, "_touched", True)
+        _notify("slotChangedObject", self, name)
+
+    # Methods of the real object -----------------------------------------
+
+    def touch(self):
+        object.__setattr__(self, "_touched", True)
+
+    def isTouched(self) -> bool:
+        return self._touched
+
+    def recompute(self) -> bool:
+        self._doc._recompute_object(self)
+        return True
+
+    def getPropertyByName(self, name):
+        return self._props[name]
+
+    def addProperty(self, type_name: str, name: str, group: str = "", doc: str = ""):
+        if name not in self._props:
+            self._props[name] = 0.0 if "Float" in type_name or "Length" in type_name else None
+        return self
+
+    def addObject(self, obj):
+        """Add `obj` to this group; returns the added objects like FreeCAD."""
+        if self._type_id not in _GROUP_TYPES:
+            raise AttributeError(f"'{self._type_id}' object has no attribute 'addObject'")
+        group = self._props["Group"]
+        if obj not in group:
+            self._set("Group", group + [obj])
+        return [obj]
+
+    def setLink(self, obj):
+        if self._type_id != "App::Link":
+            raise AttributeError(f"'{self._type_id}' object has no attribute 'setLink'")
+        self._set("LinkedObject", obj)
+
+    def getLinkedObject(self, recursive: bool = True):
+        linked = self._props.get("LinkedObject")
+        if linked is None:
+            return self
+        return linked.getLinkedObject(recursive) if recursive else linked
+
+    def __repr__(self):
+        return f"<{self._type_id} object>"
+
+
+def _to_float(value):
+    if isinstance(value, str):
+        # Quantities such as "10 mm": keep the number.
+        match = re.match(r"\s*([-+]?[0-9.eE+-]+)", value)
+        if match is None:
+            raise ValueError(f"Cannot convert '{value}' to a number")
+        return float(match.group(1))
+    return float(value)
+
+
+class Document:
+    def __init__(self, name: str, label: str | None = None, hidden: bool = False):
+        self.Name = name
+        self.Label = label or name
+        self.FileName = ""
+        self.Hidden = hidden
+        self._objects: dict[str, DocumentObject] = {}
+        self._transaction = None
+
+    def __getattr__(self, name):
+        # Objects are attributes of their document, as in `doc.Box`.
+        objects = self.__dict__.get("_objects", {})
+        if name in objects:
+            return objects[name]
+        raise AttributeError(f"'Document' object has no attribute '{name}'")
+
+    @property
+    def Objects(self):
+        return list(self._objects.values())
+
+    @property
+    def RootObjects(self):
+        return [obj for obj in self._objects.values() if not obj.InList]
+
+    def supportedTypes(self):
+        return sorted(TYPES)
+
+    def _unique_name(self, name: str) -> str:
+        name = re.sub(r"[^A-Za-z0-9_]", "_", name or "Unnamed")
+        if name[0].isdigit():
+            name = "_" + name
+        if name not in self._objects:
+            return name
+        base = re.sub(r"\d+$", "", name)
+        index = 1
+        while f"{base}{index:03d}" in self._objects:
+            index += 1
+        return f"{base}{index:03d}"
+
+    def addObject(self, type_id: str, name: str | None = None):
+        if type_id not in TYPES and not type_id.startswith("Fem::"):
+            raise ValueError(f"No document object found of type '{type_id}'")
+        delay("add_object")
+        obj = DocumentObject(self, type_id, self._unique_name(name or type_id.split("::")[-1]))
+        self._objects[obj.Name] = obj
+        _notify("slotCreatedObject", obj)
+        return obj
+
+    def getObject(self, name: str):
+        return self._objects.get(name)
+
+    def getObjectsByLabel(self, label: str):
+        return [obj for obj in self._objects.values() if obj.Label == label]
+
+    def removeObject(self, name: str):
+        obj = self._objects.get(name)
+        if obj is None:
+            raise NameError(f"No document object found with name '{name}'")
+        delay("remove_object")
+        for other in self._objects.values():
+            if "Group" in other._props and obj in other._props["Group"]:
+                other._props["Group"] = [o for o in other._props["Group"] if o is not obj]
+        del self._objects[name]
+        _notify("slotDeletedObject", obj)
+
+    def copyObject(self, objects, with_dependencies: bool = False):
+        single = isinstance(objects, DocumentObject)
+        sources = [objects] if single else list(objects)
+        copies = {}
+        for source in sources:
+            copy = self.addObject(source.TypeId, source.Name)
+            copies[source] = copy
+        for source, copy in copies.items():
+            for prop, value in source._props.items():
+                if isinstance(value, DocumentObject):
+                    value = copies.get(value, value)
+                elif isinstance(value, list):
+                    value = [copies.get(v, v) if isinstance(v, DocumentObject) else v for v in value]
+                elif isinstance(value, Placement):
+                    value = value.copy()
+                copy._props[prop] = value
+            copy.touch()
+        result = list(copies.values())
+        return result[0] if single else result
+
+    def mergeProject(self, path: str):
+        raise OSError(f"The fake FreeCAD cannot read '{path}'")
+
+    def _recompute_object(self, obj: DocumentObject):
+        delay("recompute")
+        builder = _SHAPE_BUILDERS.get(obj.TypeId)
+        if builder is not None:
+            shape = builder(obj).transformed(obj._props["Placement"])
+        elif obj.TypeId == "App::Link":
+            shape = _link_shape(obj)
+        elif obj.TypeId == "PartDesign::Body":
+            tip = obj._props.get("Tip")
+            shape = tip.Shape if tip is not None and "Shape" in tip._props else Shape()
+        else:
+            shape = None
+        if shape is not None and "Shape" in obj._props:
+            obj._props["Shape"] = shape
+            _notify("slotChangedObject", obj, "Shape")
+        object.__setattr__(obj, "_touched", False)
+
+    def recompute(self) -> int:
+        touched = [obj for obj in self._objects.values() if obj._touched]
+        # Links follow the objects they link to.
+        touched += [
+            obj
+            for obj in self._objects.values()
+            if obj.TypeId == "App::Link" and obj not in touched
+            and obj._props["LinkedObject"] in touched
+        ]
+        for obj in sorted(touched, key=lambda o: o.TypeId == "App::Link"):
+            self._recompute_object(obj)
+        _notify("slotRecomputedDocument", self)
+        return len(touched)
+
+    # Transactions -------------------------------------------------------
+
+    def openTransaction(self, name: str = ""):
+        self._transaction = (
+            dict(self._objects),
+            {obj: dict(obj._props) for obj in self._objects.values()},
+        )
+
+    def commitTransaction(self):
+        self._transaction = None
+
+    def abortTransaction(self):
+        if self._transaction is None:
+            return
+        objects, props = self._transaction
+        self._transaction = None
+        for name, obj in list(self._objects.items()):
+            if name not in objects:
+                del self._objects[name]
+                _notify("slotDeletedObject", obj)
+        for name, obj in objects.items():
+            if name not in self._objects:
+                self._objects[name] = obj
+                _notify("slotCreatedObject", obj)
+            if obj._props != props[obj]:
+                object.__setattr__(obj, "_props", dict(props[obj]))
+                _notify("slotChangedObject", obj, "Shape")
+        # Keep the original creation order.
+        self._objects = {name: self._objects[name] for name in objects}
+        _notify("slotUndoDocument", self)
+
+    def undo(self):
+        self.abortTransaction()
+
+    def save(self):
+        pass
+
+    def __repr__(self):
+        return f"<Document object '{self.Name}'>"
+
+
+def _link_shape(link: DocumentObject) -> Shape:
+    source = link._props["LinkedObject"]
+    if source is None or "Shape" not in source._props:
+        return Shape()
+    # The linked object's placement is replaced by the link's own.
+    local = source._props["Shape"].transformed(source._props.get("Placement", Placement()).inverse())
+    if link._props["ElementCount"]:
+        return shapes.compound(
+            [local.transformed(link._props["Placement"].multiply(p)) for p in link._props["PlacementList"]]
+        )
+    return local.transformed(link._props["Placement"])
+
+
+# Documents -----------------------------------------------------------------
+
+_documents: dict[str, Document] = {}
+ActiveDocument = None
+
+
+def newDocument(name: str = "Unnamed", label: str | None = None, hidden: bool = False):
+    global ActiveDocument
+    delay("new_document")
+    base = re.sub(r"[^A-Za-z0-9_]", "_", name) or "Unnamed"
+    unique, index = base, 0
+    while unique in _documents:
+        index += 1
+        unique = f"{base}{index}"
+    doc = Document(unique, label or name, hidden)
+    _documents[unique] = doc
+    ActiveDocument = doc
+    _notify("slotCreatedDocument", doc)
+    return doc
+
+
+def getDocument(name: str) -> Document:
+    try:
+        return _documents[name]
+    except KeyError:
+        raise NameError(f"Unknown document '{name}'") from None
+
+
+def listDocuments() -> dict[str, Document]:
+    return dict(_documents)
+
+
+def setActiveDocument(name: str):
+    global ActiveDocument
+    ActiveDocument = getDocument(name)
+
+
+def closeDocument(name: str):
+    global ActiveDocument
+    doc = getDocument(name)
+    del _documents[name]
+    if ActiveDocument is doc:
+        ActiveDocument = next(iter(_documents.values()), None)
+    _notify("slotDeletedDocument", doc)
+
+
+def openDocument(path: str, hidden: bool = False):
+    raise OSError(f"The fake FreeCAD cannot open '{path}'")
+
+
+def reset():
+    """Close every document; for reuse between load-test runs."""
+    for name in list(_documents):
+        closeDocument(name)
@@ -0,0 +1,170 @@
+import math
+
+
+class Vector:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        if isinstance(x, Vector):
+            x, y, z = x.x, x.y, x.z
+        elif isinstance(x, (tuple, list)):
+            x, y, z = x
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def __add__(self, other):
+        return Vector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return Vector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, scale):
+        if isinstance(scale, Vector):
+            return self.dot(scale)
+        return Vector(self.x * scale, self.y * scale, self.z * scale)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Vector(-self.x, -self.y, -self.z)
+
+    def __eq__(self, other):
+        return isinstance(other, Vector) and (self.x, self.y, self.z) == (other.x, other.y, other.z)
+
+    def __hash__(self):
+        return hash((self.x, self.y, self.z))
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __repr__(self):
+        return f"Vector ({self.x}, {self.y}, {self.z})"
+
+    @property
+    def Length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def dot(self, other):
+        return self.x * other.x + self.y * other.y + self.z * other.z
+
+    def cross(self, other):
+        return Vector(
+            self.y * other.z - self.z * other.y,
+            self.z * other.x - self.x * other.z,
+            self.x * other.y - self.y * other.x,
+        )
+
+    def normalize(self):
+        length = self.Length
+        if length == 0:
+            raise ValueError("Cannot normalize null vector")
+        self.x, self.y, self.z = self.x / length, self.y / length, self.z / length
+        return self
+
+
+class Rotation:
+    """Unit quaternion. Built from an axis and an angle in degrees, like FreeCAD;
+    `Angle` reads back in radians."""
+
+    __slots__ = ("_q",)
+
+    def __init__(self, *args):
+        if not args:
+            self._q = (0.0, 0.0, 0.0, 1.0)
+        elif len(args) == 1 and isinstance(args[0], Rotation):
+            self._q = args[0]._q
+        elif len(args) == 2 and isinstance(args[0], Vector):
+            axis, degrees = Vector(args[0]), math.radians(args[1])
+            if axis.Length == 0:
+                self._q = (0.0, 0.0, 0.0, 1.0)
+            else:
+                axis.normalize()
+                s = math.sin(degrees / 2)
+                self._q = (axis.x * s, axis.y * s, axis.z * s, math.cos(degrees / 2))
+        elif len(args) == 4:
+            x, y, z, w = (float(a) for a in args)
+            norm = math.sqrt(x * x + y * y + z * z + w * w) or 1.0
+            self._q = (x / norm, y / norm, z / norm, w / norm)
+        else:
+            raise TypeError("Rotation() takes (), (Rotation), (Vector axis, float degrees) or (x, y, z, w)")
+
+    @property
+    def Q(self):
+        return self._q
+
+    @property
+    def Angle(self):
+        return 2 * math.acos(max(-1.0, min(1.0, self._q[3])))
+
+    @property
+    def Axis(self):
+        x, y, z, w = self._q
+        s = math.sqrt(max(0.0, 1 - w * w))
+        if s < 1e-12:
+            return Vector(0, 0, 1)
+        return Vector(x / s, y / s, z / s)
+
+    def multiply(self, other: "Rotation") -> "Rotation":
+        x1, y1, z1, w1 = self._q
+        x2, y2, z2, w2 = other._q
+        return Rotation(
+            w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+            w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+            w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+            w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        )
+
+    def multVec(self, vector: Vector) -> Vector:
+        x, y, z, w = self._q
+        u = Vector(x, y, z)
+        uv = u.cross(vector)
+        uuv = u.cross(uv)
+        return vector + uv * (2 * w) + uuv * 2
+
+    def inverted(self) -> "Rotation":
+        x, y, z, w = self._q
+        return Rotation(-x, -y, -z, w)
+
+    def isIdentity(self) -> bool:
+        return abs(self._q[3]) >= 1 - 1e-12
+
+    def __eq__(self, other):
+        return isinstance(other, Rotation) and self._q == other._q
+
+    def __repr__(self):
+        axis = self.Axis
+        return f"Rotation (axis=({axis.x}, {axis.y}, {axis.z}), angle={self.Angle})"
+
+
+class Placement:
+    __slots__ = ("Base", "Rotation")
+
+    def __init__(self, base: Vector | None = None, rotation: Rotation | None = None):
+        if isinstance(base, Placement):
+            base, rotation = base.Base, base.Rotation
+        self.Base = Vector(base) if base is not None else Vector()
+        self.Rotation = Rotation(rotation) if rotation is not None else Rotation()
+
+    def multiply(self, other: "Placement") -> "Placement":
+        return Placement(self.Base + self.Rotation.multVec(other.Base), self.Rotation.multiply(other.Rotation))
+
+    def multVec(self, vector: Vector) -> Vector:
+        return self.Rotation.multVec(vector) + self.Base
+
+    def inverse(self) -> "Placement":
+        rotation = self.Rotation.inverted()
+        return Placement(-rotation.multVec(self.Base), rotation)
+
+    def copy(self) -> "Placement":
+        return Placement(self.Base, self.Rotation)
+
+    def isIdentity(self) -> bool:
+        return self.Base == Vector() and self.Rotation.isIdentity()
+
+    def __eq__(self, other):
+        return isinstance(other, Placement) and self.Base == other.Base and self.Rotation == other.Rotation
+
+    def __repr__(self):
+        return f"Placement [Pos={self.Base!r}, {self.Rotation!r}]"
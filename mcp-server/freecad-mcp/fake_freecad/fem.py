@@ -0,0 +1,38 @@
+"""Stand-in for `ObjectsFem`, installed as sys.modules["ObjectsFem"].
+
+`makeAnalysis`, `makeMeshGmsh` and `makeMaterialSolid` create objects of the
+matching FEM types; any other `make<Type>(doc, name)` creates a plain
+"Fem::<Type>" object without type-specific properties.
+"""
+
+
+def makeAnalysis(doc, name="Analysis"):
+    return doc.addObject("Fem::FemAnalysisPython", name)
+
+
+def makeMeshGmsh(doc, part=None, name="FEMMeshGmsh"):
+    # Called as makeMeshGmsh(doc, name) by the addon.
+    if isinstance(part, str):
+        part, name = None, part
+    obj = doc.addObject("Fem::FemMeshGmsh", name)
+    if part is not None:
+        obj.Part = part
+    return obj
+
+
+def makeMaterialSolid(doc, name="MaterialSolid"):
+    obj = doc.addObject("Fem::MaterialCommon", name)
+    obj.addProperty("App::PropertyMap", "Material")
+    return obj
+
+
+def __getattr__(attr):
+    if not attr.startswith("make"):
+        raise AttributeError(attr)
+    type_name = attr[len("make"):]
+
+    def make(doc, name=type_name):
+        return doc.addObject(f"Fem::{type_name}", name)
+
+    make.__name__ = attr
+    return make
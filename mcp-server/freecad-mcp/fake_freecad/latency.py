@@ -0,0 +1,41 @@
+import os
+import time
+
+# Seconds of artificial delay per operation. "recompute" is charged per
+# recomputed object and "shape" per shape property read (Volume, Area,
+# BoundBox, ...), the costs that dominate a real FreeCAD.
+LATENCIES = {
+    "new_document": 0.0,
+    "add_object": 0.0,
+    "remove_object": 0.0,
+    "set_property": 0.0,
+    "recompute": 0.0,
+    "shape": 0.0,
+}
+
+
+def set_latencies(**latencies: float):
+    for name, seconds in latencies.items():
+        if name not in LATENCIES:
+            raise ValueError(f"Unknown latency '{name}'. Known: {', '.join(LATENCIES)}")
+        LATENCIES[name] = float(seconds)
+
+
+def parse_latencies(spec: str) -> dict[str, float]:
+    """Parse "recompute=0.002,add_object=0.0005" (seconds)."""
+    latencies = {}
+    for item in spec.split(","):
+        if item.strip():
+            name, _, seconds = item.partition("=")
+            latencies[name.strip()] = float(seconds)
+    return latencies
+
+
+def delay(name: str, count: int = 1):
+    seconds = LATENCIES[name] * count
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+if os.environ.get("FAKE_FREECAD_LATENCY"):
+    set_latencies(**parse_latencies(os.environ["FAKE_FREECAD_LATENCY"]))
@@ -0,0 +1,185 @@
+import math
+
+from .base import Vector
+from .latency import delay
+
+
+class BoundBox:
+    def __init__(self, xmin=0.0, ymin=0.0, zmin=0.0, xmax=0.0, ymax=0.0, zmax=0.0):
+        self.XMin, self.YMin, self.ZMin = xmin, ymin, zmin
+        self.XMax, self.YMax, self.ZMax = xmax, ymax, zmax
+
+    @property
+    def XLength(self):
+        return self.XMax - self.XMin
+
+    @property
+    def YLength(self):
+        return self.YMax - self.YMin
+
+    @property
+    def ZLength(self):
+        return self.ZMax - self.ZMin
+
+    def corners(self):
+        return [
+            (x, y, z)
+            for x in (self.XMin, self.XMax)
+            for y in (self.YMin, self.YMax)
+            for z in (self.ZMin, self.ZMax)
+        ]
+
+    def copy(self) -> "BoundBox":
+        return BoundBox(self.XMin, self.YMin, self.ZMin, self.XMax, self.YMax, self.ZMax)
+
+    def add(self, other: "BoundBox"):
+        self.XMin, self.YMin, self.ZMin = min(self.XMin, other.XMin), min(self.YMin, other.YMin), min(self.ZMin, other.ZMin)
+        self.XMax, self.YMax, self.ZMax = max(self.XMax, other.XMax), max(self.YMax, other.YMax), max(self.ZMax, other.ZMax)
+
+    def __repr__(self):
+        return f"BoundBox ({self.XMin}, {self.YMin}, {self.ZMin}, {self.XMax}, {self.YMax}, {self.ZMax})"
+
+
+class Shape:
+    """A summary of a B-rep: the numbers `serialize.py` reads, not real geometry.
+
+    Reading a geometric property costs the "shape" latency.
+    """
+
+    def __init__(
+        self,
+        volume=0.0,
+        area=0.0,
+        bound_box: BoundBox | None = None,
+        center=(0.0, 0.0, 0.0),
+        counts=(0, 0, 0),
+    ):
+        self._volume = volume
+        self._area = area
+        self._bound_box = bound_box
+        self._center = center
+        self._counts = counts
+
+    def isNull(self) -> bool:
+        return self._bound_box is None
+
+    @property
+    def Volume(self):
+        delay("shape")
+        return self._volume
+
+    @property
+    def Area(self):
+        delay("shape")
+        return self._area
+
+    @property
+    def BoundBox(self):
+        delay("shape")
+        return self._bound_box
+
+    @property
+    def CenterOfMass(self):
+        delay("shape")
+        if self._volume <= 0:
+            raise ValueError("shape has no mass")
+        return Vector(*self._center)
+
+    @property
+    def Vertexes(self):
+        return [None] * self._counts[0]
+
+    @property
+    def Edges(self):
+        return [None] * self._counts[1]
+
+    @property
+    def Faces(self):
+        return [None] * self._counts[2]
+
+    def transformed(self, placement) -> "Shape":
+        """This shape moved by `placement`; the bounding box stays axis-aligned."""
+        if self.isNull():
+            return self
+        points = [placement.multVec(Vector(corner)) for corner in self._bound_box.corners()]
+        box = BoundBox(
+            min(p.x for p in points), min(p.y for p in points), min(p.z for p in points),
+            max(p.x for p in points), max(p.y for p in points), max(p.z for p in points),
+        )
+        center = placement.multVec(Vector(self._center))
+        return Shape(self._volume, self._area, box, (center.x, center.y, center.z), self._counts)
+
+    def __repr__(self):
+        return "<Shape object>" if not self.isNull() else "<Shape object (null)>"
+
+
+def compound(shapes: list[Shape]) -> Shape:
+    shapes = [shape for shape in shapes if not shape.isNull()]
+    if not shapes:
+        return Shape()
+    box = shapes[0]._bound_box.copy()
+    volume = sum(shape._volume for shape in shapes)
+    center = [0.0, 0.0, 0.0]
+    for shape in shapes:
+        box.add(shape._bound_box)
+        for i in range(3):
+            center[i] += shape._center[i] * (shape._volume / volume if volume else 1 / len(shapes))
+    counts = tuple(sum(shape._counts[i] for shape in shapes) for i in range(3))
+    return Shape(volume, sum(shape._area for shape in shapes), box, tuple(center), counts)
+
+
+def box_shape(length, width, height) -> Shape:
+    return Shape(
+        length * width * height,
+        2 * (length * width + length * height + width * height),
+        BoundBox(0, 0, 0, length, width, height),
+        (length / 2, width / 2, height / 2),
+        (8, 12, 6),
+    )
+
+
+def cylinder_shape(radius, height) -> Shape:
+    return Shape(
+        math.pi * radius**2 * height,
+        2 * math.pi * radius * (radius + height),
+        BoundBox(-radius, -radius, 0, radius, radius, height),
+        (0, 0, height / 2),
+        (2, 3, 3),
+    )
+
+
+def cone_shape(radius1, radius2, height) -> Shape:
+    slant = math.hypot(height, radius2 - radius1)
+    radius = max(radius1, radius2)
+    volume = math.pi * height / 3 * (radius1**2 + radius1 * radius2 + radius2**2)
+    # Centroid height of a conical frustum.
+    denominator = radius1**2 + radius1 * radius2 + radius2**2
+    z = height * (radius1**2 + 2 * radius1 * radius2 + 3 * radius2**2) / (4 * denominator) if denominator else 0
+    return Shape(
+        volume,
+        math.pi * (radius1**2 + radius2**2 + (radius1 + radius2) * slant),
+        BoundBox(-radius, -radius, 0, radius, radius, height),
+        (0, 0, z),
+        (2, 3, 3),
+    )
+
+
+def sphere_shape(radius) -> Shape:
+    return Shape(
+        4 / 3 * math.pi * radius**3,
+        4 * math.pi * radius**2,
+        BoundBox(-radius, -radius, -radius, radius, radius, radius),
+        (0, 0, 0),
+        (2, 3, 1),
+    )
+
+
+def torus_shape(radius1, radius2) -> Shape:
+    outer = radius1 + radius2
+    return Shape(
+        2 * math.pi**2 * radius1 * radius2**2,
+        4 * math.pi**2 * radius1 * radius2,
+        BoundBox(-outer, -outer, -radius2, outer, outer, radius2),
+        (0, 0, 0),
+        (1, 3, 1),
+    )
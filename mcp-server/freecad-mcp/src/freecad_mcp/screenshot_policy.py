@@ -0,0 +1,71 @@
+import threading
+from typing import Literal
+
+PolicyMode = Literal["always", "never", "on_change", "every_n", "end_of_batch"]
+POLICY_MODES: tuple[str, ...] = ("always", "never", "on_change", "every_n", "end_of_batch")
+
+
+class ScreenshotPolicy:
+    """Decides whether a tool call should capture a screenshot.
+
+    Modes:
+        always: capture after every tool call (the historical behavior).
+        never: never capture; `get_view` still works.
+        on_change: capture only after a call that changed the document.
+        every_n: capture after every `every_n`-th successful change.
+        end_of_batch: capture only at the end of a `batch` call.
+
+    A per-call override (True/False) takes precedence over the mode.
+    """
+
+    def __init__(self, mode: PolicyMode = "always", every_n: int = 5):
+        self._lock = threading.Lock()
+        self.configure(mode, every_n)
+        self.captured = 0
+        self.skipped = 0
+
+    def configure(self, mode: PolicyMode, every_n: int | None = None):
+        if mode not in POLICY_MODES:
+            raise ValueError(f"Unknown screenshot policy: {mode}")
+        with self._lock:
+            self.mode = mode
+            if every_n is not None:
+                if every_n < 1:
+                    raise ValueError("every_n must be at least 1")
+                self.every_n = every_n
+            self._changes_since_capture = 0
+
+    def should_capture(
+        self, changed: bool, batch: bool = False, override: bool | None = None
+    ) -> bool:
+        with self._lock:
+            if changed:
+                self._changes_since_capture += 1
+            if override is not None:
+                capture = override
+            elif self.mode == "always":
+                capture = True
+            elif self.mode == "never":
+                capture = False
+            elif self.mode == "on_change":
+                capture = changed
+            elif self.mode == "every_n":
+                capture = changed and self._changes_since_capture >= self.every_n
+            else:
+                capture = batch and changed
+            if capture:
+                self.captured += 1
+                self._changes_since_capture = 0
+            else:
+                self.skipped += 1
+            return capture
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "every_n": self.every_n,
+                "captured": self.captured,
+                "skipped": self.skipped,
+                "changes_since_capture": self._changes_since_capture,
+            }
@@ -2,11 +2,17 @@ import json
 import logging
 import xmlrpc.client
 from contextlib import asynccontextmanager
+from functools import partial
 from typing import AsyncIterator, Dict, Any, Literal
 
+import anyio
 from mcp.server.fastmcp import FastMCP, Context
 from mcp.types import TextContent, ImageContent
 
+from .screenshot_policy import POLICY_MODES, PolicyMode, ScreenshotPolicy
+from .transport import KeepAliveTransport
+from .worker_pool import WorkerPool, find_headless_script
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -15,11 +21,39 @@ logger = logging.getLogger("FreeCADMCPserver")
 
 
 _only_text_feedback = False
+_freecad_host = "localhost"
+_freecad_port = 9875
+_freecad_timeout = 180.0
+_freecad_retries = 3
+_screenshot_format = "png"
+_screenshot_quality = -1
+_screenshot_width: int | None = None
+_screenshot_height: int | None = None
+
+_screenshot_policy = ScreenshotPolicy()
+_code_time_limit = 120.0
+
+# Longest a single read_code_output call waits for new output.
+CODE_OUTPUT_POLL_SECONDS = 1.0
+
+SCREENSHOT_FORMATS = ("png", "jpeg", "webp")
 
 
 class FreeCADConnection:
-    def __init__(self, host: str = "localhost", port: int = 9875):
-        self.server = xmlrpc.client.ServerProxy(f"http://{host}:{port}", allow_none=True)
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 9875,
+        timeout: float | None = 180.0,
+        retries: int = 3,
+    ):
+        self.transport = KeepAliveTransport(timeout=timeout, retries=retries)
+        self.server = xmlrpc.client.ServerProxy(
+            f"http://{host}:{port}", transport=self.transport, allow_none=True
+        )
+
+    def disconnect(self):
+        self.transport.close()
 
     def ping(self) -> bool:
         return self.server.ping()
@@ -36,62 +70,164 @@ class FreeCADConnection:
     def delete_object(self, doc_name: str, obj_name: str) -> dict[str, Any]:
         return self.server.delete_object(doc_name, obj_name)
 
-    def insert_part_from_library(self, relative_path: str) -> dict[str, Any]:
-        return self.server.insert_part_from_library(relative_path)
-
-    def execute_code(self, code: str) -> dict[str, Any]:
-        return self.server.execute_code(code)
-
-    def get_active_screenshot(self, view_name: str = "Isometric") -> str | None:
+    def insert_part_from_library(
+        self,
+        relative_path: str,
+        placement: dict[str, Any] | None = None,
+        use_cache: bool = True,
+        doc_name: str | None = None,
+    ) -> dict[str, Any]:
+        if doc_name is not None:
+            return self.server.insert_part_from_library(relative_path, placement, use_cache, doc_name)
+        if placement is None and use_cache:
+            return self.server.insert_part_from_library(relative_path)
+        return self.server.insert_part_from_library(relative_path, placement, use_cache)
+
+    def batch(self, doc_name: str, operations: list[dict[str, Any]]) -> dict[str, Any]:
+        return self.server.batch(doc_name, operations)
+
+    def create_instances(
+        self,
+        doc_name: str,
+        source_name: str,
+        placements: list[dict[str, Any]],
+        mode: str = "link",
+        name: str | None = None,
+        hide_source: bool = True,
+    ) -> dict[str, Any]:
+        return self.server.create_instances(doc_name, source_name, placements, mode, name, hide_source)
+
+    def execute_code(
+        self, code: str, session: str = "default", time_limit: float | None = None
+    ) -> dict[str, Any]:
+        if session == "default" and time_limit is None:
+            return self.server.execute_code(code)
+        return self.server.execute_code(code, session, time_limit)
+
+    def start_code(
+        self,
+        code: str,
+        session: str = "default",
+        time_limit: float | None = None,
+        cooperative: bool | None = None,
+    ) -> dict[str, Any]:
+        return self.server.start_code(code, session, time_limit, cooperative)
+
+    def read_code_output(
+        self, execution_id: str, stdout_offset: int = 0, stderr_offset: int = 0, wait: float = 0.0
+    ) -> dict[str, Any]:
+        return self.server.read_code_output(execution_id, stdout_offset, stderr_offset, wait)
+
+    def get_job_status(self, job_id: str, stdout_offset: int = 0, stderr_offset: int = 0) -> dict[str, Any]:
+        return self.server.get_job_status(job_id, stdout_offset, stderr_offset)
+
+    def cancel_code(self, execution_id: str) -> bool:
+        return self.server.cancel_code(execution_id)
+
+    def cancel_job(self, job_id: str) -> bool:
+        return self.server.cancel_job(job_id)
+
+    def submit_fem_mesh(self, doc_name: str, mesh_name: str) -> dict[str, Any]:
+        return self.server.submit_fem_mesh(doc_name, mesh_name)
+
+    def reset_code_session(self, session: str = "default") -> bool:
+        return self.server.reset_code_session(session)
+
+    def capture_view(self, view_name: str = "Isometric") -> dict[str, Any]:
+        return self.server.capture_view(
+            view_name,
+            _screenshot_width,
+            _screenshot_height,
+            _screenshot_format,
+            _screenshot_quality,
+        )
+
+    def get_active_screenshot(self, view_name: str = "Isometric") -> dict[str, Any]:
+        """Capture the active view; returns the `capture_view` result, never raises"""
         try:
-            # Check if we're in a view that supports screenshots
-            result = self.server.execute_code("""
-import FreeCAD
-import FreeCADGui
-
-if FreeCAD.Gui.ActiveDocument and FreeCAD.Gui.ActiveDocument.ActiveView:
-    view_type = type(FreeCAD.Gui.ActiveDocument.ActiveView).__name__
-    
-    # These view types don't support screenshots
-    unsupported_views = ['SpreadsheetGui::SheetView', 'DrawingGui::DrawingView', 'TechDrawGui::MDIViewPage']
-    
-    if view_type in unsupported_views or not hasattr(FreeCAD.Gui.ActiveDocument.ActiveView, 'saveImage'):
-        print("Current view does not support screenshots")
-        False
-    else:
-        print(f"Current view supports screenshots: {view_type}")
-        True
-else:
-    print("No active view")
-    False
-""")
-
-            # If the view doesn't support screenshots, return None
-            if not result.get("success", False) or "Current view does not support screenshots" in result.get("message", ""):
-                logger.info("Screenshot unavailable in current view (likely Spreadsheet or TechDraw view)")
-                return None
-
-            # Otherwise, try to get the screenshot
-            return self.server.get_active_screenshot(view_name)
+            # Checks the view, renders and encodes in a single GUI task
+            result = self.capture_view(view_name)
         except Exception as e:
-            # Log the error but return None instead of raising an exception
+            # Log the error but return a failed result instead of raising an exception
             logger.error(f"Error getting screenshot: {e}")
-            return None
-
-    def get_objects(self, doc_name: str) -> list[dict[str, Any]]:
-        return self.server.get_objects(doc_name)
-
-    def get_object(self, doc_name: str, obj_name: str) -> dict[str, Any]:
-        return self.server.get_object(doc_name, obj_name)
+            return {"success": False, "unsupported": False, "error": str(e)}
+        if result["success"]:
+            return result
+        if result.get("unsupported"):
+            logger.info(f"Screenshot unavailable in current view: {result['error']}")
+        else:
+            logger.error(f"Error getting screenshot: {result['error']}")
+        return result
+
+    def get_objects(
+        self,
+        doc_name: str,
+        fields: list[str] | None = None,
+        type_filter: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        since_revision: int | None = None,
+        shape_stats: bool = False,
+    ) -> list[dict[str, Any]] | dict[str, Any]:
+        if fields is None and type_filter is None and not offset and limit is None and since_revision is None and not shape_stats:
+            return self.server.get_objects(doc_name)
+        return self.server.get_objects(doc_name, fields, type_filter, offset, limit, since_revision, shape_stats)
+
+    def open_object_cursor(
+        self,
+        doc_name: str,
+        fields: list[str] | None = None,
+        type_filter: str | None = None,
+        shape_stats: bool = False,
+    ) -> dict[str, Any]:
+        return self.server.open_object_cursor(doc_name, fields, type_filter, shape_stats)
+
+    def read_object_cursor(self, cursor_id: str, count: int = 100) -> dict[str, Any]:
+        return self.server.read_object_cursor(cursor_id, count)
+
+    def close_object_cursor(self, cursor_id: str) -> bool:
+        return self.server.close_object_cursor(cursor_id)
+
+    def get_object(self, doc_name: str, obj_name: str, shape_stats: bool = False) -> dict[str, Any]:
+        if not shape_stats:
+            return self.server.get_object(doc_name, obj_name)
+        return self.server.get_object(doc_name, obj_name, shape_stats)
 
     def get_parts_list(self) -> list[str]:
         return self.server.get_parts_list()
 
+    def search_parts(
+        self,
+        query: str = "",
+        category: str | None = None,
+        dimension: float | None = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> dict[str, Any]:
+        return self.server.search_parts(query, category, dimension, offset, limit)
+
+    def get_part_info(self, relative_path: str, thumbnail: bool = False) -> dict[str, Any]:
+        return self.server.get_part_info(relative_path, thumbnail)
+
+    def get_metrics(
+        self,
+        format: str = "json",
+        traces: int = 20,
+        method: str | None = None,
+        min_ms: float = 0.0,
+        reset: bool = False,
+        labels: dict[str, str] | None = None,
+    ) -> dict[str, Any]:
+        return self.server.get_metrics(format, traces, method, min_ms, reset, labels)
+
 
 @asynccontextmanager
 async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
     try:
         logger.info("FreeCADMCP server starting up")
+        if _worker_pool is not None:
+            logger.info(f"Starting {len(_worker_pool.workers)} headless FreeCAD workers")
+            await anyio.to_thread.run_sync(_worker_pool.start)
         try:
             _ = get_freecad_connection()
             logger.info("Successfully connected to FreeCAD on startup")
@@ -108,6 +244,9 @@ async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
             logger.info("Disconnecting from FreeCAD on shutdown")
             _freecad_connection.disconnect()
             _freecad_connection = None
+        if _worker_pool is not None:
+            logger.info("Stopping FreeCAD workers")
+            _worker_pool.stop()
         logger.info("FreeCADMCP server shut down")
 
 
@@ -119,13 +258,39 @@ mcp = FastMCP(
 
 
 _freecad_connection: FreeCADConnection | None = None
+_worker_pool: WorkerPool | None = None
+
 
+def get_freecad_connection(
+    doc_name: str | None = None,
+    session: str | None = None,
+    job_id: str | None = None,
+    new_document: bool = False,
+):
+    """Get or create a persistent FreeCAD connection
 
-def get_freecad_connection():
-    """Get or create a persistent FreeCAD connection"""
+    With a worker pool, the connection goes to the worker that holds the
+    document, code session or job, and a new document to the least loaded one.
+    A document takes precedence: code run next to it goes to its worker.
+    """
     global _freecad_connection
+    if _worker_pool is not None:
+        if doc_name is not None:
+            key = f"doc:{doc_name}"
+        elif session is not None:
+            key = f"session:{session}"
+        elif job_id is not None:
+            key = f"job:{job_id}"
+        else:
+            key = None
+        return _worker_pool.connection(key, new=new_document)
     if _freecad_connection is None:
-        _freecad_connection = FreeCADConnection(host="localhost", port=9875)
+        _freecad_connection = FreeCADConnection(
+            host=_freecad_host,
+            port=_freecad_port,
+            timeout=_freecad_timeout,
+            retries=_freecad_retries,
+        )
         if not _freecad_connection.ping():
             logger.error("Failed to ping FreeCAD")
             _freecad_connection = None
@@ -135,18 +300,56 @@ def get_freecad_connection():
     return _freecad_connection
 
 
+def remember_job(freecad: FreeCADConnection, job_id: str | None):
+    """Route later calls about `job_id` to the worker that started it"""
+    if _worker_pool is not None and job_id:
+        _worker_pool.bind(f"job:{job_id}", freecad)
+
+
+def remember_session(freecad: FreeCADConnection, session: str):
+    """Route later code in `session` without a document to the worker it last ran on"""
+    if _worker_pool is not None:
+        _worker_pool.bind(f"session:{session}", freecad)
+
+
+# Returned by take_screenshot when the screenshot policy skipped the capture
+SCREENSHOT_SKIPPED = object()
+
+
+def take_screenshot(
+    freecad: FreeCADConnection,
+    changed: bool,
+    batch: bool = False,
+    override: bool | None = None,
+):
+    """Capture a screenshot if the screenshot policy asks for one"""
+    if not _screenshot_policy.should_capture(changed, batch=batch, override=override):
+        return SCREENSHOT_SKIPPED
+    return freecad.get_active_screenshot()
+
+
+def screenshot_content(screenshot: dict[str, Any]) -> ImageContent | TextContent:
+    """The image of a `get_active_screenshot` result, or a note saying why there is none"""
+    if screenshot["success"]:
+        # The addon reports the format it actually encoded
+        return ImageContent(type="image", data=screenshot["data"], mimeType=screenshot["mime_type"])
+    if _worker_pool is not None or screenshot.get("headless"):
+        text = "Note: Visual preview is unavailable because FreeCAD is running in headless mode (without a GUI)."
+    elif screenshot.get("unsupported"):
+        text = ("Note: Visual preview is unavailable in the current view type (such as TechDraw or Spreadsheet). "
+                "Switch to a 3D view to see visual feedback.")
+    else:
+        text = f"Note: Visual preview could not be captured: {screenshot['error']}"
+    return TextContent(type="text", text=text)
+
+
 # Helper function to safely add screenshot to response
 def add_screenshot_if_available(response, screenshot):
     """Safely add screenshot to response only if it's available"""
-    if screenshot is not None and not _only_text_feedback:
-        response.append(ImageContent(type="image", data=screenshot, mimeType="image/png"))
-    elif not _only_text_feedback:
-        # Add an informative message that will be seen by the AI model and user
-        response.append(TextContent(
-            type="text", 
-            text="Note: Visual preview is unavailable in the current view type (such as TechDraw or Spreadsheet). "
-                 "Switch to a 3D view to see visual feedback."
-        ))
+    if screenshot is SCREENSHOT_SKIPPED or _only_text_feedback:
+        return response
+    # Add an informative message that will be seen by the AI model and user when there is no image
+    response.append(screenshot_content(screenshot))
     return response
 
 
@@ -168,7 +371,7 @@ def create_document(ctx: Context, name: str) -> list[TextContent]:
         }
         ```
     """
-    freecad = get_freecad_connection()
+    freecad = get_freecad_connection(name, new_document=True)
     try:
         res = freecad.create_document(name)
         if res["success"]:
@@ -194,6 +397,7 @@ def create_object(
     obj_name: str,
     analysis_name: str | None = None,
     obj_properties: dict[str, Any] = None,
+    capture_screenshot: bool | None = None,
 ) -> list[TextContent | ImageContent]:
     """Create a new object in FreeCAD.
     Object type is starts with "Part::" or "Draft::" or "PartDesign::" or "Fem::".
@@ -203,6 +407,7 @@ def create_object(
         obj_type: The type of the object to create (e.g. 'Part::Box', 'Part::Cylinder', 'Draft::Circle', 'PartDesign::Body', etc.).
         obj_name: The name of the object to create.
         obj_properties: The properties of the object to create.
+        capture_screenshot: Whether to return a screenshot. If omitted, the session screenshot policy decides.
 
     Returns:
         A message indicating the success or failure of the object creation and a screenshot of the object.
@@ -294,7 +499,7 @@ def create_object(
         ```
 
         If you want to create a FEM mesh, you can use the following data.
-        The `Part` property is required.
+        The `Part` property is required. Meshing runs in the background; poll get_job_status with the returned job id.
         ```json
         {
             "doc_name": "MyFEMMesh",
@@ -310,15 +515,19 @@ def create_object(
         }
         ```
     """
-    freecad = get_freecad_connection()
+    freecad = get_freecad_connection(doc_name)
     try:
         obj_data = {"Name": obj_name, "Type": obj_type, "Properties": obj_properties or {}, "Analysis": analysis_name}
         res = freecad.create_object(doc_name, obj_data)
-        screenshot = freecad.get_active_screenshot()
+        screenshot = take_screenshot(freecad, changed=res["success"], override=capture_screenshot)
         
         if res["success"]:
+            message = f"Object '{res['object_name']}' created successfully"
+            if res.get("job_id"):
+                remember_job(freecad, res["job_id"])
+                message += f". Meshing runs in background job '{res['job_id']}'; poll get_job_status for the result"
             response = [
-                TextContent(type="text", text=f"Object '{res['object_name']}' created successfully"),
+                TextContent(type="text", text=message),
             ]
             return add_screenshot_if_available(response, screenshot)
         else:
@@ -335,7 +544,11 @@ def create_object(
 
 @mcp.tool()
 def edit_object(
-    ctx: Context, doc_name: str, obj_name: str, obj_properties: dict[str, Any]
+    ctx: Context,
+    doc_name: str,
+    obj_name: str,
+    obj_properties: dict[str, Any],
+    capture_screenshot: bool | None = None,
 ) -> list[TextContent | ImageContent]:
     """Edit an object in FreeCAD.
     This tool is used when the `create_object` tool cannot handle the object creation.
@@ -344,14 +557,15 @@ def edit_object(
         doc_name: The name of the document to edit the object in.
         obj_name: The name of the object to edit.
         obj_properties: The properties of the object to edit.
+        capture_screenshot: Whether to return a screenshot. If omitted, the session screenshot policy decides.
 
     Returns:
         A message indicating the success or failure of the object editing and a screenshot of the object.
     """
-    freecad = get_freecad_connection()
+    freecad = get_freecad_connection(doc_name)
     try:
         res = freecad.edit_object(doc_name, obj_name, {"Properties": obj_properties})
-        screenshot = freecad.get_active_screenshot()
+        screenshot = take_screenshot(freecad, changed=res["success"], override=capture_screenshot)
 
         if res["success"]:
             response = [
@@ -371,20 +585,23 @@ def edit_object(
 
 
 @mcp.tool()
-def delete_object(ctx: Context, doc_name: str, obj_name: str) -> list[TextContent | ImageContent]:
+def delete_object(
+    ctx: Context, doc_name: str, obj_name: str, capture_screenshot: bool | None = None
+) -> list[TextContent | ImageContent]:
     """Delete an object in FreeCAD.
 
     Args:
         doc_name: The name of the document to delete the object from.
         obj_name: The name of the object to delete.
+        capture_screenshot: Whether to return a screenshot. If omitted, the session screenshot policy decides.
 
     Returns:
         A message indicating the success or failure of the object deletion and a screenshot of the object.
     """
-    freecad = get_freecad_connection()
+    freecad = get_freecad_connection(doc_name)
     try:
         res = freecad.delete_object(doc_name, obj_name)
-        screenshot = freecad.get_active_screenshot()
+        screenshot = take_screenshot(freecad, changed=res["success"], override=capture_screenshot)
         
         if res["success"]:
             response = [
@@ -404,30 +621,222 @@ def delete_object(ctx: Context, doc_name: str, obj_name: str) -> list[TextConten
 
 
 @mcp.tool()
-def execute_code(ctx: Context, code: str) -> list[TextContent | ImageContent]:
-    """Execute arbitrary Python code in FreeCAD.
+def batch(
+    ctx: Context,
+    doc_name: str,
+    operations: list[dict[str, Any]],
+    capture_screenshot: bool | None = None,
+) -> list[TextContent | ImageContent]:
+    """Create, edit and delete many objects in FreeCAD in a single step.
+    The operations are applied in order inside one transaction and the document is recomputed once at the end.
+    If any operation fails, all of them are rolled back.
+    Prefer this tool over repeated `create_object` / `edit_object` / `delete_object` calls when building a model from many parts.
 
     Args:
-        code: The Python code to execute.
+        doc_name: The name of the document to apply the operations to.
+        operations: The list of operations. Each operation has an `action` ("create", "edit" or "delete") and an `obj_name`.
+            "create" also takes `obj_type` and optionally `analysis_name` and `obj_properties`, like `create_object`.
+            A "Fem::FemMeshGmsh" created in an analysis is meshed by a background job after the batch; its result has a `job_id` for `get_job_status`.
+            "edit" takes `obj_properties`, like `edit_object`.
+        capture_screenshot: Whether to return a screenshot. If omitted, the session screenshot policy decides.
 
     Returns:
-        A message indicating the success or failure of the code execution, the output of the code execution, and a screenshot of the object.
+        The result of each operation and a screenshot of the document.
+
+    Examples:
+        If you want to create two boxes and remove an old cylinder, you can use the following data.
+        ```json
+        {
+            "doc_name": "MyDocument",
+            "operations": [
+                {
+                    "action": "create",
+                    "obj_name": "Body",
+                    "obj_type": "Part::Box",
+                    "obj_properties": {"Length": 20, "Width": 20, "Height": 20}
+                },
+                {
+                    "action": "create",
+                    "obj_name": "Panel",
+                    "obj_type": "Part::Box",
+                    "obj_properties": {
+                        "Length": 40,
+                        "Width": 10,
+                        "Height": 1,
+                        "Placement": {"Base": {"x": 20, "y": 5, "z": 10}}
+                    }
+                },
+                {
+                    "action": "delete",
+                    "obj_name": "OldCylinder"
+                }
+            ]
+        }
+        ```
     """
-    freecad = get_freecad_connection()
+    freecad = get_freecad_connection(doc_name)
     try:
-        res = freecad.execute_code(code)
-        screenshot = freecad.get_active_screenshot()
-        
+        rpc_operations = [
+            {
+                "Action": op.get("action"),
+                "Name": op.get("obj_name"),
+                "Type": op.get("obj_type"),
+                "Analysis": op.get("analysis_name"),
+                "Properties": op.get("obj_properties") or {},
+            }
+            for op in operations
+        ]
+        res = freecad.batch(doc_name, rpc_operations)
+        screenshot = take_screenshot(freecad, changed=res["success"], batch=True, override=capture_screenshot)
+
         if res["success"]:
             response = [
-                TextContent(type="text", text=f"Code executed successfully: {res['message']}"),
+                TextContent(type="text", text=f"Batch of {len(res['results'])} operations applied successfully: {json.dumps(res['results'])}"),
             ]
             return add_screenshot_if_available(response, screenshot)
         else:
             response = [
-                TextContent(type="text", text=f"Failed to execute code: {res['error']}"),
+                TextContent(type="text", text=f"Batch failed and was rolled back: {res['error']}\nResults: {json.dumps(res['results'])}"),
             ]
             return add_screenshot_if_available(response, screenshot)
+    except Exception as e:
+        logger.error(f"Failed to apply batch: {str(e)}")
+        return [
+            TextContent(type="text", text=f"Failed to apply batch: {str(e)}")
+        ]
+
+
+@mcp.tool()
+def create_instances(
+    ctx: Context,
+    doc_name: str,
+    source_name: str,
+    placements: list[dict[str, Any]],
+    mode: Literal["link", "array"] = "link",
+    name: str | None = None,
+    hide_source: bool = True,
+    capture_screenshot: bool | None = None,
+) -> list[TextContent | ImageContent]:
+    """Place many copies of an existing object that share its geometry, such as wheels, bolts or solar panels.
+    Prefer this over creating the same object repeatedly: the shape is built once, so recompute time and file size do not grow with the number of copies.
+    Edit the source object to change every instance at once.
+
+    Args:
+        doc_name: The name of the document.
+        source_name: The name of the object to instance.
+        placements: One placement per instance, e.g. [{"Base": {"x": 0, "y": 0, "z": 0}}, {"Base": {"x": 50, "y": 0, "z": 0}, "Rotation": {"Axis": {"x": 0, "y": 0, "z": 1}, "Angle": 90}}].
+            Each replaces the source's own placement.
+        mode: "link" creates one App::Link object per placement, which can be edited separately.
+            "array" creates a single App::Link array object holding all placements, which is the lightest option.
+        name: The base name of the new objects. Defaults to "<source_name>_Instance".
+        hide_source: Whether to hide the source object so that only the instances are visible.
+        capture_screenshot: Whether to return a screenshot. If omitted, the session screenshot policy decides.
+
+    Returns:
+        The names of the created instance objects and a screenshot.
+    """
+    freecad = get_freecad_connection(doc_name)
+    try:
+        res = freecad.create_instances(doc_name, source_name, placements, mode, name, hide_source)
+        screenshot = take_screenshot(freecad, changed=res["success"], override=capture_screenshot)
+
+        if res["success"]:
+            response = [
+                TextContent(type="text", text=f"Instances created: {json.dumps(res['instances'])}"),
+            ]
+        else:
+            response = [
+                TextContent(type="text", text=f"Failed to create instances: {res['error']}"),
+            ]
+        return add_screenshot_if_available(response, screenshot)
+    except Exception as e:
+        logger.error(f"Failed to create instances: {str(e)}")
+        return [
+            TextContent(type="text", text=f"Failed to create instances: {str(e)}")
+        ]
+
+
+@mcp.tool()
+async def execute_code(
+    ctx: Context,
+    code: str,
+    session: str = "default",
+    time_limit: float | None = None,
+    cooperative: bool | None = None,
+    wait: bool = True,
+    doc_name: str | None = None,
+    capture_screenshot: bool | None = None,
+) -> list[TextContent | ImageContent]:
+    """Execute arbitrary Python code in FreeCAD.
+    Variables, functions and imports persist between calls in the same session. FreeCAD, App, FreeCADGui and Gui are predefined.
+    Output is streamed as log messages while the code runs.
+    In long loops (e.g. creating hundreds of features), call yield_gui() once per iteration, optionally as yield_gui(progress, "message") with progress from 0 to 1.
+    The script then runs in short time slices, so FreeCAD stays responsive and other tools keep working. yield_gui() only splits the script at its top level, not inside functions it defines.
+
+    Args:
+        code: The Python code to execute.
+        session: The name of the namespace to run the code in. Use reset_code_session to clear it.
+        time_limit: Seconds after which the code is interrupted (0 for no limit). Defaults to the server's limit.
+        cooperative: Whether to run in time slices. If omitted, scripts that call yield_gui() at the top level do.
+        wait: Whether to wait for the code to finish. If false, a job id is returned at once; follow it with get_job_status.
+        doc_name: The document the code works on. When FreeCAD runs as a pool of workers, the code runs on the worker
+            holding it; sessions are kept per worker, so a session's variables are only visible on that worker.
+        capture_screenshot: Whether to return a screenshot. If omitted, the session screenshot policy decides.
+
+    Returns:
+        A message indicating the success or failure of the code execution, the output of the code execution, and a screenshot of the object.
+    """
+    freecad = get_freecad_connection(doc_name, session=session)
+    remember_session(freecad, session)
+    execution_id = None
+    try:
+        if time_limit is None:
+            time_limit = _code_time_limit
+        res = await anyio.to_thread.run_sync(freecad.start_code, code, session, time_limit, cooperative)
+        if not res["success"]:
+            return [TextContent(type="text", text=f"Failed to execute code: {res['error']}")]
+        if not wait:
+            remember_job(freecad, res["execution_id"])
+            return [TextContent(type="text", text=json.dumps({"job_id": res["execution_id"]}))]
+        execution_id = res["execution_id"]
+
+        stdout, stderr = [], []
+        stdout_offset = stderr_offset = 0
+        while True:
+            out = await anyio.to_thread.run_sync(
+                freecad.read_code_output, execution_id, stdout_offset, stderr_offset, CODE_OUTPUT_POLL_SECONDS
+            )
+            if not out["success"]:
+                raise RuntimeError(out["error"])
+            stdout_offset, stderr_offset = out["stdout_offset"], out["stderr_offset"]
+            if out["stdout"]:
+                stdout.append(out["stdout"])
+                await ctx.info(out["stdout"])
+            if out["stderr"]:
+                stderr.append(out["stderr"])
+                await ctx.warning(out["stderr"])
+            if out["progress"] is not None:
+                await ctx.report_progress(out["progress"], 1.0)
+            if out["finished"]:
+                break
+        execution_id = None
+
+        success = out["state"] == "done"
+        screenshot = await anyio.to_thread.run_sync(
+            partial(take_screenshot, freecad, changed=success, override=capture_screenshot)
+        )
+        if success:
+            text = f"Code executed successfully: Output: {''.join(stdout)}"
+        else:
+            text = f"Failed to execute code: {out['error']}\nOutput: {''.join(stdout)}"
+        if stderr:
+            text += f"\nStderr: {''.join(stderr)}"
+        return add_screenshot_if_available([TextContent(type="text", text=text)], screenshot)
+    except anyio.get_cancelled_exc_class():
+        if execution_id is not None:
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(freecad.cancel_code, execution_id)
+        raise
     except Exception as e:
         logger.error(f"Failed to execute code: {str(e)}")
         return [
@@ -436,7 +845,105 @@ def execute_code(ctx: Context, code: str) -> list[TextContent | ImageContent]:
 
 
 @mcp.tool()
-def get_view(ctx: Context, view_name: Literal["Isometric", "Front", "Top", "Right", "Back", "Left", "Bottom", "Dimetric", "Trimetric"]) -> list[ImageContent | TextContent]:
+def get_job_status(ctx: Context, job_id: str, stdout_offset: int = 0, stderr_offset: int = 0) -> list[TextContent]:
+    """Get the state, progress and result of a background job, such as FEM meshing,
+    or of code started with execute_code(wait=False).
+
+    Args:
+        job_id: The job id returned by create_object, mesh_fem or execute_code.
+        stdout_offset: For code, the "stdout_offset" of the previous call, to get only new output.
+        stderr_offset: For code, the "stderr_offset" of the previous call, to get only new output.
+
+    Returns:
+        A JSON object with "state" (queued, running, suspended, done, error, interrupted or cancelled), "finished",
+        "progress", "message" and "error". Finished jobs include their "result"; code includes "stdout", "stderr",
+        their offsets, "slices" and "elapsed".
+    """
+    freecad = get_freecad_connection(job_id=job_id)
+    try:
+        res = freecad.get_job_status(job_id, stdout_offset, stderr_offset)
+        if not res["success"]:
+            return [TextContent(type="text", text=f"Failed to get job status: {res['error']}")]
+        res.pop("success")
+        return [TextContent(type="text", text=json.dumps(res))]
+    except Exception as e:
+        logger.error(f"Failed to get job status: {str(e)}")
+        return [
+            TextContent(type="text", text=f"Failed to get job status: {str(e)}")
+        ]
+
+
+@mcp.tool()
+def cancel_job(ctx: Context, job_id: str) -> list[TextContent]:
+    """Cancel a background job, such as FEM meshing, or code started with execute_code(wait=False).
+
+    Args:
+        job_id: The job id to cancel.
+    """
+    freecad = get_freecad_connection(job_id=job_id)
+    try:
+        if freecad.cancel_job(job_id):
+            return [TextContent(type="text", text=f"Job '{job_id}' was cancelled.")]
+        return [TextContent(type="text", text=f"Job '{job_id}' is unknown or already finished.")]
+    except Exception as e:
+        logger.error(f"Failed to cancel job: {str(e)}")
+        return [
+            TextContent(type="text", text=f"Failed to cancel job: {str(e)}")
+        ]
+
+
+@mcp.tool()
+def mesh_fem(ctx: Context, doc_name: str, mesh_name: str) -> list[TextContent]:
+    """Regenerate the mesh of an existing Fem::FemMeshGmsh object with Gmsh, in a background job.
+
+    Args:
+        doc_name: The name of the document.
+        mesh_name: The name of the FEM mesh object.
+
+    Returns:
+        The job id; poll get_job_status for the node and element counts.
+    """
+    freecad = get_freecad_connection(doc_name)
+    try:
+        res = freecad.submit_fem_mesh(doc_name, mesh_name)
+        if not res["success"]:
+            return [TextContent(type="text", text=f"Failed to start meshing: {res['error']}")]
+        remember_job(freecad, res["job_id"])
+        return [TextContent(type="text", text=f"Meshing started in job '{res['job_id']}'; poll get_job_status for the result.")]
+    except Exception as e:
+        logger.error(f"Failed to start meshing: {str(e)}")
+        return [
+            TextContent(type="text", text=f"Failed to start meshing: {str(e)}")
+        ]
+
+
+@mcp.tool()
+def reset_code_session(ctx: Context, session: str = "default") -> list[TextContent]:
+    """Forget the variables, functions and imports defined by execute_code in a session.
+
+    Args:
+        session: The session to reset. With a pool of FreeCAD workers it is reset on every worker.
+    """
+    try:
+        if _worker_pool is not None:
+            existed = any([connection.reset_code_session(session) for _, connection in _worker_pool.connections()])
+        else:
+            existed = get_freecad_connection().reset_code_session(session)
+        message = f"Session '{session}' was reset." if existed else f"Session '{session}' was already empty."
+        return [TextContent(type="text", text=message)]
+    except Exception as e:
+        logger.error(f"Failed to reset code session: {str(e)}")
+        return [
+            TextContent(type="text", text=f"Failed to reset code session: {str(e)}")
+        ]
+
+
+@mcp.tool()
+def get_view(
+    ctx: Context,
+    view_name: Literal["Isometric", "Front", "Top", "Right", "Back", "Left", "Bottom", "Dimetric", "Trimetric"],
+    doc_name: str | None = None,
+) -> list[ImageContent | TextContent]:
     """Get a screenshot of the active view.
 
     Args:
@@ -451,37 +958,46 @@ def get_view(ctx: Context, view_name: Literal["Isometric", "Front", "Top", "Righ
         - "Bottom"
         - "Dimetric"
         - "Trimetric"
+        doc_name: The document being looked at. When FreeCAD runs as a pool of workers, the worker holding it is asked.
 
     Returns:
         A screenshot of the active view.
     """
-    freecad = get_freecad_connection()
-    screenshot = freecad.get_active_screenshot(view_name)
-    
-    if screenshot is not None:
-        return [ImageContent(type="image", data=screenshot, mimeType="image/png")]
-    else:
-        return [TextContent(type="text", text="Cannot get screenshot in the current view type (such as TechDraw or Spreadsheet)")]
+    freecad = get_freecad_connection(doc_name)
+    return [screenshot_content(freecad.get_active_screenshot(view_name))]
 
 
 @mcp.tool()
-def insert_part_from_library(ctx: Context, relative_path: str) -> list[TextContent | ImageContent]:
+def insert_part_from_library(
+    ctx: Context,
+    relative_path: str,
+    placement: dict[str, Any] | None = None,
+    use_cache: bool = True,
+    doc_name: str | None = None,
+    capture_screenshot: bool | None = None,
+) -> list[TextContent | ImageContent]:
     """Insert a part from the parts library addon.
+    Inserting the same part again is fast: it is copied from a copy kept in memory instead of being read from disk.
 
     Args:
         relative_path: The relative path of the part to insert.
+        placement: Where to put the part, e.g. {"Base": {"x": 10, "y": 0, "z": 0}, "Rotation": {"Axis": {"x": 0, "y": 0, "z": 1}, "Angle": 90}}.
+            It is applied on top of the part's own placement.
+        use_cache: Whether to copy the part from the in-memory template. Set it to false to merge the file from disk.
+        doc_name: The document to insert the part into. Defaults to the active document.
+        capture_screenshot: Whether to return a screenshot. If omitted, the session screenshot policy decides.
 
     Returns:
         A message indicating the success or failure of the part insertion and a screenshot of the object.
     """
-    freecad = get_freecad_connection()
+    freecad = get_freecad_connection(doc_name)
     try:
-        res = freecad.insert_part_from_library(relative_path)
-        screenshot = freecad.get_active_screenshot()
+        res = freecad.insert_part_from_library(relative_path, placement, use_cache, doc_name)
+        screenshot = take_screenshot(freecad, changed=res["success"], override=capture_screenshot)
         
         if res["success"]:
             response = [
-                TextContent(type="text", text=f"Part inserted from library: {res['message']}"),
+                TextContent(type="text", text=f"Part inserted from library: {res['message']} Objects: {json.dumps(res.get('objects', []))}"),
             ]
             return add_screenshot_if_available(response, screenshot)
         else:
@@ -497,21 +1013,43 @@ def insert_part_from_library(ctx: Context, relative_path: str) -> list[TextConte
 
 
 @mcp.tool()
-def get_objects(ctx: Context, doc_name: str) -> list[dict[str, Any]]:
+def get_objects(
+    ctx: Context,
+    doc_name: str,
+    fields: list[str] | None = None,
+    type_filter: str | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+    since_revision: int | None = None,
+    shape_stats: bool = False,
+    capture_screenshot: bool | None = None,
+) -> list[dict[str, Any]]:
     """Get all objects in a document.
     You can use this tool to get the objects in a document to see what you can check or edit.
+    Large documents produce large results, so prefer `fields`, `type_filter`, `limit` and `since_revision` to get only what you need.
 
     Args:
         doc_name: The name of the document to get the objects from.
+        fields: The fields to return for each object. "Name", "Label" and "TypeId" are always returned.
+            Use [] for names only, or add "Placement", "BoundBox", "Shape", "ViewObject", "Properties" (all properties) or individual property names such as "Length".
+            If omitted, every field and property is returned.
+        type_filter: Only return objects whose TypeId starts with this string (e.g. "Part::" or "Part::Box").
+        offset: The number of objects to skip, for paging.
+        limit: The maximum number of objects to return.
+        since_revision: The "revision" of an earlier result. Only objects added or changed since then are returned, and deleted ones are listed in "removed".
+        shape_stats: Whether to add volume, area and vertex/edge/face counts to "Shape". The bounding box and center of mass are always included.
+        capture_screenshot: Whether to return a screenshot. If omitted, the session screenshot policy decides.
 
     Returns:
         A list of objects in the document and a screenshot of the document.
+        When any of the options above is given, a JSON object with "revision", "full", "objects", "removed", "total" and "next_offset" is returned instead.
     """
-    freecad = get_freecad_connection()
+    freecad = get_freecad_connection(doc_name)
     try:
-        screenshot = freecad.get_active_screenshot()
+        screenshot = take_screenshot(freecad, changed=False, override=capture_screenshot)
+        objects = freecad.get_objects(doc_name, fields, type_filter, offset, limit, since_revision, shape_stats)
         response = [
-            TextContent(type="text", text=json.dumps(freecad.get_objects(doc_name))),
+            TextContent(type="text", text=json.dumps(objects)),
         ]
         return add_screenshot_if_available(response, screenshot)
     except Exception as e:
@@ -522,22 +1060,83 @@ def get_objects(ctx: Context, doc_name: str) -> list[dict[str, Any]]:
 
 
 @mcp.tool()
-def get_object(ctx: Context, doc_name: str, obj_name: str) -> dict[str, Any]:
+def get_objects_chunk(
+    ctx: Context,
+    doc_name: str,
+    cursor: str | None = None,
+    chunk_size: int = 100,
+    fields: list[str] | None = None,
+    type_filter: str | None = None,
+    shape_stats: bool = False,
+) -> list[TextContent]:
+    """Read the objects of a very large document in chunks.
+    Call it without `cursor` to start; the status line returns a "cursor" to pass to the next call until "done" is true.
+    `fields`, `type_filter` and `shape_stats` are only used when starting and work as in `get_objects`.
+
+    Args:
+        doc_name: The name of the document to get the objects from.
+        cursor: The cursor returned by the previous call, or None to start.
+        chunk_size: The number of objects to return per call.
+        fields: The fields to return for each object.
+        type_filter: Only return objects whose TypeId starts with this string.
+        shape_stats: Whether to add volume, area and vertex/edge/face counts to "Shape".
+
+    Returns:
+        The chunk as newline-delimited JSON (one object per line), then a JSON status with "cursor", "done", "remaining" and "total".
+    """
+    freecad = get_freecad_connection(doc_name)
+    try:
+        total = None
+        if cursor is None:
+            res = freecad.open_object_cursor(doc_name, fields, type_filter, shape_stats)
+            if not res["success"]:
+                return [TextContent(type="text", text=f"Failed to get objects: {res['error']}")]
+            cursor, total = res["cursor"], res["total"]
+        chunk = freecad.read_object_cursor(cursor, chunk_size)
+        if not chunk["success"]:
+            return [TextContent(type="text", text=f"Failed to get objects: {chunk['error']}")]
+        status = {
+            "cursor": None if chunk["done"] else cursor,
+            "done": chunk["done"],
+            "remaining": chunk["remaining"],
+            "total": total,
+        }
+        return [
+            TextContent(type="text", text="\n".join(json.dumps(obj) for obj in chunk["objects"])),
+            TextContent(type="text", text=json.dumps(status)),
+        ]
+    except Exception as e:
+        logger.error(f"Failed to get objects: {str(e)}")
+        return [
+            TextContent(type="text", text=f"Failed to get objects: {str(e)}")
+        ]
+
+
+@mcp.tool()
+def get_object(
+    ctx: Context,
+    doc_name: str,
+    obj_name: str,
+    shape_stats: bool = False,
+    capture_screenshot: bool | None = None,
+) -> dict[str, Any]:
     """Get an object from a document.
     You can use this tool to get the properties of an object to see what you can check or edit.
 
     Args:
         doc_name: The name of the document to get the object from.
         obj_name: The name of the object to get.
+        shape_stats: Whether to add volume, area and vertex/edge/face counts to "Shape". The bounding box and center of mass are always included.
+        capture_screenshot: Whether to return a screenshot. If omitted, the session screenshot policy decides.
 
     Returns:
         The object and a screenshot of the object.
     """
-    freecad = get_freecad_connection()
+    freecad = get_freecad_connection(doc_name)
     try:
-        screenshot = freecad.get_active_screenshot()
+        screenshot = take_screenshot(freecad, changed=False, override=capture_screenshot)
         response = [
-            TextContent(type="text", text=json.dumps(freecad.get_object(doc_name, obj_name))),
+            TextContent(type="text", text=json.dumps(freecad.get_object(doc_name, obj_name, shape_stats))),
         ]
         return add_screenshot_if_available(response, screenshot)
     except Exception as e:
@@ -563,6 +1162,176 @@ def get_parts_list(ctx: Context) -> list[str]:
         ]
 
 
+@mcp.tool()
+def search_parts(
+    ctx: Context,
+    query: str = "",
+    category: str | None = None,
+    dimension: float | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> list[TextContent]:
+    """Search the parts library and return only the best matches.
+    Prefer this over get_parts_list, which returns every part in the library.
+
+    Args:
+        query: Words that must all appear in the part's path, e.g. "hex screw" or "bearing 608".
+        category: Only return parts in this folder of the library or below it, e.g. "Mechanical Parts/Fasteners".
+        dimension: Only return parts with this nominal size in their name, e.g. 6 for "M6x20".
+        limit: The maximum number of parts to return.
+        offset: The number of matches to skip, for paging.
+
+    Returns:
+        A JSON object with "parts", "total" and "next_offset". Each part has "path", "name", "category",
+        "dimensions" (nominal sizes from the name), "label", "size" (bounding box lengths in mm, or null if not indexed yet)
+        and "has_thumbnail". Use get_part_info for details, and pass a part's "path" to insert_part_from_library.
+    """
+    freecad = get_freecad_connection()
+    try:
+        res = freecad.search_parts(query, category, dimension, offset, limit)
+        if not res["success"]:
+            return [TextContent(type="text", text=f"Failed to search parts: {res['error']}")]
+        res.pop("success")
+        return [TextContent(type="text", text=json.dumps(res))]
+    except Exception as e:
+        logger.error(f"Failed to search parts: {str(e)}")
+        return [
+            TextContent(type="text", text=f"Failed to search parts: {str(e)}")
+        ]
+
+
+@mcp.tool()
+def get_part_info(
+    ctx: Context,
+    path: str,
+    include_thumbnail: bool = True,
+) -> list[TextContent | ImageContent]:
+    """Get the metadata and thumbnail of a parts library part without inserting it.
+    Use it to check a part's size and appearance before calling insert_part_from_library.
+
+    Args:
+        path: The part's path, as returned by search_parts.
+        include_thumbnail: Whether to return the thumbnail saved in the part file, if it has one.
+
+    Returns:
+        A JSON object with "label", "unit_system", "objects" and "bound_box" (in mm, approximate), and the thumbnail.
+    """
+    freecad = get_freecad_connection()
+    try:
+        res = freecad.get_part_info(path, include_thumbnail)
+        if not res["success"]:
+            return [TextContent(type="text", text=f"Failed to get part info: {res['error']}")]
+        thumbnail = res.pop("thumbnail")
+        res.pop("success")
+        response = [TextContent(type="text", text=json.dumps(res))]
+        if thumbnail:
+            response.append(ImageContent(type="image", data=thumbnail, mimeType="image/png"))
+        return response
+    except Exception as e:
+        logger.error(f"Failed to get part info: {str(e)}")
+        return [
+            TextContent(type="text", text=f"Failed to get part info: {str(e)}")
+        ]
+
+
+@mcp.tool()
+def set_screenshot_policy(ctx: Context, policy: PolicyMode, every_n: int | None = None) -> list[TextContent]:
+    """Set when tools return a screenshot for the rest of this session.
+    Screenshots are the most expensive part of a tool result, so capture them only when you need visual feedback.
+
+    Args:
+        policy: One of
+        - "always": after every tool call.
+        - "never": never; use `get_view` when you need to look at the model.
+        - "on_change": only after a call that changed the document.
+        - "every_n": after every `every_n`-th change.
+        - "end_of_batch": only at the end of a `batch` call.
+        every_n: The number of changes between screenshots for the "every_n" policy.
+
+    Returns:
+        The new policy and the screenshot counters.
+    """
+    try:
+        _screenshot_policy.configure(policy, every_n)
+        return [TextContent(type="text", text=json.dumps(_screenshot_policy.stats()))]
+    except ValueError as e:
+        return [TextContent(type="text", text=f"Failed to set screenshot policy: {str(e)}")]
+
+
+@mcp.tool()
+def get_session_stats(ctx: Context) -> list[TextContent]:
+    """Get statistics of this MCP session, such as how many screenshots were captured or skipped,
+    and the state of the FreeCAD workers when running a worker pool."""
+    stats = {"screenshots": _screenshot_policy.stats()}
+    if _worker_pool is not None:
+        stats["workers"] = _worker_pool.stats()
+    return [TextContent(type="text", text=json.dumps(stats))]
+
+
+def merge_prometheus(texts: list[str]) -> str:
+    """Merge Prometheus expositions of several workers, keeping each metric family in one group"""
+    families: dict[str, list[str]] = {}
+    family = None
+    for text in texts:
+        for line in text.splitlines():
+            if line.startswith("# HELP ") or line.startswith("# TYPE "):
+                family = line.split()[2]
+                lines = families.setdefault(family, [])
+                if line not in lines:
+                    lines.insert(sum(1 for existing in lines if existing.startswith("#")), line)
+            elif line and family is not None:
+                families[family].append(line)
+    return "\n".join(line for lines in families.values() for line in lines) + "\n"
+
+
+@mcp.tool()
+def get_metrics(
+    ctx: Context,
+    format: Literal["json", "prometheus"] = "json",
+    traces: int = 20,
+    method: str | None = None,
+    min_ms: float = 0.0,
+    reset: bool = False,
+) -> list[TextContent]:
+    """Get performance metrics of the FreeCAD RPC server.
+    Each RPC method has call and error counts and latency and response size histograms (p50/p95/p99).
+    Each stage of a call has a latency histogram: GUI queue wait, GUI execution, recompute, object serialization, XML-RPC marshalling and screenshots.
+    Use it to find out why tool calls are slow.
+
+    Args:
+        format: "json" for counters, histograms and recent call traces, or "prometheus" for the Prometheus text format without traces.
+        traces: How many of the most recent call traces to include, newest first, with the time each spent in each stage.
+        method: Only include traces of this RPC method, such as "create_object".
+        min_ms: Only include traces of calls that took at least this many milliseconds.
+        reset: Clear the per-method counts, latencies and traces after reading them. Stage timings keep accumulating.
+
+    Returns:
+        The metrics as JSON, or as Prometheus text.
+    """
+    try:
+        if _worker_pool is None:
+            results = [(None, get_freecad_connection().get_metrics(format, traces, method, min_ms, reset))]
+        else:
+            results = [
+                (port, connection.get_metrics(format, traces, method, min_ms, reset, {"worker": str(port)}))
+                for port, connection in _worker_pool.connections()
+            ]
+        for _, res in results:
+            if not res["success"]:
+                return [TextContent(type="text", text=f"Failed to get metrics: {res['error']}")]
+        if format == "prometheus":
+            return [TextContent(type="text", text=merge_prometheus([res["text"] for _, res in results]))]
+        if _worker_pool is None:
+            metrics = results[0][1]["metrics"]
+        else:
+            metrics = {"workers": {str(port): res["metrics"] for port, res in results}}
+        metrics["session"] = {"screenshots": _screenshot_policy.stats()}
+        return [TextContent(type="text", text=json.dumps(metrics))]
+    except Exception as e:
+        logger.error(f"Failed to get metrics: {str(e)}")
+        return [TextContent(type="text", text=f"Failed to get metrics: {str(e)}")]
+
+
 @mcp.prompt()
 def asset_creation_strategy() -> str:
     return """
@@ -573,12 +1342,14 @@ When creating content in FreeCAD, always follow these steps:
 0. Before starting any task, always use get_objects() to confirm the current state of the document.
 
 1. Utilize the parts library:
-   - Check available parts using get_parts_list().
+   - Find available parts using search_parts(), and check a candidate's size and thumbnail with get_part_info().
    - If the required part exists in the library, use insert_part_from_library() to insert it into your document.
 
 2. If the appropriate asset is not available in the parts library:
    - Create basic shapes (e.g., cubes, cylinders, spheres) using create_object().
    - Adjust and define detailed properties of the shapes as necessary using edit_object().
+   - When creating or editing many objects at once, use batch() so the document is recomputed only once.
+   - When the same part appears many times (wheels, bolts, panels), build it once and place the copies with create_instances().
 
 3. Always assign clear and descriptive names to objects when adding them to the document.
 
@@ -597,11 +1368,56 @@ Only revert to basic creation methods in the following cases:
 
 def main():
     """Run the MCP server"""
-    global _only_text_feedback
+    global _only_text_feedback, _freecad_host, _freecad_port, _freecad_timeout, _freecad_retries
+    global _screenshot_format, _screenshot_quality, _screenshot_width, _screenshot_height
+    global _code_time_limit, _worker_pool
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--only-text-feedback", action="store_true", help="Only return text feedback")
+    parser.add_argument("--host", default="localhost", help="Host of the FreeCAD RPC server")
+    parser.add_argument("--port", type=int, default=9875, help="Port of the FreeCAD RPC server")
+    parser.add_argument("--timeout", type=float, default=180.0, help="Timeout in seconds for each RPC call")
+    parser.add_argument("--retries", type=int, default=3, help="Reconnect attempts when the FreeCAD connection fails")
+    parser.add_argument("--screenshot-policy", choices=POLICY_MODES, default="always", help="When tools return a screenshot")
+    parser.add_argument("--screenshot-every", type=int, default=5, help="Changes between screenshots for the every_n policy")
+    parser.add_argument("--screenshot-format", choices=SCREENSHOT_FORMATS, default="png", help="Image format of screenshots")
+    parser.add_argument("--screenshot-quality", type=int, default=-1, help="JPEG/WebP quality from 0 to 100 (-1 for the default)")
+    parser.add_argument("--screenshot-width", type=int, default=None, help="Scale screenshots down to at most this width")
+    parser.add_argument("--screenshot-height", type=int, default=None, help="Scale screenshots down to at most this height")
+    parser.add_argument("--code-time-limit", type=float, default=120.0, help="Seconds after which execute_code scripts are interrupted (0 for no limit)")
+    parser.add_argument("--workers", type=int, default=0, help="Run a pool of this many headless FreeCAD processes instead of connecting to --host/--port")
+    parser.add_argument("--freecad-cmd", default="FreeCADCmd", help="FreeCADCmd executable used to start workers")
+    parser.add_argument("--worker-script", default=None, help="Path to the addon's headless_server.py (searched in the FreeCAD Mod directories by default)")
+    parser.add_argument("--worker-base-port", type=int, default=9876, help="Port of the first worker; the others use the following ports")
+    parser.add_argument("--health-interval", type=float, default=10.0, help="Seconds between health checks of idle workers")
     args = parser.parse_args()
     _only_text_feedback = args.only_text_feedback
+    _freecad_host = args.host
+    _freecad_port = args.port
+    _freecad_timeout = args.timeout
+    _freecad_retries = args.retries
+    _screenshot_format = args.screenshot_format
+    _screenshot_quality = args.screenshot_quality
+    _screenshot_width = args.screenshot_width
+    _screenshot_height = args.screenshot_height
+    _code_time_limit = args.code_time_limit
+    if args.workers > 0:
+        script = args.worker_script or find_headless_script()
+        if script is None:
+            parser.error("--workers needs --worker-script: headless_server.py was not found in the FreeCAD Mod directories")
+        _worker_pool = WorkerPool(
+            args.workers,
+            connect=lambda host, port: FreeCADConnection(host, port, _freecad_timeout, _freecad_retries),
+            script=script,
+            freecad_cmd=args.freecad_cmd,
+            host=args.host,
+            base_port=args.worker_base_port,
+            health_interval=args.health_interval,
+        )
+    # Text-only feedback never shows images, and headless workers cannot
+    # capture them, so do not capture them at all
+    _screenshot_policy.configure(
+        "never" if _only_text_feedback or _worker_pool else args.screenshot_policy, args.screenshot_every
+    )
     logger.info(f"Only text feedback: {_only_text_feedback}")
     mcp.run()
\ No newline at end of file
@@ -0,0 +1,79 @@
+import http.client
+import logging
+import threading
+import time
+import xmlrpc.client
+
+logger = logging.getLogger("FreeCADMCPserver")
+
+# Raised when a kept-alive connection was closed while idle. If it was
+# reused, the server dropped it before reading the request, which is resent
+# once on a new connection. On a fresh connection the request may have been
+# received, so the error is raised instead of sending the call twice.
+STALE_CONNECTION_ERRORS = (
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+    http.client.RemoteDisconnected,
+)
+
+
+class KeepAliveTransport(xmlrpc.client.Transport):
+    """XML-RPC transport that keeps one HTTP/1.1 connection open between calls.
+
+    Refused connections, while FreeCAD is (re)starting, are retried with
+    exponential backoff. A request is only sent again when it never reached
+    the server; timeouts and errors after sending are raised. Responses are
+    gzip-compressed by the addon whenever they exceed its threshold (the
+    client always advertises `Accept-Encoding: gzip`), and request bodies
+    larger than `encode_threshold` bytes are gzip-compressed as well.
+    """
+
+    def __init__(
+        self,
+        timeout: float | None = 30.0,
+        retries: int = 3,
+        backoff: float = 0.2,
+        max_backoff: float = 5.0,
+        encode_threshold: int | None = 1400,
+    ):
+        super().__init__()
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.encode_threshold = encode_threshold
+        # One HTTP connection cannot carry interleaved requests.
+        self._lock = threading.Lock()
+
+    def make_connection(self, host):
+        if self._connection and host == self._connection[0]:
+            return self._connection[1]
+        chost, self._extra_headers, x509 = self.get_host_info(host)
+        self._connection = host, http.client.HTTPConnection(chost, timeout=self.timeout)
+        return self._connection[1]
+
+    def request(self, host, handler, request_body, verbose=False):
+        delay = self.backoff
+        attempt = 0
+        with self._lock:
+            while True:
+                connection = self._connection[1] if self._connection[0] == host else None
+                reused = connection is not None and connection.sock is not None
+                try:
+                    return self.single_request(host, handler, request_body, verbose)
+                except STALE_CONNECTION_ERRORS as e:
+                    self.close()
+                    if not reused:
+                        raise
+                    logger.info(f"Idle FreeCAD connection was closed ({e!r}), reconnecting")
+                except ConnectionRefusedError as e:
+                    self.close()
+                    if attempt == self.retries:
+                        raise
+                    attempt += 1
+                    logger.warning(
+                        f"FreeCAD connection failed ({e!r}), retrying in {delay:.1f}s"
+                    )
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.max_backoff)
@@ -0,0 +1,245 @@
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import xmlrpc.client
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from .transport import KeepAliveTransport
+
+logger = logging.getLogger("FreeCADMCPserver")
+
+# Where the addon is installed, per the README.
+ADDON_DIRS = (
+    "~/.FreeCAD/Mod/FreeCADMCP",
+    "~/.local/share/FreeCAD/Mod/FreeCADMCP",
+    "~/snap/freecad/common/Mod/FreeCADMCP",
+    "~/Library/Application Support/FreeCAD/Mod/FreeCADMCP",
+    os.path.join(os.environ.get("APPDATA", "~"), "FreeCAD", "Mod", "FreeCADMCP"),
+)
+
+
+def find_headless_script() -> str | None:
+    for directory in ADDON_DIRS:
+        path = os.path.join(os.path.expanduser(directory), "headless_server.py")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+@dataclass
+class FreeCADWorker:
+    """One FreeCADCmd process serving the headless RPC server on its own port."""
+
+    index: int
+    port: int
+    connection: Any = None
+    process: subprocess.Popen | None = None
+    restarts: int = 0
+    failures: int = 0
+    last_used: float = 0.0
+    # Affinity keys ("doc:<name>", "session:<name>", "job:<id>") served by this worker.
+    keys: set[str] = field(default_factory=set)
+
+    @property
+    def documents(self) -> int:
+        return sum(1 for key in self.keys if key.startswith("doc:"))
+
+
+class WorkerPool:
+    """A pool of headless FreeCAD processes behind the MCP server.
+
+    Each document, code session and job sticks to the worker it was created
+    on, and new documents go to the worker holding the fewest. Calls that
+    name none of them go to the worker used last. Code sessions live inside
+    a worker, so the same session name on two workers is two namespaces. A health thread pings idle
+    workers and restarts those that exited or stopped answering; the
+    documents they held are lost and their affinity is dropped.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        connect: Callable[[str, int], Any],
+        script: str,
+        freecad_cmd: str = "FreeCADCmd",
+        host: str = "localhost",
+        base_port: int = 9876,
+        health_interval: float = 10.0,
+        ping_timeout: float = 5.0,
+        max_failures: int = 2,
+        startup_timeout: float = 60.0,
+    ):
+        self.connect = connect
+        self.script = script
+        self.freecad_cmd = freecad_cmd
+        self.host = host
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self.max_failures = max_failures
+        self.startup_timeout = startup_timeout
+        self.workers = [FreeCADWorker(i, base_port + i) for i in range(size)]
+        self._lock = threading.Lock()
+        self._affinity: dict[str, FreeCADWorker] = {}
+        self._current = self.workers[0]
+        self._stop = threading.Event()
+        self._health_thread: threading.Thread | None = None
+
+    def start(self):
+        """Launch every worker, wait until they answer `ping` and start the health checks."""
+        for worker in self.workers:
+            self._launch(worker)
+        for worker in self.workers:
+            self._wait_ready(worker)
+        self._stop.clear()
+        self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+        self._health_thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
+        for worker in self.workers:
+            self._terminate(worker)
+
+    def connection(self, key: str | None = None, new: bool = False):
+        """The connection to the worker serving `key`.
+
+        An unknown key is bound to the worker used last, or with `new` (a
+        document being created) to the worker holding the fewest documents.
+        """
+        with self._lock:
+            worker = self._affinity.get(key) if key is not None else None
+            if worker is None:
+                if new:
+                    worker = min(self.workers, key=lambda w: (w.documents, w.index))
+                else:
+                    worker = self._current
+                if key is not None:
+                    self._bind(key, worker)
+            if key is None or key.startswith("doc:"):
+                self._current = worker
+            worker.last_used = time.monotonic()
+            return worker.connection
+
+    def bind(self, key: str, connection):
+        """Route `key` (such as a job id returned by a call) to the worker behind `connection`."""
+        with self._lock:
+            for worker in self.workers:
+                if worker.connection is connection:
+                    self._bind(key, worker)
+                    return
+
+    def connections(self) -> list[tuple[int, Any]]:
+        """(port, connection) of every started worker, for calls that go to all of them."""
+        with self._lock:
+            return [(worker.port, worker.connection) for worker in self.workers if worker.connection is not None]
+
+    def stats(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "port": worker.port,
+                    "pid": worker.process.pid if worker.process else None,
+                    "alive": worker.process is not None and worker.process.poll() is None,
+                    "restarts": worker.restarts,
+                    "documents": sorted(key[4:] for key in worker.keys if key.startswith("doc:")),
+                    "current": worker is self._current,
+                }
+                for worker in self.workers
+            ]
+
+    def _bind(self, key: str, worker: FreeCADWorker):
+        previous = self._affinity.get(key)
+        if previous is not None:
+            previous.keys.discard(key)
+        self._affinity[key] = worker
+        worker.keys.add(key)
+
+    def _launch(self, worker: FreeCADWorker):
+        env = dict(os.environ, FREECAD_MCP_HOST=self.host, FREECAD_MCP_PORT=str(worker.port))
+        # FreeCADCmd logs to stdout, which carries the MCP protocol over stdio.
+        worker.process = subprocess.Popen(
+            [self.freecad_cmd, self.script], env=env, stdin=subprocess.DEVNULL, stdout=sys.stderr
+        )
+        if worker.connection is not None:
+            worker.connection.disconnect()
+        worker.connection = self.connect(self.host, worker.port)
+        worker.failures = 0
+        logger.info(f"Started FreeCAD worker {worker.index} (pid {worker.process.pid}) on port {worker.port}")
+
+    def _wait_ready(self, worker: FreeCADWorker):
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if worker.process.poll() is not None:
+                raise RuntimeError(
+                    f"FreeCAD worker on port {worker.port} exited with code {worker.process.returncode}."
+                )
+            if self._ping(worker):
+                return
+            time.sleep(0.2)
+        raise RuntimeError(f"FreeCAD worker on port {worker.port} did not start within {self.startup_timeout}s.")
+
+    def _terminate(self, worker: FreeCADWorker):
+        if worker.connection is not None:
+            worker.connection.disconnect()
+        process, worker.process = worker.process, None
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def _ping(self, worker: FreeCADWorker) -> bool:
+        # A separate connection, so the ping does not wait behind a long call.
+        transport = KeepAliveTransport(timeout=self.ping_timeout, retries=0)
+        proxy = xmlrpc.client.ServerProxy(f"http://{self.host}:{worker.port}", transport=transport)
+        try:
+            return proxy.ping() is True
+        except Exception:
+            return False
+        finally:
+            transport.close()
+
+    def _restart(self, worker: FreeCADWorker, reason: str):
+        with self._lock:
+            lost = sorted(key[4:] for key in worker.keys if key.startswith("doc:"))
+            for key in worker.keys:
+                del self._affinity[key]
+            worker.keys.clear()
+        logger.warning(
+            f"Restarting FreeCAD worker on port {worker.port} ({reason}); lost documents: {lost or 'none'}"
+        )
+        self._terminate(worker)
+        worker.restarts += 1
+        try:
+            self._launch(worker)
+            self._wait_ready(worker)
+        except Exception as e:
+            logger.error(f"Failed to restart FreeCAD worker on port {worker.port}: {e}")
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            for worker in self.workers:
+                if self._stop.is_set():
+                    return
+                if worker.process is None or worker.process.poll() is not None:
+                    code = worker.process.returncode if worker.process else None
+                    self._restart(worker, f"exited with code {code}")
+                    continue
+                if time.monotonic() - worker.last_used < self.health_interval:
+                    # Only ping workers that were idle for a whole interval.
+                    continue
+                if self._ping(worker):
+                    worker.failures = 0
+                    continue
+                worker.failures += 1
+                if worker.failures >= self.max_failures:
+                    self._restart(worker, f"no answer to {worker.failures} pings")
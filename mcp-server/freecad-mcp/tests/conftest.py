@@ -0,0 +1,70 @@
+"""Fixtures running the addon on fake_freecad, so the suite needs no FreeCAD.
+
+    cd freecad-mcp
+    python -m pytest
+"""
+import itertools
+import os
+import socket
+import sys
+import time
+import xmlrpc.client
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+
+import fake_freecad  # noqa: E402
+
+fake_freecad.install()
+
+_document_names = (f"TestDoc{i}" for i in itertools.count())
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def rpc():
+    """The addon's `rpc_server` module, serving on a fake FreeCAD for the whole session."""
+    port = free_port()
+    module = fake_freecad.start_server(port=port, max_workers=4)
+    module.test_port = port
+    yield module
+    module.stop_rpc_server()
+
+
+@pytest.fixture
+def proxy(rpc):
+    return xmlrpc.client.ServerProxy(f"http://localhost:{rpc.test_port}", allow_none=True)
+
+
+@pytest.fixture
+def doc(proxy):
+    """A fresh, empty document's name; closed after the test."""
+    import FreeCAD
+
+    name = next(_document_names)
+    assert proxy.create_document(name)["success"]
+    yield name
+    if name in FreeCAD.listDocuments():
+        FreeCAD.closeDocument(name)
+
+
+def box(name: str, **properties) -> dict:
+    return {"Name": name, "Type": "Part::Box", "Properties": properties}
+
+
+def wait_for_code(proxy, execution_id: str, timeout: float = 10.0) -> dict:
+    """Poll a `start_code` execution until it finishes and return its last status."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        out = proxy.read_code_output(execution_id, 0, 0, 1.0)
+        if out["finished"]:
+            return out
+    raise AssertionError(f"execution {execution_id} did not finish in {timeout}s")
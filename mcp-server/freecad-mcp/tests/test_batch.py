@@ -0,0 +1,82 @@
+import FreeCAD
+
+from conftest import box
+
+
+def test_batch_applies_all_operations(proxy, doc):
+    res = proxy.batch(doc, [
+        {"Action": "create", **box("A", Length=5)},
+        {"Action": "create", **box("B")},
+        {"Action": "edit", "Name": "A", "Properties": {"Height": 7}},
+        {"Action": "delete", "Name": "B"},
+    ])
+    assert res["success"]
+    assert [r["object_name"] for r in res["results"]] == ["A", "B", "A", "B"]
+    assert [o.Name for o in FreeCAD.getDocument(doc).Objects] == ["A"]
+    assert FreeCAD.getDocument(doc).getObject("A").Height == 7
+
+
+def test_unnamed_create_reports_the_assigned_name(proxy, doc):
+    res = proxy.batch(doc, [
+        {"Action": "create", "Type": "Part::Box"},
+        {"Action": "create", "Type": "Part::Box"},
+    ])
+    assert res["success"]
+    names = [r["object_name"] for r in res["results"]]
+    assert names == [o.Name for o in FreeCAD.getDocument(doc).Objects]
+    assert len(set(names)) == 2
+
+
+def test_failed_operation_rolls_back_the_batch(proxy, doc):
+    proxy.create_object(doc, box("Existing", Length=3))
+    res = proxy.batch(doc, [
+        {"Action": "create", **box("A")},
+        {"Action": "edit", "Name": "Existing", "Properties": {"Length": 9}},
+        {"Action": "delete", "Name": "Missing"},
+    ])
+    assert not res["success"]
+    assert res["rolled_back"]
+    assert res["results"][-1]["index"] == 2
+    document = FreeCAD.getDocument(doc)
+    assert [o.Name for o in document.Objects] == ["Existing"]
+    assert document.getObject("Existing").Length == 3
+
+
+def test_property_error_fails_the_batch(proxy, doc):
+    res = proxy.batch(doc, [
+        {"Action": "create", **box("A")},
+        {"Action": "create", **box("B", Length="not a number")},
+    ])
+    assert not res["success"]
+    assert res["rolled_back"]
+    assert "Length" in res["results"][-1]["error"]
+    assert FreeCAD.getDocument(doc).Objects == []
+
+    res = proxy.batch(doc, [
+        {"Action": "create", **box("A")},
+        {"Action": "edit", "Name": "A", "Properties": {"Width": "wide"}},
+    ])
+    assert not res["success"]
+    assert FreeCAD.getDocument(doc).Objects == []
+
+
+def test_single_create_keeps_going_past_property_errors(proxy, doc):
+    res = proxy.create_object(doc, box("A", Length="not a number", Height=4))
+    assert res["success"]
+    assert FreeCAD.getDocument(doc).getObject("A").Height == 4
+
+
+def test_gmsh_mesh_is_meshed_by_a_job_after_the_commit(rpc, proxy, doc, monkeypatch):
+    meshed = []
+    monkeypatch.setattr(rpc, "gmsh_mesh_job", lambda doc_name, mesh_name: lambda job: meshed.append(mesh_name))
+    res = proxy.batch(doc, [
+        {"Action": "create", **box("Block")},
+        {"Action": "create", "Name": "Analysis", "Type": "Fem::AnalysisPython"},
+        {"Action": "create", "Name": "Mesh", "Type": "Fem::FemMeshGmsh", "Analysis": "Analysis",
+         "Properties": {"Part": "Block"}},
+    ])
+    assert res["success"]
+    assert "job_id" not in res["results"][0]
+    job_id = res["results"][2]["job_id"]
+    assert proxy.get_job_status(job_id)["state"] in ("queued", "running", "done")
+    assert FreeCAD.getDocument(doc).getObject("Mesh").Part.Name == "Block"
@@ -0,0 +1,55 @@
+from rpc_server.cache import LRUCache
+
+
+def test_evicts_the_least_recently_used_entry():
+    evicted = []
+    cache = LRUCache(max_entries=2, on_evict=lambda key, value: evicted.append(key))
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert evicted == ["b"]
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_evicts_by_total_size():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.put("a", b"x" * 4)
+    cache.put("b", b"x" * 4)
+    cache.put("c", b"x" * 4)
+
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 8
+    # A value larger than the whole cache is not stored at all.
+    cache.put("huge", b"x" * 11)
+    assert cache.get("huge") is None
+    assert cache.get("b") is not None
+
+
+def test_replacing_and_popping_entries():
+    evicted = []
+    cache = LRUCache(max_entries=2, max_bytes=100, on_evict=lambda key, value: evicted.append((key, value)))
+    cache.put("a", "old")
+    cache.put("a", "new")
+    assert evicted == [("a", "old")]
+    assert cache.stats()["bytes"] == 3
+
+    assert cache.pop("a") == "new"
+    assert evicted == [("a", "old")]
+    assert cache.pop("a", "gone") == "gone"
+
+
+def test_clear_notifies_every_entry_and_counts_hits():
+    evicted = []
+    cache = LRUCache(on_evict=lambda key, value: evicted.append(key))
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    cache.clear()
+
+    assert evicted == ["a"]
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (0, 1, 1)
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+
+from conftest import wait_for_code
+from rpc_server.code_runner import CodeRunner
+
+COOPERATIVE_SCRIPT = """
+steps = []
+for i in range(3):
+    steps.append(i)
+    yield_gui(i / 3)
+print(steps)
+"""
+
+
+@pytest.mark.parametrize("cooperative, expected", [(False, False), (None, True), (True, True)])
+def test_yield_gui_script_runs_in_every_mode(rpc, proxy, cooperative, expected):
+    res = proxy.execute_code(COOPERATIVE_SCRIPT, "yield-modes", None, cooperative)
+
+    assert res["success"], res
+    assert "[0, 1, 2]" in res["message"]
+    assert rpc.code_runner.compile(COOPERATIVE_SCRIPT, cooperative).cooperative is expected
+
+
+def test_yield_gui_inside_functions_is_not_cooperative(rpc):
+    code = "def work():\n    yield_gui(0.5)\nwork()\n"
+
+    assert not rpc.code_runner.compile(code).cooperative
+
+
+def test_execute_code_reports_that_the_code_ran(proxy):
+    res = proxy.execute_code("print(6 * 7)")
+
+    assert res["success"]
+    assert res["message"].startswith("Python code executed.")
+    assert "42" in res["message"]
+
+
+def test_only_finished_executions_are_forgotten(rpc):
+    runner = CodeRunner(max_executions=2)
+    prepared = [runner.prepare(f"x = {i}") for i in range(3)]
+    # Nothing has run yet, so every execution is kept past the limit.
+    assert all(runner.get(execution.id) is execution for execution, _ in prepared)
+
+    for _, task in prepared:
+        assert task() is True
+    latest, _ = runner.prepare("x = 3")
+
+    kept = [execution for execution, _ in prepared if runner.get(execution.id) is not None]
+    assert kept == [prepared[2][0]]
+    assert runner.get(latest.id) is latest
+
+
+def test_sessions_keep_their_own_variables(proxy):
+    assert proxy.execute_code("answer = 42", "keep-a")["success"]
+    assert "42" in proxy.execute_code("print(answer)", "keep-a")["message"]
+    assert not proxy.execute_code("print(answer)", "keep-b")["success"]
+    assert proxy.reset_code_session("keep-a")
+    assert not proxy.execute_code("print(answer)", "keep-a")["success"]
+
+
+def test_runaway_script_is_interrupted_at_its_time_limit(proxy):
+    res = proxy.execute_code("while True:\n    pass\n", "runaway", 0.2)
+
+    assert not res["success"]
+    assert res["error"] == "Execution interrupted: time limit of 0.2 seconds exceeded"
+    # The GUI thread is free again.
+    assert proxy.execute_code("print('after')")["success"]
+
+
+def test_running_script_can_be_cancelled(proxy):
+    res = proxy.start_code("import time\nwhile True:\n    time.sleep(0.01)\n", "cancel-me", 0)
+    execution_id = res["execution_id"]
+    deadline = time.monotonic() + 5
+    while proxy.get_job_status(execution_id)["state"] != "running" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert proxy.cancel_job(execution_id)
+    out = wait_for_code(proxy, execution_id)
+    assert out["state"] == "interrupted"
+    assert out["error"] == "Execution interrupted: cancelled"
+    assert not proxy.cancel_job(execution_id)
+
+
+def test_execution_timed_out_in_the_queue_is_cancelled(rpc, monkeypatch):
+    monkeypatch.setattr(rpc, "run_gui_task", lambda task, timeout=None: "GUI task timed out after 1 seconds and was cancelled.")
+    res = rpc.FreeCADRPC().execute_code("x = 1", "never-ran", 1)
+    assert not res["success"]
+
+    execution = list(rpc.code_runner._executions.values())[-1]
+    assert execution.state == "cancelled"
+    assert execution.finished
+
+
+def test_started_execution_cancelled_in_the_queue_is_cancelled(rpc, proxy):
+    release = threading.Event()
+    rpc.submit_gui_task(lambda: release.wait(5))
+    try:
+        execution_id = proxy.start_code("x = 1", "never-ran", 0)["execution_id"]
+        assert rpc.cancel_pending_tasks() == 1
+    finally:
+        release.set()
+    status = proxy.get_job_status(execution_id)
+    assert status["state"] == "cancelled"
+    assert status["error"] == "Execution was cancelled before it started."
+
+
+def test_watchdog_leaves_a_finished_slice_alone(rpc):
+    runner = CodeRunner()
+    execution, task = runner.prepare("x = 1", time_limit=0)
+    assert task() is True
+    assert execution._thread_id is None
+    # A watchdog that saw the state before the slice ended must not raise into
+    # this thread, which has moved on to other work.
+    execution.state = "running"
+    execution.interrupt("too late")
+    for _ in range(1000):
+        pass
+
+
+def test_cooperative_script_lets_other_calls_through(proxy, doc):
+    script = "import time\nfor i in range(10):\n    time.sleep(0.03)\n    yield_gui((i + 1) / 10, f'step {i}')\n"
+    res = proxy.start_code(script, "cooperative", 0, True)
+    execution_id = res["execution_id"]
+
+    # Answered between two slices instead of after the whole script.
+    start = time.monotonic()
+    assert proxy.get_objects(doc) == []
+    assert time.monotonic() - start < 0.2
+
+    out = wait_for_code(proxy, execution_id)
+    assert out["state"] == "done"
+    assert out["cooperative"]
+    assert out["slices"] >= 5
+    assert out["progress"] == 1.0
+    assert out["message"] == "step 9"
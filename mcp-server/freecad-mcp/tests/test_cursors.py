@@ -0,0 +1,58 @@
+import FreeCAD
+
+from conftest import box
+
+
+def test_cursor_reads_a_document_in_chunks(proxy, doc):
+    for i in range(5):
+        proxy.create_object(doc, box(f"Box{i}"))
+    proxy.create_object(doc, {"Name": "Ball", "Type": "Part::Sphere"})
+
+    opened = proxy.open_object_cursor(doc, ["Name", "TypeId"], "Part::Box")
+    assert opened["total"] == 5
+    cursor = opened["cursor"]
+
+    chunk = proxy.read_object_cursor(cursor, 2)
+    assert [o["Name"] for o in chunk["objects"]] == ["Box0", "Box1"]
+    assert not chunk["done"]
+    assert chunk["remaining"] == 3
+
+    # Objects deleted after the cursor was opened are skipped.
+    FreeCAD.getDocument(doc).removeObject("Box3")
+    chunk = proxy.read_object_cursor(cursor, 10)
+    assert [o["Name"] for o in chunk["objects"]] == ["Box2", "Box4"]
+    assert chunk["done"]
+
+    # A finished cursor is closed.
+    assert not proxy.read_object_cursor(cursor, 10)["success"]
+    assert not proxy.close_object_cursor(cursor)
+
+
+def test_cursor_can_be_closed_early(proxy, doc):
+    proxy.create_object(doc, box("A"))
+    cursor = proxy.open_object_cursor(doc)["cursor"]
+
+    assert proxy.close_object_cursor(cursor)
+    assert "Unknown or expired cursor" in proxy.read_object_cursor(cursor, 1)["error"]
+
+
+def test_cursor_of_an_empty_document(proxy, doc):
+    opened = proxy.open_object_cursor(doc)
+    assert opened["total"] == 0
+    chunk = proxy.read_object_cursor(opened["cursor"], 10)
+    assert chunk["objects"] == []
+    assert chunk["done"]
+
+
+def test_cursor_store_evicts_the_least_recently_used(rpc):
+    from rpc_server.cursors import CursorStore, ObjectCursor
+
+    store = CursorStore(max_cursors=2)
+    first = store.open(ObjectCursor("Doc", ["A"]))
+    second = store.open(ObjectCursor("Doc", ["B"]))
+    store.get(first).take(1)
+    third = store.open(ObjectCursor("Doc", ["C"]))
+
+    assert store.get(second) is None
+    assert store.get(first) is not None
+    assert store.get(third) is not None
@@ -0,0 +1,19 @@
+import threading
+import time
+
+
+def test_run_gui_task_reports_timeouts(rpc):
+    from rpc_server.dispatcher import run_gui_task, submit_gui_task
+
+    release = threading.Event()
+    running = submit_gui_task(lambda: release.wait(5))
+    try:
+        # Queued behind the blocked task, so it can still be cancelled.
+        res = run_gui_task(lambda: "never", timeout=0.05)
+        assert res == "GUI task timed out after 0.05 seconds and was cancelled."
+    finally:
+        release.set()
+    assert running.result(timeout=5) is True
+
+    res = run_gui_task(lambda: time.sleep(0.3), timeout=0.05)
+    assert res == "GUI task did not finish within 0.05 seconds."
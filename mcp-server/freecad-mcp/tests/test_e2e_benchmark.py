@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from e2e_benchmark import compare  # noqa: E402
+
+
+def report(**p95s) -> dict:
+    """A benchmark result with a total p95 and call count per tool."""
+    return {
+        "tools": {
+            tool: {"stages": {"total": {"count": count, "p95_ms": p95}}}
+            for tool, (p95, count) in p95s.items()
+        }
+    }
+
+
+@pytest.mark.parametrize(
+    "before, after, flagged",
+    [
+        ((10.0, 20), (11.0, 20), False),  # within 20%
+        ((10.0, 20), (13.0, 20), True),
+        ((0.3, 20), (0.9, 20), False),  # tripled, but by less than 1 ms
+        ((10.0, 3), (30.0, 20), False),  # too few baseline samples
+        ((10.0, 20), (30.0, 3), False),  # too few new samples
+    ],
+)
+def test_compare_ignores_noise(before, after, flagged):
+    regressions = compare(report(get_view=after), report(get_view=before), max_regression=0.2)
+    assert bool(regressions) is flagged
+
+
+def test_compare_thresholds_are_configurable():
+    baseline, new = report(get_view=(0.3, 2)), report(get_view=(0.9, 2))
+    assert compare(new, baseline, 0.2, min_delta_ms=0.1, min_samples=2) == ["get_view: p95 0.30 ms -> 0.90 ms"]
+    assert compare(new, report(), 0.2) == []
@@ -0,0 +1,34 @@
+import pytest
+
+import fake_freecad
+from conftest import box
+
+
+def test_box_shape_follows_its_properties(proxy, doc):
+    import FreeCAD
+
+    assert proxy.create_object(doc, box("Box", Length=20, Width=10, Height=5))["success"]
+
+    shape = FreeCAD.getDocument(doc).getObject("Box").Shape
+    assert shape.Volume == pytest.approx(1000.0)
+    assert shape.BoundBox.XLength == pytest.approx(20.0)
+
+
+def test_aborted_transaction_restores_the_document(doc):
+    import FreeCAD
+
+    document = FreeCAD.getDocument(doc)
+    kept = document.addObject("Part::Box", "Kept")
+    document.openTransaction("edit")
+    kept.Length = 50
+    document.addObject("Part::Box", "Dropped")
+    document.abortTransaction()
+
+    assert [obj.Name for obj in document.Objects] == ["Kept"]
+    assert kept.Length == 10.0
+
+
+def test_latency_spec_is_parsed_and_checked():
+    assert fake_freecad.parse_latencies("recompute=0.002, shape=0") == {"recompute": 0.002, "shape": 0.0}
+    with pytest.raises(ValueError, match="Unknown latency 'gui'"):
+        fake_freecad.set_latencies(gui=1.0)
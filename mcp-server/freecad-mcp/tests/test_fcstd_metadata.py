@@ -0,0 +1,119 @@
+import zipfile
+
+import pytest
+
+from rpc_server.fcstd_metadata import brep_bound_box, read_part_metadata
+
+DOCUMENT_XML = """<?xml version='1.0' encoding='utf-8'?>
+<Document SchemaVersion="4">
+  <Properties Count="2">
+    <Property name="Label" type="App::PropertyString"><String value="Bracket"/></Property>
+    <Property name="UnitSystem" type="App::PropertyEnumeration"><Integer value="0"/></Property>
+  </Properties>
+  <Objects Count="2">
+    <Object type="Part::Feature" name="Body"/>
+    <Object type="Part::Feature" name="Helper"/>
+  </Objects>
+  <ObjectData Count="2">
+    <Object name="Body">
+      <Properties Count="2">
+        <Property name="Label" type="App::PropertyString"><String value="Main body"/></Property>
+        <Property name="Shape" type="Part::PropertyPartShape"><Part file="PartShape.brp"/></Property>
+      </Properties>
+    </Object>
+    <Object name="Helper">
+      <Properties Count="1">
+        <Property name="Shape" type="Part::PropertyPartShape"><Part file="PartShape1.brp"/></Property>
+      </Properties>
+    </Object>
+  </ObjectData>
+</Document>
+"""
+
+GUI_DOCUMENT_XML = """<?xml version='1.0' encoding='utf-8'?>
+<Document SchemaVersion="1">
+  <ViewProviderData Count="1">
+    <ViewProvider name="Helper">
+      <Properties Count="1">
+        <Property name="Visibility" type="App::PropertyBool"><Bool value="false"/></Property>
+      </Properties>
+    </ViewProvider>
+  </ViewProviderData>
+</Document>
+"""
+
+# Two vertices and a circle of radius 5 around the origin, translated by x + 10.
+BREP = """DBRep_DrawableShape
+
+CASCADE Topology V1, (c) Matra-Datavision
+Locations 1
+1
+              1               0               0              10
+              0               1               0               0
+              0               0               1               0
+Curves 1
+2 0 0 0 0 0 1 1 0 0 0 1 0 5
+Polygon3D 0
+TShapes 2
+Ve
+1e-07
+0 0 0
+0 0
+
+0101101
+*
+Ve
+1e-07
+2 3 4
+0 0
+
+0101101
+*
+
++2 1
+"""
+
+FAR_AWAY_BREP = BREP.replace("2 3 4", "900 900 900")
+
+
+@pytest.fixture
+def part(tmp_path):
+    path = tmp_path / "bracket.FCStd"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("Document.xml", DOCUMENT_XML)
+        archive.writestr("GuiDocument.xml", GUI_DOCUMENT_XML)
+        archive.writestr("PartShape.brp", BREP)
+        archive.writestr("PartShape1.brp", FAR_AWAY_BREP)
+        archive.writestr("thumbnails/Thumbnail.png", b"\x89PNG")
+    return str(path)
+
+
+def test_reads_labels_objects_and_thumbnail(part):
+    metadata = read_part_metadata(part)
+
+    assert metadata["label"] == "Bracket"
+    assert metadata["unit_system"] == "Standard (mm, kg, s, degree)"
+    assert metadata["objects"] == [
+        {"name": "Body", "label": "Main body", "type": "Part::Feature", "visible": True},
+        {"name": "Helper", "label": "Helper", "type": "Part::Feature", "visible": False},
+    ]
+    assert metadata["thumbnail"] == b"\x89PNG"
+
+
+def test_bound_box_covers_visible_shapes_only(part):
+    box = read_part_metadata(part)["bound_box"]
+
+    assert (box["XMin"], box["YMin"], box["ZMin"]) == (5.0, -5.0, 0.0)
+    assert (box["XMax"], box["YMax"], box["ZMax"]) == (15.0, 5.0, 4.0)
+    assert (box["XLength"], box["YLength"], box["ZLength"]) == (10.0, 10.0, 4.0)
+
+
+def test_brep_without_vertices_has_no_bound_box():
+    assert brep_bound_box("CASCADE Topology V1\nLocations 0\nTShapes 0\n") is None
+
+
+def test_rejects_files_that_are_not_fcstd(tmp_path):
+    path = tmp_path / "broken.FCStd"
+    path.write_bytes(b"not a zip")
+    with pytest.raises(zipfile.BadZipFile):
+        read_part_metadata(str(path))
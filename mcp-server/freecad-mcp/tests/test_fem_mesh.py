@@ -0,0 +1,75 @@
+import sys
+import types
+
+import pytest
+
+from conftest import box
+
+
+class BaseGmshTools:
+    """Records the GmshTools steps prepare_gmsh_mesh calls."""
+
+    STEPS = (
+        "start_logs", "get_dimension", "get_tmp_file_paths", "get_gmsh_command", "get_group_data",
+        "get_region_data", "get_boundary_layer_data", "write_part_file", "write_geo",
+    )
+
+    def __init__(self, mesh_obj):
+        self.mesh_obj = mesh_obj
+        self.calls = []
+        self.temp_file_geo = "/nonexistent/shape2mesh.geo"
+
+    def __getattr__(self, name):
+        if name in self.STEPS:
+            return lambda: self.calls.append(name)
+        raise AttributeError(name)
+
+
+class NewGmshTools(BaseGmshTools):
+    def prepare(self):
+        self.calls.append("prepare")
+
+    def write_gmsh_input_files(self):
+        self.calls.append("write_gmsh_input_files")
+
+
+@pytest.fixture
+def gmsh_tools(monkeypatch):
+    def install(cls):
+        module = types.ModuleType("femmesh.gmshtools")
+        module.GmshTools = cls
+        monkeypatch.setitem(sys.modules, "femmesh", types.ModuleType("femmesh"))
+        monkeypatch.setitem(sys.modules, "femmesh.gmshtools", module)
+
+    return install
+
+
+@pytest.fixture
+def mesh(proxy, doc):
+    import FreeCAD
+    import ObjectsFem
+
+    proxy.create_object(doc, box("Block"))
+    document = FreeCAD.getDocument(doc)
+    mesh = ObjectsFem.makeMeshGmsh(document, "Mesh")
+    mesh.Part = document.getObject("Block")
+    return doc, mesh.Name
+
+
+def test_prepare_uses_the_public_steps_when_available(rpc, gmsh_tools, mesh):
+    from rpc_server.fem_mesh import prepare_gmsh_mesh
+
+    gmsh_tools(NewGmshTools)
+    tools = prepare_gmsh_mesh(*mesh)
+    # prepare() did not leave a .geo file behind, so the input files are written explicitly.
+    assert tools.calls == ["prepare", "write_gmsh_input_files"]
+
+
+def test_prepare_falls_back_to_the_individual_steps(rpc, gmsh_tools, mesh):
+    from rpc_server.fem_mesh import prepare_gmsh_mesh
+
+    gmsh_tools(BaseGmshTools)
+    tools = prepare_gmsh_mesh(*mesh)
+    assert tools.calls[0] == "start_logs"
+    assert tools.calls[-2:] == ["write_part_file", "write_geo"]
+    assert "prepare" not in tools.calls
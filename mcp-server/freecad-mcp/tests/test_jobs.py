@@ -0,0 +1,77 @@
+import threading
+import time
+
+from rpc_server.jobs import JobManager
+
+
+def wait_finished(job, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.finished, job.state
+
+
+def test_cancelling_a_queued_job_skips_it():
+    manager = JobManager(max_concurrent=1)
+    release = threading.Event()
+    ran = []
+    blocker = manager.submit("block", lambda job: release.wait(5))
+    queued = manager.submit("queued", lambda job: ran.append(job.id))
+    try:
+        assert queued.state == "queued"
+        assert manager.cancel(queued.id)
+        assert queued.state == "cancelled"
+        assert queued.error == "Job was cancelled before it started."
+    finally:
+        release.set()
+    wait_finished(blocker)
+    assert blocker.state == "done"
+    assert ran == []
+    assert not manager.cancel(queued.id)
+    manager.shutdown()
+
+
+def test_cancelling_a_running_job_runs_its_callbacks():
+    manager = JobManager(max_concurrent=1)
+    started = threading.Event()
+    killed = threading.Event()
+
+    def work(job):
+        job.on_cancel(killed.set)
+        started.set()
+        while True:
+            job.check_cancelled()
+            time.sleep(0.01)
+
+    job = manager.submit("work", work)
+    assert started.wait(5)
+    assert job.state == "running"
+    assert manager.cancel(job.id)
+    wait_finished(job)
+    assert job.state == "cancelled"
+    assert killed.is_set()
+    manager.shutdown()
+
+
+def test_finished_jobs_are_kept_on_disk(tmp_path):
+    manager = JobManager(results_dir=str(tmp_path), max_persisted=2)
+    jobs = []
+    for i in range(3):
+        jobs.append(manager.submit("square", lambda job, i=i: {"value": i * i}))
+        wait_finished(jobs[-1])
+        # Results are pruned by modification time.
+        time.sleep(0.01)
+    failed = manager.submit("fail", lambda job: 1 / 0)
+    wait_finished(failed)
+    manager.shutdown()
+
+    # A new manager, as after a FreeCAD restart, reads the results back.
+    restarted = JobManager(results_dir=str(tmp_path), max_persisted=2)
+    persisted = restarted.get(failed.id)
+    assert persisted["state"] == "error"
+    assert persisted["error"] == "division by zero"
+    assert persisted["finished"]
+    assert restarted.get(jobs[2].id)["result"] == {"value": 4}
+    # Only the newest `max_persisted` results are kept.
+    assert len(list(tmp_path.glob("*.json"))) == 2
+    assert restarted.get("0123abcd") is None
@@ -0,0 +1,82 @@
+from conftest import wait_for_code
+
+SLOW_COOPERATIVE_SCRIPT = """
+import time
+for i in range(6):
+    time.sleep(0.06)
+    yield_gui(i / 6)
+"""
+
+
+def test_reset_keeps_the_dispatch_histograms(proxy, doc):
+    proxy.get_objects(doc)
+    before = proxy.get_dispatch_stats()["gui_exec"]["count"]
+    assert before > 0
+
+    res = proxy.get_metrics("json", 0, None, 0.0, True)
+    assert res["metrics"]["methods"]["get_objects"]["calls"] > 0
+
+    after = proxy.get_metrics("json", 5)["metrics"]
+    assert "get_objects" not in after["methods"] or after["methods"]["get_objects"]["calls"] == 0
+    assert [trace["method"] for trace in after["traces"]] == ["get_metrics"]
+    assert proxy.get_dispatch_stats()["gui_exec"]["count"] >= before
+
+
+def test_slices_after_the_call_are_not_traced_into_it(proxy):
+    res = proxy.start_code(SLOW_COOPERATIVE_SCRIPT, "traced", None, True)
+    assert res["success"]
+    out = wait_for_code(proxy, res["execution_id"])
+    assert out["state"] == "done"
+    assert out["slices"] >= 6
+
+    [trace] = proxy.get_metrics("json", 1, "start_code")["metrics"]["traces"]
+    # The script ran for ~360 ms of GUI time, nearly all of it after start_code returned.
+    assert trace["stages_ms"].get("gui_exec", 0.0) < 100.0
+
+
+def test_histogram_percentiles_and_buckets():
+    from rpc_server.metrics import Histogram
+
+    histogram = Histogram(buckets_ms=(1, 10, 100))
+    for value in (0.5, 2, 3, 4, 50, 500):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+
+    assert snapshot["count"] == 6
+    assert snapshot["sum_ms"] == 559.5
+    assert (snapshot["min_ms"], snapshot["max_ms"]) == (0.5, 500)
+    assert [b["count"] for b in snapshot["buckets"]] == [1, 4, 5, 6]
+    assert [b["le_ms"] for b in snapshot["buckets"]] == ["1", "10", "100", "+Inf"]
+    assert 1 <= snapshot["p50_ms"] <= 10
+    assert snapshot["p99_ms"] <= 500
+
+    histogram.reset()
+    assert histogram.snapshot()["p50_ms"] is None
+
+
+def test_prometheus_text():
+    from rpc_server.metrics import MetricsRegistry, Trace
+
+    registry = MetricsRegistry()
+    trace = Trace("get_objects")
+    trace.duration_ms = 3.0
+    trace.response_bytes = 300
+    registry.finish(trace)
+    failed = Trace("get_objects")
+    failed.duration_ms = 1.0
+    failed.fail("boom")
+    registry.finish(failed)
+    registry.histogram("gui_exec").observe(2.0)
+    registry.counter("tasks_rejected", "GUI tasks rejected.").inc()
+
+    text = registry.prometheus({"gui_queue_depth": 0}, {"worker": "9876"})
+    lines = text.splitlines()
+
+    assert "# TYPE freecad_mcp_rpc_calls_total counter" in lines
+    assert 'freecad_mcp_rpc_calls_total{worker="9876",method="get_objects"} 2' in lines
+    assert 'freecad_mcp_rpc_errors_total{worker="9876",method="get_objects"} 1' in lines
+    assert 'freecad_mcp_rpc_duration_ms_bucket{worker="9876",method="get_objects",le="+Inf"} 2' in lines
+    assert 'freecad_mcp_stage_duration_ms_count{worker="9876",stage="gui_exec"} 1' in lines
+    assert "# HELP freecad_mcp_tasks_rejected_total GUI tasks rejected." in lines
+    assert 'freecad_mcp_gui_queue_depth{worker="9876"} 0' in lines
+    assert [t["method"] for t in registry.traces.recent()] == ["get_objects", "get_objects"]
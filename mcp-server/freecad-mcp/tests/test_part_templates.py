@@ -0,0 +1,59 @@
+import os
+
+import FreeCAD
+import pytest
+
+from rpc_server.part_templates import PartTemplateCache
+
+
+@pytest.fixture
+def part(tmp_path, monkeypatch):
+    """A library file, opened like FreeCAD does: an open file returns its open document."""
+    path = tmp_path / "bolt.FCStd"
+    path.write_bytes(b"part")
+    opened = []
+
+    def open_document(file_name, hidden=False):
+        for doc in FreeCAD.listDocuments().values():
+            if doc.FileName and os.path.samefile(doc.FileName, file_name):
+                return doc
+        doc = FreeCAD.newDocument("Bolt", hidden=hidden)
+        doc.FileName = file_name
+        doc.addObject("Part::Box", "Bolt")
+        opened.append(doc.Name)
+        return doc
+
+    monkeypatch.setattr(FreeCAD, "openDocument", open_document)
+    yield str(path), opened
+    for name in opened:
+        if name in FreeCAD.listDocuments():
+            FreeCAD.closeDocument(name)
+
+
+def test_part_open_in_the_gui_gets_its_own_template(rpc, part):
+    path, opened = part
+    user_doc = FreeCAD.openDocument(path)
+    cache = PartTemplateCache()
+
+    template = cache.get(path)
+    assert template is not user_doc
+    assert not cache.is_template(user_doc.Name)
+    copy_path = template.FileName
+    assert copy_path != path
+
+    cache.clear()
+    assert user_doc.Name in FreeCAD.listDocuments()
+    assert template.Name not in FreeCAD.listDocuments()
+    assert not os.path.exists(copy_path)
+
+
+def test_document_handed_back_by_freecad_is_never_closed(rpc, part, monkeypatch):
+    path, opened = part
+    user_doc = FreeCAD.openDocument(path)
+    monkeypatch.setattr(FreeCAD, "openDocument", lambda file_name, hidden=False: user_doc)
+    cache = PartTemplateCache()
+
+    assert cache.get(path) is user_doc
+    assert not cache.is_template(user_doc.Name)
+    cache.clear()
+    assert user_doc.Name in FreeCAD.listDocuments()
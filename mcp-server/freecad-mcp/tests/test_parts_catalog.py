@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from rpc_server.parts_catalog import PartsCatalog, parse_dimensions
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("ISO4017 M6x20", [6.0, 20.0]),
+        ("DIN912_M10x1.5x40", [10.0, 1.5, 40.0]),
+        ("Washer ISO7089 8mm", [8.0]),
+        ("Bearing 608 (d8 D22)", [608.0, 8.0, 22.0]),
+        ("Profile 20x20 R5", [20.0, 20.0, 5.0]),
+        ("ISO4017", []),
+        ("Hex nut", []),
+    ],
+)
+def test_parse_dimensions(name, expected):
+    assert parse_dimensions(name) == expected
+
+
+def test_part_overwritten_in_place_is_picked_up_by_the_restat_pass(tmp_path):
+    library = tmp_path / "library"
+    library.mkdir()
+    part = library / "bolt.FCStd"
+    part.write_bytes(b"v1")
+    catalog = PartsCatalog(str(library), str(tmp_path / "index" / "catalog.sqlite3"), refresh_interval=0)
+    try:
+        assert catalog.refresh() == {"scanned": 1, "changed": 0}
+        dir_mtime = library.stat().st_mtime
+        part.write_bytes(b"v2")
+        os.utime(part, (dir_mtime + 10, dir_mtime + 10))
+        os.utime(library, (dir_mtime, dir_mtime))
+
+        # The directory looks unchanged, and the files were stat'ed a moment ago.
+        assert catalog.refresh() == {"scanned": 0, "changed": 0}
+        catalog.restat_interval = 0
+        assert catalog.refresh() == {"scanned": 0, "changed": 1}
+        assert catalog.refresh() == {"scanned": 0, "changed": 0}
+    finally:
+        catalog.close()
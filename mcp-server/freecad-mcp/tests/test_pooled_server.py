@@ -0,0 +1,84 @@
+import threading
+import xmlrpc.client
+
+import FreeCAD
+import pytest
+
+from conftest import box, free_port
+from freecad_mcp.transport import KeepAliveTransport
+from rpc_server.pooled_server import (
+    SERVER_BUSY_FAULT,
+    InstrumentedXMLRPCServer,
+    KeepAliveRequestHandler,
+    PooledXMLRPCServer,
+)
+
+
+def test_document_reads_run_on_the_gui_thread(proxy, doc, monkeypatch):
+    threads = []
+    document = FreeCAD.getDocument(doc)
+    list_documents = FreeCAD.listDocuments
+    get_objects = type(document).Objects
+
+    def record(read):
+        threads.append(threading.current_thread().name)
+        return read()
+
+    monkeypatch.setattr(FreeCAD, "listDocuments", lambda: record(list_documents))
+    monkeypatch.setattr(type(document), "Objects", property(lambda self: record(lambda: get_objects.fget(self))))
+    proxy.create_object(doc, box("A"))
+    threads.clear()
+
+    assert doc in proxy.list_documents()
+    assert [o["Name"] for o in proxy.get_objects(doc)] == ["A"]
+    assert proxy.get_objects(doc, None, "Part::")["total"] == 1
+    assert len(threads) == 3
+    assert not any(name.startswith("FreeCADMCP-RPC") for name in threads)
+
+
+def test_requests_beyond_the_queue_get_a_busy_fault():
+    port = free_port()
+    server = PooledXMLRPCServer(("localhost", port), max_workers=1, max_pending=0, logRequests=False)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        return release.wait(5)
+
+    server.register_function(block)
+    server.register_function(lambda: True, "ping")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://localhost:{port}"
+    blocked = threading.Thread(target=lambda: xmlrpc.client.ServerProxy(url).block())
+    blocked.start()
+    try:
+        assert started.wait(5)
+        with pytest.raises(xmlrpc.client.Fault) as fault:
+            xmlrpc.client.ServerProxy(url).ping()
+        assert fault.value.faultCode == SERVER_BUSY_FAULT
+    finally:
+        release.set()
+        blocked.join()
+        server.shutdown()
+        server.server_close()
+    assert not server.rejecting
+
+
+def test_single_threaded_server_drops_idle_keep_alive_connections():
+    port = free_port()
+    handler = type("RequestHandler", (KeepAliveRequestHandler,), {"timeout": 0.2})
+    server = InstrumentedXMLRPCServer(("localhost", port), requestHandler=handler, logRequests=False)
+    server.register_function(lambda: True, "ping")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://localhost:{port}"
+    try:
+        kept = xmlrpc.client.ServerProxy(url, transport=KeepAliveTransport())
+        assert kept.ping()
+        # Served once the first connection has idled out.
+        assert xmlrpc.client.ServerProxy(url).ping()
+        # The closed connection is replaced.
+        assert kept.ping()
+    finally:
+        server.shutdown()
+        server.server_close()
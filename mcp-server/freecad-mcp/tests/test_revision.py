@@ -0,0 +1,72 @@
+import FreeCAD
+
+from conftest import box
+
+
+def test_recreated_document_starts_new_shape_revisions(rpc, proxy, doc):
+    from rpc_server.revision import shape_revision
+
+    proxy.create_object(doc, box("A"))
+    before = shape_revision(doc, "A")
+    FreeCAD.closeDocument(doc)
+    assert proxy.create_document(doc)["success"]
+
+    # Objects whose geometry never changed must not share cache keys with the old document.
+    assert shape_revision(doc, "A") > before
+    assert shape_revision(doc, "Untouched") > before
+
+
+def test_recreated_document_does_not_reuse_cached_shapes(proxy, doc):
+    proxy.create_object(doc, box("A", Length=10))
+    first = proxy.get_object(doc, "A")["Shape"]["BoundBox"]
+    FreeCAD.closeDocument(doc)
+
+    assert proxy.create_document(doc)["success"]
+    proxy.create_object(doc, box("A", Length=20))
+    assert proxy.get_object(doc, "A")["Shape"]["BoundBox"] != first
+
+
+def delta(proxy, doc, since):
+    return proxy.get_objects(doc, None, None, 0, None, since)
+
+
+def test_since_revision_lists_only_changes(proxy, doc):
+    proxy.create_object(doc, box("A"))
+    proxy.create_object(doc, box("B"))
+    first = delta(proxy, doc, 0)
+    assert first["full"]
+    assert [o["Name"] for o in first["objects"]] == ["A", "B"]
+
+    assert delta(proxy, doc, first["revision"])["objects"] == []
+
+    proxy.edit_object(doc, "A", {"Properties": {"Length": 3}})
+    proxy.create_object(doc, box("C"))
+    proxy.delete_object(doc, "B")
+    second = delta(proxy, doc, first["revision"])
+    assert not second["full"]
+    assert sorted(o["Name"] for o in second["objects"]) == ["A", "C"]
+    assert second["removed"] == ["B"]
+    assert second["revision"] > first["revision"]
+
+
+def test_token_from_before_the_document_was_recreated_gets_a_full_listing(proxy, doc):
+    proxy.create_object(doc, box("A"))
+    token = delta(proxy, doc, 0)["revision"]
+    FreeCAD.closeDocument(doc)
+    proxy.create_document(doc)
+    proxy.create_object(doc, box("Z"))
+
+    res = delta(proxy, doc, token)
+    assert res["full"]
+    assert [o["Name"] for o in res["objects"]] == ["Z"]
+
+
+def test_shape_summaries_are_cached_until_the_shape_changes(proxy, doc):
+    proxy.create_object(doc, box("A", Length=10))
+    proxy.get_object(doc, "A")
+    hits = proxy.get_cache_stats()["shapes"]["hits"]
+    assert proxy.get_object(doc, "A")["Shape"]["BoundBox"]["XMax"] == 10
+    assert proxy.get_cache_stats()["shapes"]["hits"] == hits + 1
+
+    proxy.edit_object(doc, "A", {"Properties": {"Length": 25}})
+    assert proxy.get_object(doc, "A")["Shape"]["BoundBox"]["XMax"] == 25
@@ -0,0 +1,65 @@
+import types
+
+import FreeCAD
+import pytest
+
+
+class View3DInventor:
+    def __init__(self, size):
+        self.size = size
+
+    def saveImage(self, *args):
+        pass
+
+
+class SheetView:
+    pass
+
+
+@pytest.fixture
+def gui(rpc, proxy, doc, monkeypatch):
+    """Pretend FreeCAD has a GUI whose active view renders `rendered` images."""
+    gui_doc = types.SimpleNamespace(ActiveView=View3DInventor((800, 600)))
+    rendered = []
+
+    def encode_image(image, image_format, quality, width, height):
+        rendered.append(gui_doc.ActiveView.size)
+        return b"image", "image/png"
+
+    monkeypatch.setattr(FreeCAD, "GuiUp", 1)
+    monkeypatch.setattr(rpc, "FreeCADGui", types.SimpleNamespace(ActiveDocument=gui_doc), raising=False)
+    monkeypatch.setattr(rpc, "view_identity", lambda view: (id(view), *view.size), raising=False)
+    monkeypatch.setattr(rpc, "set_view_direction", lambda view, name: None, raising=False)
+    monkeypatch.setattr(rpc, "grab_view_image", lambda view: object(), raising=False)
+    monkeypatch.setattr(rpc, "encode_image", encode_image, raising=False)
+    FreeCAD.setActiveDocument(doc)
+    rpc.screenshot_cache.clear()
+    return gui_doc, rendered
+
+
+def test_unchanged_view_is_served_from_the_cache(proxy, gui):
+    _, rendered = gui
+    assert proxy.capture_view()["success"]
+    assert proxy.capture_view()["cached"]
+    assert len(rendered) == 1
+
+
+def test_resized_or_other_view_is_captured_again(proxy, gui):
+    gui_doc, rendered = gui
+    view = gui_doc.ActiveView
+    proxy.capture_view()
+    view.size = (400, 300)
+    assert not proxy.capture_view().get("cached")
+    gui_doc.ActiveView = View3DInventor((400, 300))
+    assert not proxy.capture_view().get("cached")
+    assert rendered == [(800, 600), (400, 300), (400, 300)]
+
+
+def test_unsupported_view_is_reported_despite_a_cached_image(proxy, gui):
+    gui_doc, _ = gui
+    proxy.capture_view()
+    gui_doc.ActiveView = SheetView()
+    res = proxy.capture_view()
+    assert not res["success"]
+    assert res["unsupported"]
+    assert res["view_type"] == "SheetView"
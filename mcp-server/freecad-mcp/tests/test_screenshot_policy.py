@@ -0,0 +1,49 @@
+import pytest
+
+from freecad_mcp.screenshot_policy import ScreenshotPolicy
+
+
+def captures(policy: ScreenshotPolicy, calls) -> list[bool]:
+    return [policy.should_capture(changed, batch) for changed, batch in calls]
+
+
+CALLS = [(True, False), (False, False), (True, False), (True, True), (True, False)]
+
+
+@pytest.mark.parametrize(
+    "mode, expected",
+    [
+        ("always", [True, True, True, True, True]),
+        ("never", [False, False, False, False, False]),
+        ("on_change", [True, False, True, True, True]),
+        ("every_n", [False, False, True, False, True]),
+        ("end_of_batch", [False, False, False, True, False]),
+    ],
+)
+def test_modes(mode, expected):
+    policy = ScreenshotPolicy(mode, every_n=2)
+    assert captures(policy, CALLS) == expected
+    stats = policy.stats()
+    assert stats["captured"] == sum(expected)
+    assert stats["skipped"] == len(expected) - sum(expected)
+
+
+def test_override_wins_and_resets_the_change_count():
+    policy = ScreenshotPolicy("every_n", every_n=2)
+    assert policy.should_capture(True, override=True)
+    assert not policy.should_capture(True)
+    assert not policy.should_capture(True, override=False)
+    assert policy.should_capture(True)
+
+
+def test_configure_validates_and_resets():
+    policy = ScreenshotPolicy("every_n", every_n=3)
+    policy.should_capture(True)
+    policy.configure("every_n")
+    assert policy.stats()["changes_since_capture"] == 0
+    assert policy.every_n == 3
+
+    with pytest.raises(ValueError):
+        policy.configure("sometimes")
+    with pytest.raises(ValueError):
+        policy.configure("every_n", 0)
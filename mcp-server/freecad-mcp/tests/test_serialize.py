@@ -0,0 +1,20 @@
+import FreeCAD
+
+from rpc_server import serialize
+
+
+def test_property_plan_is_not_changed_by_other_value_types(rpc, doc):
+    document = FreeCAD.getDocument(doc)
+    first = document.addObject("App::FeaturePython", "First")
+    first.addProperty("App::PropertyPythonObject", "Value")
+    first.Value = 3
+    second = document.addObject("App::FeaturePython", "Second")
+    second.addProperty("App::PropertyPythonObject", "Value")
+    second.Value = FreeCAD.Vector(1, 2, 3)
+
+    assert serialize.serialize_properties(first)["Value"] == 3
+    plan = serialize._property_plans[(first.TypeId, tuple(first.PropertiesList))]
+    assert isinstance(plan, tuple)
+    assert serialize.serialize_properties(second)["Value"] == {"x": 1, "y": 2, "z": 3}
+    assert serialize._property_plans[(first.TypeId, tuple(first.PropertiesList))] is plan
+    assert serialize.serialize_properties(first)["Value"] == 3
@@ -0,0 +1,102 @@
+import http.client
+import threading
+import time
+import xmlrpc.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import free_port
+from freecad_mcp.transport import KeepAliveTransport
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests += 1
+        mode = self.server.mode
+        if mode == "drop":
+            # Read the request, then hang up without answering.
+            self.close_connection = True
+            return
+        body = xmlrpc.client.dumps((True,), methodresponse=True).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # "close" answers as if keeping the connection alive, then closes it like an idle timeout.
+        self.close_connection = mode == "close"
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int, mode: str = "answer") -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("localhost", port), Handler)
+    server.mode = mode
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def proxy(port: int, **kwargs) -> xmlrpc.client.ServerProxy:
+    return xmlrpc.client.ServerProxy(f"http://localhost:{port}", transport=KeepAliveTransport(**kwargs))
+
+
+def test_refused_connections_are_retried_until_the_server_starts():
+    port = free_port()
+    servers = []
+    timer = threading.Timer(0.15, lambda: servers.append(serve(port)))
+    timer.start()
+    try:
+        assert proxy(port, retries=10, backoff=0.05).ping() is True
+        assert servers[0].requests == 1
+    finally:
+        timer.join()
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+def test_refused_connection_is_raised_after_the_last_retry():
+    port = free_port()
+    start = time.monotonic()
+    with pytest.raises(ConnectionRefusedError):
+        proxy(port, retries=2, backoff=0.05).ping()
+    assert time.monotonic() - start >= 0.15
+
+
+def test_request_dropped_on_a_new_connection_is_not_resent():
+    port = free_port()
+    server = serve(port, mode="drop")
+    try:
+        with pytest.raises(http.client.RemoteDisconnected):
+            proxy(port, retries=3, backoff=0.01).ping()
+        assert server.requests == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_stale_keep_alive_connection_is_replaced_once():
+    port = free_port()
+    server = serve(port, mode="close")
+    try:
+        client = proxy(port, retries=0)
+        assert client.ping() is True
+        time.sleep(0.05)
+        # The kept connection was closed by the server while idle.
+        assert client.ping() is True
+        assert server.requests == 2
+
+        server.mode = "drop"
+        with pytest.raises((http.client.RemoteDisconnected, ConnectionError)):
+            client.ping()
+        # One attempt on the stale connection never reached the handler, one on a new connection did.
+        assert server.requests == 3
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,32 @@
+from freecad_mcp.worker_pool import WorkerPool
+
+
+def make_pool(size: int = 2) -> WorkerPool:
+    """A pool whose workers are never launched; each connection is a plain marker object."""
+    pool = WorkerPool(size, connect=lambda host, port: None, script="headless_server.py")
+    for worker in pool.workers:
+        worker.connection = object()
+    return pool
+
+
+def test_new_documents_go_to_the_least_loaded_worker():
+    pool = make_pool()
+    first = pool.connection("doc:A", new=True)
+    second = pool.connection("doc:B", new=True)
+    assert first is not second
+    assert pool.connection("doc:A") is first
+    assert pool.connection("doc:B") is second
+
+
+def test_session_follows_the_worker_it_was_bound_to():
+    pool = make_pool()
+    first = pool.connection("doc:A", new=True)
+    second = pool.connection("doc:B", new=True)
+    # Code run next to document A binds the session to A's worker ...
+    pool.bind("session:default", pool.connection("doc:A"))
+    pool.connection("doc:B")
+    # ... so the session no longer goes to the worker used last.
+    assert pool.connection("session:default") is first
+    pool.bind("session:default", second)
+    assert pool.connection("session:default") is second
+    assert [len(w.keys) for w in pool.workers] == [1, 2]